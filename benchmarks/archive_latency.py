@@ -0,0 +1,70 @@
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from config.config import DatabaseConfig
+from src.repositories.database import Database
+
+USER_PREFIX = 'archive-bench-'
+
+
+def seed_past(db: Database, offices: int, first_day: datetime, days: int) -> int:
+    # One booking per office and working hour, generated server-side so
+    # tens of millions of rows can be loaded in reasonable time.
+    with db.transaction():
+        with db.conn.cursor() as cur:
+            cur.execute('''
+                INSERT INTO bookings (office_number, user_name, user_email, user_phone, start_time, end_time)
+                SELECT office, %s || office, 'bench@example.com', '+000000000',
+                       day + hour * INTERVAL '1 hour',
+                       day + hour * INTERVAL '1 hour' + INTERVAL '50 minutes'
+                FROM generate_series(%s::timestamp, %s::timestamp, INTERVAL '1 day') AS day,
+                     generate_series(1, %s) AS office,
+                     generate_series(8, 17) AS hour
+            ''', (USER_PREFIX, first_day, first_day + timedelta(days=days - 1), offices))
+            return cur.rowcount
+
+
+def measure(db: Database, offices: int, lookups: int) -> tuple[float, float]:
+    rng = random.Random(7)
+    now = datetime.now().replace(minute=0, second=0, microsecond=0)
+    latencies = []
+    for _ in range(lookups):
+        start_time = now + timedelta(days=rng.randrange(1, 30), hours=rng.randrange(8, 18))
+        started = time.perf_counter()
+        db.find_conflicts(rng.randint(1, offices), start_time, start_time + timedelta(hours=1))
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return latencies[len(latencies) // 2] * 1e3, latencies[int(len(latencies) * 0.95)] * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Availability latency as booking history grows')
+    parser.add_argument('--offices', type=int, default=500)
+    parser.add_argument('--days', type=int, nargs='+', default=[30, 365, 2000],
+                        help='Cumulative history sizes in days (500 offices x 2000 days = 10M rows)')
+    parser.add_argument('--lookups', type=int, default=2000)
+    args = parser.parse_args()
+
+    with Database(DatabaseConfig.from_yaml()) as db:
+        anchor = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=1)
+        seeded_days, rows = 0, 0
+        try:
+            for days in sorted(args.days):
+                rows += seed_past(db, args.offices, anchor - timedelta(days=days - 1), days - seeded_days)
+                seeded_days = days
+                hot_p50, hot_p95 = measure(db, args.offices, args.lookups)
+                db.archive_bookings(anchor)
+                archived_p50, archived_p95 = measure(db, args.offices, args.lookups)
+                print(f"{rows:>10} history rows: unarchived p50 {hot_p50:.2f}ms p95 {hot_p95:.2f}ms, "
+                      f"archived p50 {archived_p50:.2f}ms p95 {archived_p95:.2f}ms")
+        finally:
+            with db.transaction():
+                with db.conn.cursor() as cur:
+                    cur.execute('DELETE FROM bookings WHERE user_name LIKE %s', (f"{USER_PREFIX}%",))
+                    cur.execute('DELETE FROM bookings_archive WHERE user_name LIKE %s', (f"{USER_PREFIX}%",))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Callable
+
+from src.models.models import BookingRequest
+from src.repositories.base import BookingRepository
+from src.repositories.memory import InMemoryDatabase
+from src.repositories.sqlite import SQLiteDatabase
+
+BASE = datetime(2100, 1, 4, 9, 0)
+
+
+def request(office_number: int, start: timedelta, end: timedelta, user_name: str = 'benchmark') -> BookingRequest:
+    return BookingRequest(
+        office_number=office_number,
+        user_name=user_name,
+        user_email='benchmark@example.com',
+        user_phone='+000000000',
+        start_time=BASE + start,
+        end_time=BASE + end
+    )
+
+
+def benchmark(repo: BookingRepository, offices: int, bookings: int, lookups: int) -> dict[str, float]:
+    rng = random.Random(42)
+    seed = [
+        request(
+            rng.randint(1, offices),
+            timedelta(hours=i),
+            timedelta(hours=i, minutes=rng.randint(15, 55)),
+            f"seed-{i}"
+        )
+        for i in range(bookings)
+    ]
+
+    started = time.perf_counter()
+    with repo.transaction():
+        repo.book_many(seed)
+    timings = {'book_many': bookings / (time.perf_counter() - started)}
+
+    started = time.perf_counter()
+    for _ in range(lookups):
+        start = timedelta(minutes=rng.randrange(bookings * 60))
+        repo.find_conflicts(rng.randint(1, offices), BASE + start, BASE + start + timedelta(hours=1))
+    timings['find_conflicts'] = lookups / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for i in range(lookups):
+        start = timedelta(hours=bookings + i)
+        repo.book_office(request(rng.randint(1, offices), start, start + timedelta(minutes=30)))
+    timings['book_office'] = lookups / (time.perf_counter() - started)
+    return timings
+
+
+def postgres_backend() -> BookingRepository:
+    from config.config import DatabaseConfig
+    from src.repositories.database import Database
+    return Database(DatabaseConfig.from_yaml())
+
+
+def main() -> None:
+    # Conformance lives in tests/test_backends.py; this only measures.
+    parser = argparse.ArgumentParser(description='Backend benchmark suite')
+    parser.add_argument('--offices', type=int, default=100)
+    parser.add_argument('--bookings', type=int, default=20000)
+    parser.add_argument('--lookups', type=int, default=5000)
+    parser.add_argument('--postgres', action='store_true',
+                        help='Also run against the configured Postgres database (must be empty)')
+    args = parser.parse_args()
+
+    backends: dict[str, Callable[[], BookingRepository]] = {
+        'memory': InMemoryDatabase,
+        'sqlite': SQLiteDatabase,
+    }
+    if args.postgres:
+        backends['postgres'] = postgres_backend
+
+    for name, factory in backends.items():
+        with factory() as repo:
+            timings = benchmark(repo, args.offices, args.bookings, args.lookups)
+        print(f"{name:>8}: " + ', '.join(
+            f"{operation} {ops:,.0f} ops/s" for operation, ops in timings.items()
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from config.config import DatabaseConfig
+from src.models.models import BookingRequest
+from src.repositories.database import Database
+from src.utils.constants import DEFAULT_OFFICE_COUNT
+
+USER_PREFIX = 'bulk-'
+
+
+def generate_requests(count: int, base: datetime, tag: str) -> list[BookingRequest]:
+    return [
+        BookingRequest(
+            office_number=i % DEFAULT_OFFICE_COUNT + 1,
+            user_name=f"{USER_PREFIX}{tag}-{i}",
+            user_email='bulk@example.com',
+            user_phone='+000000000',
+            start_time=base + timedelta(hours=i // DEFAULT_OFFICE_COUNT),
+            end_time=base + timedelta(hours=i // DEFAULT_OFFICE_COUNT, minutes=50)
+        )
+        for i in range(count)
+    ]
+
+
+def book_in_loop(db: Database, requests: list[BookingRequest]) -> int:
+    booked = 0
+    for request in requests:
+        with db.transaction():
+            booked += not db.book_office(request)
+    return booked
+
+
+def book_in_bulk(db: Database, requests: list[BookingRequest]) -> int:
+    with db.transaction():
+        return sum(result.booked for result in db.book_many(requests))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Bulk booking versus per-request booking')
+    parser.add_argument('--count', type=int, default=5000)
+    args = parser.parse_args()
+
+    base = datetime.now().replace(minute=0, second=0, microsecond=0) + timedelta(days=7300)
+    with Database(DatabaseConfig.from_yaml()) as db:
+        try:
+            for offset, (name, book) in enumerate((('loop', book_in_loop), ('book_many', book_in_bulk))):
+                requests = generate_requests(args.count, base + timedelta(days=365 * offset), name)
+                started = time.perf_counter()
+                booked = book(db, requests)
+                elapsed = time.perf_counter() - started
+                print(f"{name:>9}: {booked}/{args.count} booked in {elapsed:.2f}s "
+                      f"({args.count / elapsed:.0f} bookings/s)")
+        finally:
+            with db.transaction():
+                with db.conn.cursor() as cur:
+                    cur.execute('DELETE FROM bookings WHERE user_name LIKE %s', (f"{USER_PREFIX}%",))
+
+
+if __name__ == '__main__':
+    main()
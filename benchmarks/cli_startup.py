@@ -0,0 +1,88 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from src.utils.constants import DATETIME_FORMAT
+
+MAIN = Path(__file__).resolve().parent.parent / 'main.py'
+
+
+def run(command: list[str], env: dict, cwd: str, extra_flags: tuple[str, ...] = ()) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *extra_flags, str(MAIN), *command],
+        env=env, cwd=cwd, stdin=subprocess.DEVNULL, capture_output=True, text=True
+    )
+
+
+def wall_clock(command: list[str], env: dict, cwd: str, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run(command, env, cwd)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def import_times(command: list[str], env: dict, cwd: str) -> list[tuple[int, str]]:
+    # -X importtime writes "import time: self | cumulative | module" to stderr.
+    completed = run(command, env, cwd, ('-X', 'importtime'))
+    modules = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line.removeprefix('import time:').split('|')
+        # Nested imports are indented below the module that triggered them.
+        modules.append((int(cumulative), module[1:].rstrip()))
+    return modules
+
+
+def report(name: str, command: list[str], env: dict, cwd: str, repeat: int, top: int) -> None:
+    completed = run(command, env, cwd)
+    if completed.stdout.startswith(('Error', 'Fatal error')):
+        print(f"{name:>15}: skipped, {completed.stdout.splitlines()[0]}")
+        return
+    timings = wall_clock(command, env, cwd, repeat)
+    modules = import_times(command, env, cwd)
+    top_level = sorted(
+        ((cumulative, module) for cumulative, module in modules if not module.startswith(' ')),
+        reverse=True
+    )
+    print(f"{name:>15}: median {statistics.median(timings) * 1000:.0f} ms, "
+          f"best {min(timings) * 1000:.0f} ms over {repeat} runs, "
+          f"{sum(cumulative for cumulative, _ in top_level) / 1000:.0f} ms importing")
+    for cumulative, module in top_level[:top]:
+        print(f"                 {cumulative / 1000:7.1f} ms  {module}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='main.py startup time')
+    parser.add_argument('--env', default='kiosk',
+                        help='config.yaml environment for the check command (kiosk needs no server)')
+    parser.add_argument('--postgres-env',
+                        help='also time the check command against this Postgres environment, '
+                             'which must be reachable')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--top', type=int, default=10, help='slowest top-level imports to list')
+    args = parser.parse_args()
+
+    start = datetime.now().replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+    check = ['check', '1', f"{start:{DATETIME_FORMAT}}", f"{start + timedelta(hours=1):{DATETIME_FORMAT}}"]
+    runs = [('help', ['--help'], args.env), (f'check ({args.env})', check, args.env)]
+    if args.postgres_env:
+        # Covers the driver import, the pool's first connection and the
+        # office catalogue; one-shot commands open no LISTEN connection.
+        runs.append((f'check ({args.postgres_env})', check, args.postgres_env))
+    # The kiosk config keeps its SQLite file relative to the working directory.
+    with tempfile.TemporaryDirectory() as cwd:
+        for name, command, environment in runs:
+            report(name, command, {**os.environ, 'ENV': environment}, cwd, args.repeat, args.top)
+
+
+if __name__ == '__main__':
+    main()
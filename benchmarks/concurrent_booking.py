@@ -0,0 +1,91 @@
+import argparse
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+
+from config.config import DatabaseConfig
+from src.models.models import BookingRequest
+from src.repositories.database import Database
+from src.repositories.pool import ConnectionPool
+
+USER_PREFIX = 'concurrency-'
+
+
+def hammer(db: Database, worker: int, attempts: int, base: datetime,
+           results: list[int], barrier: threading.Barrier) -> None:
+    booked = 0
+    rng = random.Random(worker)
+    barrier.wait()
+    for attempt in range(attempts):
+        start_time = base + timedelta(minutes=15 * rng.randrange(32))
+        end_time = start_time + timedelta(minutes=15 * rng.randint(1, 8))
+        with db.transaction():
+            conflicts = db.book_office(BookingRequest(
+                office_number=1,
+                user_name=f"{USER_PREFIX}{worker}-{attempt}",
+                user_email='load@example.com',
+                user_phone='+000000000',
+                start_time=start_time,
+                end_time=end_time
+            ))
+        booked += not conflicts
+    results[worker] = booked
+
+
+def count_double_bookings(db: Database) -> int:
+    with db.connection() as conn, conn.cursor() as cur:
+        cur.execute('''
+            SELECT count(*)
+            FROM bookings a
+            JOIN bookings b ON a.office_number = b.office_number AND
+                               a.id < b.id AND
+                               a.start_time < b.end_time AND
+                               a.end_time > b.start_time
+            WHERE a.user_name LIKE %s AND b.user_name LIKE %s
+        ''', (f"{USER_PREFIX}%", f"{USER_PREFIX}%"))
+        return cur.fetchone()[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Concurrent double-booking stress test')
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--attempts', type=int, default=200)
+    args = parser.parse_args()
+
+    db_config = DatabaseConfig.from_yaml()
+    base = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0) + timedelta(days=3650)
+    results = [0] * args.threads
+    barrier = threading.Barrier(args.threads)
+    pool = ConnectionPool(db_config, max_size=args.threads)
+
+    with Database(db_config, pool=pool) as db:
+        workers = [
+            threading.Thread(target=hammer, args=(db, i, args.attempts, base, results, barrier))
+            for i in range(args.threads)
+        ]
+
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+
+        double_bookings = count_double_bookings(db)
+        with db.transaction():
+            with db.conn.cursor() as cur:
+                cur.execute('DELETE FROM bookings WHERE user_name LIKE %s', (f"{USER_PREFIX}%",))
+
+    stats = pool.stats()
+    pool.close()
+    print(f"attempts: {args.threads * args.attempts}, booked: {sum(results)}, "
+          f"double bookings: {double_bookings}, elapsed: {elapsed:.2f}s")
+    print(f"pool: {stats.checkouts} checkouts, {stats.waits} waits, "
+          f"{stats.wait_time:.3f}s waited, {stats.connections_created} connections")
+    if double_bookings:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,271 @@
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from dataclasses import replace
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from config.config import DatabaseConfig
+from src.models.models import BookingRequest, Office
+from src.repositories.base import BookingRepository
+from src.repositories.factory import create_repository
+from src.services.booking import OfficeBookingSystem
+from src.services.notification import NotificationManager, NotificationService
+from src.utils.constants import DEFAULT_OFFICE_COUNT
+from src.utils.metrics import registry
+
+USER_PREFIX = 'harness-'
+HARNESS_SITE = 'harness'
+SEED_BATCH_SIZE = 5000
+WORKDAY_START = timedelta(hours=8)
+WORKDAY_END = timedelta(hours=18)
+SLOT = timedelta(minutes=30)
+
+
+class NullService(NotificationService):
+    def send(self, recipient: str, message: str) -> None:
+        pass
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    position = min(len(sorted_values) - 1, round(fraction * (len(sorted_values) - 1)))
+    return sorted_values[position]
+
+
+def synthetic_bookings(
+        offices: int,
+        first_day: datetime,
+        days: int,
+        density: float,
+        rng: random.Random
+):
+    for day in range(days):
+        date = first_day + timedelta(days=day)
+        for office_number in range(1, offices + 1):
+            cursor = date + WORKDAY_START
+            while cursor < date + WORKDAY_END:
+                if rng.random() >= density:
+                    cursor += SLOT
+                    continue
+                end_time = min(cursor + SLOT * rng.randint(1, 4), date + WORKDAY_END)
+                yield BookingRequest(
+                    office_number=office_number,
+                    user_name=f"{USER_PREFIX}{rng.randrange(10_000)}",
+                    user_email='harness@example.com',
+                    user_phone='+000000000',
+                    start_time=cursor,
+                    end_time=end_time
+                )
+                cursor = end_time
+
+
+def ensure_offices(repo: BookingRepository, offices: int) -> None:
+    # The workload books offices 1..offices; any the catalogue lacks are
+    # registered under their own site so cleanup can remove them again.
+    for office_number in range(1, offices + 1):
+        if office_number not in repo.office_catalogue:
+            repo.save_office(Office(office_number, HARNESS_SITE))
+
+
+def seed_history(repo: BookingRepository, bookings) -> int:
+    seeded = 0
+    batch = []
+    for booking in bookings:
+        batch.append(booking)
+        if len(batch) == SEED_BATCH_SIZE:
+            with repo.transaction():
+                seeded += sum(result.booked for result in repo.book_many(batch))
+            batch = []
+    if batch:
+        with repo.transaction():
+            seeded += sum(result.booked for result in repo.book_many(batch))
+    return seeded
+
+
+def run_workload(
+        system: OfficeBookingSystem,
+        offices: int,
+        window_start: datetime,
+        window_days: int,
+        clients: int,
+        operations: int,
+        read_ratio: float,
+        seed: int
+) -> tuple[dict[str, list[float]], float]:
+    latencies: dict[str, list[float]] = {'check_availability': [], 'book_office': []}
+    lock = threading.Lock()
+    barrier = threading.Barrier(clients + 1)
+
+    def client(client_id: int) -> None:
+        rng = random.Random(seed * 1000 + client_id)
+        local = {name: [] for name in latencies}
+        barrier.wait()
+        for _ in range(operations // clients):
+            office_number = rng.randint(1, offices)
+            start_time = (window_start + timedelta(days=rng.randrange(window_days)) +
+                          WORKDAY_START + SLOT * rng.randrange(20))
+            end_time = start_time + SLOT * rng.randint(1, 4)
+            started = time.perf_counter()
+            if rng.random() < read_ratio:
+                system.check_availability(office_number, start_time, end_time)
+                local['check_availability'].append(time.perf_counter() - started)
+            else:
+                system.book_office(BookingRequest(
+                    office_number=office_number,
+                    user_name=f"{USER_PREFIX}client-{client_id}",
+                    user_email='harness@example.com',
+                    user_phone='+000000000',
+                    start_time=start_time,
+                    end_time=end_time
+                ))
+                local['book_office'].append(time.perf_counter() - started)
+        with lock:
+            for name, values in local.items():
+                latencies[name].extend(values)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return latencies, time.perf_counter() - started
+
+
+def summarize(latencies: dict[str, list[float]], elapsed: float) -> dict[str, dict[str, float]]:
+    summary = {}
+    for name, values in latencies.items():
+        values.sort()
+        summary[name] = {
+            'count': len(values),
+            'ops_per_sec': len(values) / elapsed if elapsed else 0.0,
+            'p50_ms': percentile(values, 0.50) * 1e3,
+            'p95_ms': percentile(values, 0.95) * 1e3,
+            'p99_ms': percentile(values, 0.99) * 1e3,
+        }
+    return summary
+
+
+def find_regressions(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    baseline_steps = {step['history_days']: step for step in baseline['steps']}
+    for step in report['steps']:
+        previous = baseline_steps.get(step['history_days'])
+        if previous is None:
+            continue
+        for name, current in step['operations'].items():
+            before = previous['operations'].get(name)
+            if before and before['p95_ms'] and current['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+                regressions.append(
+                    f"{name} at {step['history_days']} days: p95 {current['p95_ms']:.2f}ms "
+                    f"vs baseline {before['p95_ms']:.2f}ms"
+                )
+    return regressions
+
+
+def cleanup(repo: BookingRepository, backend: str) -> None:
+    if backend == 'postgres':
+        with repo.transaction():
+            with repo.conn.cursor() as cur:
+                cur.execute('DELETE FROM bookings WHERE user_name LIKE %s', (f"{USER_PREFIX}%",))
+                cur.execute('DELETE FROM offices WHERE site = %s', (HARNESS_SITE,))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Booking path load generator')
+    parser.add_argument('--env', help='config.yaml environment (defaults to $ENV)')
+    parser.add_argument('--backend', choices=['postgres', 'sqlite', 'memory'],
+                        help='Override the configured backend')
+    parser.add_argument('--offices', type=int, default=DEFAULT_OFFICE_COUNT)
+    parser.add_argument('--days', type=int, nargs='+', default=[30, 180, 365],
+                        help='History sizes in days; each step grows the seeded history')
+    parser.add_argument('--density', type=float, default=0.6,
+                        help='Probability that a free 30 minute working slot gets booked')
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--operations', type=int, default=4000)
+    parser.add_argument('--read-ratio', type=float, default=0.9)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', type=Path, help='Write the JSON report here')
+    parser.add_argument('--baseline', type=Path, help='Fail if p95 regresses against this report')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument('--metrics', action='store_true',
+                        help='Enable instrumentation and include the registry dump in the report')
+    args = parser.parse_args()
+    registry.configure(args.metrics)
+
+    if args.backend in ('sqlite', 'memory'):
+        db_config = DatabaseConfig('', 0, '', '', '', backend=args.backend)
+    else:
+        db_config = DatabaseConfig.from_yaml(args.env)
+        if args.backend:
+            db_config = replace(db_config, backend=args.backend)
+    db_config = replace(db_config, pool_max_size=max(db_config.pool_max_size, args.clients))
+
+    rng = random.Random(args.seed)
+    anchor = datetime(2200, 1, 1)
+    report = {
+        'backend': db_config.backend,
+        'offices': args.offices,
+        'density': args.density,
+        'clients': args.clients,
+        'read_ratio': args.read_ratio,
+        'steps': [],
+    }
+
+    with create_repository(db_config, long_running=True) as repo:
+        ensure_offices(repo, args.offices)
+        system = OfficeBookingSystem(repo, NotificationManager(NullService(), NullService()))
+        seeded_days, seeded_rows = 0, 0
+        try:
+            for step, history_days in enumerate(sorted(args.days)):
+                seeded_rows += seed_history(repo, synthetic_bookings(
+                    args.offices,
+                    anchor - timedelta(days=history_days),
+                    history_days - seeded_days,
+                    args.density,
+                    rng
+                ))
+                seeded_days = history_days
+
+                # Each step works on its own future window so writes from
+                # earlier steps do not turn later bookings into conflicts.
+                window_start = anchor + timedelta(days=30 * step)
+                latencies, elapsed = run_workload(
+                    system, args.offices, window_start, 30, args.clients,
+                    args.operations, args.read_ratio, args.seed + step
+                )
+                operations = summarize(latencies, elapsed)
+                report['steps'].append({
+                    'history_days': history_days,
+                    'history_rows': seeded_rows,
+                    'elapsed_s': elapsed,
+                    'ops_per_sec': sum(len(values) for values in latencies.values()) / elapsed,
+                    'operations': operations,
+                })
+                for name, stats in operations.items():
+                    print(f"{history_days:>6} days / {seeded_rows:>9} rows  {name:<18} "
+                          f"{stats['ops_per_sec']:>9.0f} ops/s  p50 {stats['p50_ms']:.2f}ms  "
+                          f"p95 {stats['p95_ms']:.2f}ms  p99 {stats['p99_ms']:.2f}ms")
+        finally:
+            cleanup(repo, db_config.backend)
+
+    if args.metrics:
+        report['metrics'] = registry.snapshot()
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.baseline:
+        regressions = find_regressions(report, json.loads(args.baseline.read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
+
+from benchmarks.harness import (
+    NullService,
+    SLOT,
+    USER_PREFIX,
+    WORKDAY_START,
+    cleanup,
+    ensure_offices,
+    seed_history,
+    summarize,
+    synthetic_bookings,
+)
+from config.config import DatabaseConfig
+from src.cmd.server import BookingHTTPServer
+from src.repositories.factory import create_repository
+from src.services.booking import OfficeBookingSystem
+from src.services.notification import NotificationManager
+from src.utils.constants import DEFAULT_OFFICE_COUNT
+
+
+async def request(reader, writer, method: str, target: str, body: bytes = b'') -> int:
+    writer.write(
+        f"{method} {target} HTTP/1.1\r\nHost: bench\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (line := await reader.readline()) not in (b'\r\n', b''):
+        name, _, value = line.decode().partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def client(host: str, port: int, client_id: int, operations: int, offices: int,
+                 window_start: datetime, read_ratio: float, latencies: dict[str, list[float]]) -> None:
+    rng = random.Random(client_id)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(operations):
+            office_number = rng.randint(1, offices)
+            start_time = window_start + timedelta(days=rng.randrange(30)) + WORKDAY_START + SLOT * rng.randrange(20)
+            end_time = start_time + SLOT * rng.randint(1, 4)
+            started = time.perf_counter()
+            if rng.random() < read_ratio:
+                await request(reader, writer, 'GET', '/availability?' + urlencode({
+                    'office': office_number,
+                    'start': start_time.isoformat(),
+                    'end': end_time.isoformat(),
+                }))
+                latencies['check_availability'].append(time.perf_counter() - started)
+            else:
+                await request(reader, writer, 'POST', '/bookings', json.dumps({
+                    'office_number': office_number,
+                    'user_name': f"{USER_PREFIX}http-{client_id}",
+                    'user_email': 'harness@example.com',
+                    'user_phone': '+000000000',
+                    'start_time': start_time.isoformat(),
+                    'end_time': end_time.isoformat(),
+                }).encode())
+                latencies['book_office'].append(time.perf_counter() - started)
+    finally:
+        writer.close()
+
+
+async def run(args) -> None:
+    if args.backend in ('sqlite', 'memory'):
+        db_config = DatabaseConfig('', 0, '', '', '', backend=args.backend)
+    else:
+        db_config = DatabaseConfig.from_yaml()
+    repo = create_repository(db_config, long_running=True)
+    ensure_offices(repo, args.offices)
+    anchor = datetime(2200, 1, 1)
+    seeded = seed_history(repo, synthetic_bookings(
+        args.offices, anchor - timedelta(days=args.days), args.days, 0.6, random.Random(1)
+    ))
+
+    system = OfficeBookingSystem(repo, NotificationManager(NullService(), NullService()))
+    server = BookingHTTPServer(system, max_workers=args.workers, max_pending=args.clients * 2)
+    http_server = await server.start('127.0.0.1', 0)
+    port = http_server.sockets[0].getsockname()[1]
+
+    latencies = {'check_availability': [], 'book_office': []}
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        client('127.0.0.1', port, i, args.operations // args.clients, args.offices,
+               anchor, args.read_ratio, latencies)
+        for i in range(args.clients)
+    ))
+    elapsed = time.perf_counter() - started
+
+    http_server.close()
+    await http_server.wait_closed()
+    server.close()
+    cleanup(repo, db_config.backend)
+    repo.close()
+
+    total = sum(len(values) for values in latencies.values())
+    print(f"{args.clients} clients, {seeded} seeded bookings, {total / elapsed:.0f} requests/s")
+    for name, stats in summarize(latencies, elapsed).items():
+        print(f"  {name:<18} {stats['ops_per_sec']:>8.0f} ops/s  p50 {stats['p50_ms']:.2f}ms  "
+              f"p95 {stats['p95_ms']:.2f}ms  p99 {stats['p99_ms']:.2f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='HTTP API throughput with the harness workload')
+    parser.add_argument('--backend', choices=['postgres', 'sqlite', 'memory'], default='memory')
+    parser.add_argument('--offices', type=int, default=DEFAULT_OFFICE_COUNT)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--operations', type=int, default=20000)
+    parser.add_argument('--read-ratio', type=float, default=0.9)
+    parser.add_argument('--workers', type=int, default=16)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
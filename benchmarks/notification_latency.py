@@ -0,0 +1,68 @@
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from src.models.models import BookingRequest
+from src.services.notification import (
+    NotificationManager,
+    NotificationDispatcher,
+    NotificationService
+)
+
+
+class DelayedService(NotificationService):
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.delivered = 0
+
+    def send(self, recipient: str, message: str) -> None:
+        time.sleep(self.delay)
+        self.delivered += 1
+
+    def send_batch(self, notifications: list[tuple[str, str]]) -> None:
+        time.sleep(self.delay)
+        self.delivered += len(notifications)
+
+
+def run(manager: NotificationManager, bookings: int) -> float:
+    start_time = datetime.now() + timedelta(days=1)
+    started = time.perf_counter()
+    for i in range(bookings):
+        manager.send_booking_confirmation(BookingRequest(
+            office_number=1,
+            user_name=f"user-{i}",
+            user_email=f"user-{i}@example.com",
+            user_phone='+000000000',
+            start_time=start_time,
+            end_time=start_time + timedelta(hours=1)
+        ))
+    return (time.perf_counter() - started) / bookings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Notification latency on the booking path')
+    parser.add_argument('--bookings', type=int, default=200)
+    parser.add_argument('--delay', type=float, default=0.02,
+                        help='Simulated provider latency in seconds')
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    sync_manager = NotificationManager(DelayedService(args.delay), DelayedService(args.delay))
+    sync_latency = run(sync_manager, args.bookings)
+
+    email, sms = DelayedService(args.delay), DelayedService(args.delay)
+    dispatcher = NotificationDispatcher(workers=args.workers, max_queue_size=args.bookings * 2)
+    async_manager = NotificationManager(email, sms, dispatcher=dispatcher)
+    async_latency = run(async_manager, args.bookings)
+    drain_started = time.perf_counter()
+    async_manager.close()
+    drain = time.perf_counter() - drain_started
+
+    print(f"synchronous: {sync_latency * 1e3:.2f} ms/booking")
+    print(f"dispatched:  {async_latency * 1e3:.3f} ms/booking, "
+          f"queue drained in {drain:.2f}s, delivered {email.delivered + sms.delivered}, "
+          f"stats {dispatcher.stats()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+import argparse
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from benchmarks.harness import synthetic_bookings
+from src.models.models import Occupancy
+from src.repositories.availability_index import AvailabilityIndex
+from src.services.occupancy import OccupancyMatrix
+from src.services.slots import free_intervals
+
+
+def synthetic_occupancy(offices: int, first_day: datetime, days: int, density: float) -> dict[int, list[Occupancy]]:
+    occupancy: dict[int, list[Occupancy]] = {office_number: [] for office_number in range(1, offices + 1)}
+    for booking in synthetic_bookings(offices, first_day, days, density, random.Random(1)):
+        occupancy[booking.office_number].append(Occupancy(booking.user_name, booking.start_time, booking.end_time))
+    return occupancy
+
+
+def per_call(func, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Whole-fleet queries on the occupancy matrix against per-office checks')
+    parser.add_argument('--offices', type=int, default=1000)
+    parser.add_argument('--days', type=int, default=5)
+    parser.add_argument('--density', type=float, default=0.3)
+    parser.add_argument('--rooms', type=int, default=5)
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    first_day = datetime(2200, 1, 1)
+    occupancy = synthetic_occupancy(args.offices, first_day, args.days, args.density)
+    office_numbers = list(occupancy)
+    bookings = sum(len(entries) for entries in occupancy.values())
+
+    def load(start_time: datetime, end_time: datetime, offices: list[int] | None) -> dict[int, list[Occupancy]]:
+        return {
+            office_number: [entry for entry in entries if entry.start_time < end_time and entry.end_time > start_time]
+            for office_number, entries in occupancy.items()
+        }
+
+    def load_days() -> OccupancyMatrix:
+        matrix = OccupancyMatrix(load, lambda: office_numbers, ttl=float('inf'))
+        for day in range(args.days):
+            matrix.utilisation(first_day + timedelta(days=day), first_day + timedelta(days=day + 1))
+        return matrix
+
+    # Timing and memory come from separate runs, as tracemalloc slows
+    # allocation down several times over.
+    tracemalloc.start()
+    load_days()
+    _, matrix_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    started = time.perf_counter()
+    matrix = load_days()
+    load_seconds = time.perf_counter() - started
+
+    tracemalloc.start()
+    index = AvailabilityIndex()
+    index.load(
+        (i, office_number, entry.user_name, entry.start_time, entry.end_time)
+        for i, (office_number, entry) in enumerate(
+            ((office_number, entry) for office_number, entries in occupancy.items() for entry in entries), start=1
+        )
+    )
+    index_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = matrix.stats()
+    office_days = stats.offices * stats.days
+    print(f"{args.offices} offices, {args.days} days, {bookings} bookings")
+    print(f"  matrix: {stats.bytes / office_days:.0f} bytes per office-day ({stats.bytes / 1024:.0f} KiB), "
+          f"loaded in {load_seconds * 1000 / args.days:.1f} ms per day, peak {matrix_peak / 1024:.0f} KiB while loading")
+    print(f"  index:  {index_bytes / office_days:.0f} bytes per office-day ({index_bytes / 1024:.0f} KiB)")
+
+    day = first_day + timedelta(days=args.days // 2)
+    span = (day + timedelta(hours=14), day + timedelta(hours=15))
+    window = (day + timedelta(hours=8), day + timedelta(hours=18))
+    duration = timedelta(hours=1)
+
+    def index_free_offices() -> list[int]:
+        return [office_number for office_number in office_numbers if index.is_available(office_number, *span)]
+
+    def sweep_common_slot() -> datetime | None:
+        free = {
+            office_number: list(free_intervals(index.conflicts(office_number, *window), *window, duration))
+            for office_number in office_numbers
+        }
+        for start_time in sorted({start for intervals in free.values() for start, _ in intervals}):
+            rooms = sum(
+                any(start <= start_time and start_time + duration <= end for start, end in intervals)
+                for intervals in free.values()
+            )
+            if rooms >= args.rooms:
+                return start_time
+        return None
+
+    # Agreement with the per-office answers is covered by tests/test_occupancy.py.
+    results = [
+        ('free offices', lambda: matrix.free_offices(*span), index_free_offices),
+        (f'common slot for {args.rooms}', lambda: matrix.earliest_common_slot(*window, duration, args.rooms),
+         sweep_common_slot),
+        ('utilisation', lambda: matrix.utilisation(day, day + timedelta(days=1)), None),
+    ]
+    for name, vectorized, loop in results:
+        matrix_seconds = per_call(vectorized, args.iterations)
+        line = f"  {name:<20} matrix {matrix_seconds * 1e6:8.0f} us"
+        if loop is not None:
+            loop_seconds = per_call(loop, max(1, args.iterations // 10))
+            line += f"  per-office {loop_seconds * 1e6:9.0f} us  ({loop_seconds / matrix_seconds:.0f}x)"
+        print(line)
+
+    started = time.perf_counter()
+    for i in range(args.iterations):
+        start_time = day + timedelta(hours=8, minutes=15 * (i % 40))
+        matrix.add(1 + i % args.offices, start_time, start_time + timedelta(minutes=30))
+    print(f"  {'add booking':<20} matrix {(time.perf_counter() - started) / args.iterations * 1e6:8.0f} us")
+
+
+if __name__ == '__main__':
+    main()
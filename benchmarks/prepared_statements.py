@@ -0,0 +1,74 @@
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from config.config import DatabaseConfig
+from src.models.models import BookingRequest
+from src.repositories.database import Database
+from src.repositories.pool import ConnectionPool
+from src.repositories.statements import StatementRegistry
+
+USER_PREFIX = 'prepared-benchmark'
+
+
+def measure_checks(db: Database, iterations: int, start_time: datetime) -> float:
+    started = time.perf_counter()
+    for i in range(iterations):
+        slot = start_time + timedelta(minutes=30 * (i % 48))
+        db.find_conflicts(1 + i % 5, slot, slot + timedelta(hours=1))
+    return time.perf_counter() - started
+
+
+def measure_bookings(db: Database, iterations: int, start_time: datetime, user_name: str) -> float:
+    started = time.perf_counter()
+    for i in range(iterations):
+        slot = start_time + timedelta(hours=i)
+        with db.transaction():
+            db.book_office(BookingRequest(
+                office_number=1,
+                user_name=user_name,
+                user_email='benchmark@example.com',
+                user_phone='+000000000',
+                start_time=slot,
+                end_time=slot + timedelta(minutes=30)
+            ))
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Prepared statements against plain SQL text')
+    parser.add_argument('--iterations', type=int, default=5000)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    db_config = DatabaseConfig.from_yaml()
+    start_time = datetime.now().replace(minute=0, second=0, microsecond=0) + timedelta(days=365 * 50)
+    pool = ConnectionPool(db_config, min_size=1, max_size=1)
+    try:
+        # Interleaved rounds so both paths see the same cache warmth.
+        results: dict[str, dict[str, float]] = {}
+        for round_number in range(args.rounds):
+            for name, enabled in (('text', False), ('prepared', True)):
+                db = Database(db_config, pool=pool, statements=StatementRegistry(enabled))
+                offset = timedelta(days=365 * (2 * round_number + enabled))
+                checks = measure_checks(db, args.iterations, start_time)
+                bookings = measure_bookings(db, args.iterations, start_time + offset, f'{USER_PREFIX}-{name}')
+                best = results.setdefault(name, {'checks': checks, 'bookings': bookings})
+                best['checks'] = min(best['checks'], checks)
+                best['bookings'] = min(best['bookings'], bookings)
+
+        for name, best in results.items():
+            print(f"{name:>9}: find_conflicts {best['checks'] / args.iterations * 1e6:6.0f} us/op, "
+                  f"book_office {best['bookings'] / args.iterations * 1e6:6.0f} us/op")
+        text, prepared = results['text'], results['prepared']
+        print(f"  speedup: find_conflicts {text['checks'] / prepared['checks']:.2f}x, "
+              f"book_office {text['bookings'] / prepared['bookings']:.2f}x")
+    finally:
+        with Database(db_config, pool=pool) as db, db.transaction():
+            with db.conn.cursor() as cur:
+                cur.execute('DELETE FROM bookings WHERE user_name LIKE %s', (USER_PREFIX + '%',))
+        pool.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+import argparse
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from benchmarks.harness import SLOT, USER_PREFIX, WORKDAY_END, WORKDAY_START
+from src.services.reports import daily_peaks, daily_usage, hourly_histogram
+
+
+def synthetic_rows(rows: int, offices: int, first_day: datetime, rng: random.Random):
+    # Rows are produced in start_time order, the way the repositories stream
+    # them, without ever holding the full history.
+    slots_per_day = (WORKDAY_END - WORKDAY_START) // SLOT
+    for i in range(rows):
+        day, position = divmod(i // offices, slots_per_day)
+        start_time = first_day + timedelta(days=day) + WORKDAY_START + SLOT * position
+        yield (
+            i % offices + 1,
+            f"{USER_PREFIX}{rng.randrange(1000)}",
+            start_time,
+            start_time + SLOT * rng.randint(1, 3)
+        )
+
+
+def run_report(report: str, rows: int, offices: int) -> None:
+    first_day = datetime(2200, 1, 1)
+    end_time = first_day + timedelta(days=rows // offices + 2)
+    stream = synthetic_rows(rows, offices, first_day, random.Random(1))
+    match report:
+        case 'usage':
+            for _ in daily_usage(stream, first_day, end_time):
+                pass
+        case 'peaks':
+            for _ in daily_peaks(stream):
+                pass
+        case 'hourly':
+            hourly_histogram(stream, first_day, end_time)
+
+
+def measure(report: str, rows: int, offices: int) -> tuple[float, float]:
+    # Throughput and memory are taken in separate runs because tracemalloc
+    # slows allocation-heavy code down several times over.
+    started = time.perf_counter()
+    run_report(report, rows, offices)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    run_report(report, rows, offices)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Report aggregation memory against history size')
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--offices', type=int, default=50)
+    args = parser.parse_args()
+
+    for report in ('usage', 'peaks', 'hourly'):
+        for rows in args.rows:
+            elapsed, peak = measure(report, rows, args.offices)
+            print(f"{report:<7} {rows:>9} rows  {rows / elapsed:>10.0f} rows/s  "
+                  f"peak {peak / 1024:>8.1f} KiB")
+
+
+if __name__ == '__main__':
+    main()
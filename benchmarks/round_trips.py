@@ -0,0 +1,73 @@
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from psycopg2.extensions import cursor
+
+from config.config import DatabaseConfig
+from src.models.models import BookingRequest
+from src.repositories.database import Database
+from src.repositories.pool import ConnectionPool
+
+
+class CountingCursor(cursor):
+    executed = 0
+
+    def execute(self, query, vars=None):
+        CountingCursor.executed += 1
+        return super().execute(query, vars)
+
+
+def legacy_check(db: Database, office_number: int, start_time: datetime, end_time: datetime) -> None:
+    if not db.is_office_available(office_number, start_time, end_time):
+        db.get_office_occupancy(office_number, start_time, end_time)
+
+
+def combined_check(db: Database, office_number: int, start_time: datetime, end_time: datetime) -> None:
+    db.find_conflicts(office_number, start_time, end_time)
+
+
+def measure(db: Database, check, iterations: int, start_time: datetime, end_time: datetime) -> tuple[int, float]:
+    CountingCursor.executed = 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        check(db, 1, start_time, end_time)
+    return CountingCursor.executed, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Availability round-trip benchmark')
+    parser.add_argument('--iterations', type=int, default=1000)
+    args = parser.parse_args()
+
+    db_config = DatabaseConfig.from_yaml()
+    pool = ConnectionPool(db_config, min_size=1, max_size=1, cursor_factory=CountingCursor)
+    with Database(db_config, pool=pool) as db:
+        start_time = datetime.now().replace(microsecond=0) + timedelta(days=365)
+        end_time = start_time + timedelta(hours=1)
+
+        # An occupied slot is the worst case for the legacy path: it needs
+        # both the availability probe and the occupancy lookup.
+        with db.transaction():
+            db.book_office(BookingRequest(
+                office_number=1,
+                user_name='benchmark',
+                user_email='benchmark@example.com',
+                user_phone='+000000000',
+                start_time=start_time,
+                end_time=end_time
+            ))
+        try:
+            for name, check in (('legacy', legacy_check), ('combined', combined_check)):
+                queries, elapsed = measure(db, check, args.iterations, start_time, end_time)
+                print(f"{name:>8}: {queries / args.iterations:.1f} round trips/check, "
+                      f"{elapsed / args.iterations * 1e6:.0f} us/check")
+        finally:
+            with db.transaction():
+                with db.conn.cursor() as cur:
+                    cur.execute("DELETE FROM bookings WHERE user_name = 'benchmark'")
+            pool.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from src.models.models import BookingRequest, Office
+from src.repositories.office_catalogue import OfficeCatalogue
+from src.utils.constants import DEFAULT_OFFICE_COUNT, DEFAULT_SITE
+from src.utils.validators import BookingValidator
+
+
+def generate_requests(count: int, invalid_ratio: float, seed: int) -> list[BookingRequest]:
+    rng = random.Random(seed)
+    base = datetime.now().replace(minute=0, second=0, microsecond=0) + timedelta(days=30)
+    requests = []
+    for i in range(count):
+        start_time = base + timedelta(hours=i % 1000)
+        request = BookingRequest(
+            office_number=rng.randint(1, DEFAULT_OFFICE_COUNT),
+            user_name=f"user-{i}",
+            user_email=f"user-{i}@example.com",
+            user_phone='+48 600-000-000',
+            start_time=start_time,
+            end_time=start_time + timedelta(minutes=rng.choice((30, 60, 90)))
+        )
+        if rng.random() < invalid_ratio:
+            # Break one field so the slow path that builds messages is measured too.
+            broken = rng.choice(('office_number', 'user_email', 'user_phone', 'end_time'))
+            setattr(request, broken, {
+                'office_number': DEFAULT_OFFICE_COUNT + 1,
+                'user_email': 'not-an-email',
+                'user_phone': '12ab',
+                'end_time': start_time,
+            }[broken])
+        requests.append(request)
+    return requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Batch booking validation throughput')
+    parser.add_argument('--count', type=int, default=100000)
+    parser.add_argument('--invalid-ratio', type=float, default=0.1)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-rate', type=float, default=100000,
+                        help='exit 1 when the best run validates fewer requests per second')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    requests = generate_requests(args.count, args.invalid_ratio, args.seed)
+    offices = OfficeCatalogue([Office(n, DEFAULT_SITE) for n in range(1, DEFAULT_OFFICE_COUNT + 1)])
+    validator = BookingValidator()
+
+    best = float('inf')
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        errors = validator.validate_many(requests, offices=offices)
+        best = min(best, time.perf_counter() - started)
+
+    rate = args.count / best
+    invalid = sum(1 for field_errors in errors if field_errors)
+    print(f"validated {args.count} requests ({invalid} invalid) in {best * 1000:.1f} ms: {rate:,.0f} requests/s")
+    if rate < args.min_rate:
+        print(f"below the {args.min_rate:,.0f} requests/s target", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,18 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from functools import lru_cache
 import os
-import yaml
 from pathlib import Path
 
+
+# Parsed once per process; yaml is imported here so commands that never read
+# the config (like --help) don't pay for it.
+@lru_cache(maxsize=None)
+def _load_config_file(config_path: Path) -> dict:
+    import yaml
+    with open(config_path, 'r') as f:
+        return yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+
+
 @dataclass
 class DatabaseConfig:
     host: str
@@ -10,6 +20,20 @@ class DatabaseConfig:
     name: str
     user: str
     password: str
+    pool_min_size: int = 1
+    pool_max_size: int = 10
+    pool_timeout: float = 30.0
+    backend: str = 'postgres'
+    path: str | None = None
+    metrics_enabled: bool = False
+    slow_query_threshold_ms: float | None = None
+    cache_enabled: bool = False
+    cache_max_entries: int = 1024
+    cache_ttl: float = 30.0
+    prepared_statements: bool = True
+    replicas: tuple[tuple[str, int], ...] = ()
+    replica_max_lag: float = 5.0
+    replica_check_interval: float = 1.0
 
     @classmethod
     def from_yaml(cls, environment: str = None) -> 'DatabaseConfig':
@@ -21,8 +45,7 @@ class DatabaseConfig:
                 f"Configuration file not found at {config_path}"
             )
 
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
+        config = _load_config_file(config_path)
 
         if environment not in config:
             raise ValueError(
@@ -30,14 +53,43 @@ class DatabaseConfig:
             )
 
         db_config = config[environment]['database']
+        backend = db_config.get('backend', cls.backend)
+        if backend != 'postgres':
+            db_config = {'host': '', 'port': 0, 'name': '', 'user': '', 'password': '', **db_config}
+        pool_config = db_config.get('pool', {})
+        instrumentation = db_config.get('instrumentation', {})
+        slow_query_ms = instrumentation.get('slow_query_ms')
+        cache_config = db_config.get('cache', {})
+        replica_config = db_config.get('replicas', {})
         return cls(
             host=db_config['host'],
             port=int(db_config['port']),
             name=db_config['name'],
             user=db_config['user'],
-            password=db_config['password']
+            password=db_config['password'],
+            pool_min_size=int(pool_config.get('min_size', cls.pool_min_size)),
+            pool_max_size=int(pool_config.get('max_size', cls.pool_max_size)),
+            pool_timeout=float(pool_config.get('timeout', cls.pool_timeout)),
+            backend=backend,
+            path=db_config.get('path'),
+            metrics_enabled=bool(instrumentation.get('enabled', cls.metrics_enabled)),
+            slow_query_threshold_ms=None if slow_query_ms is None else float(slow_query_ms),
+            cache_enabled=bool(cache_config.get('enabled', cls.cache_enabled)),
+            cache_max_entries=int(cache_config.get('max_entries', cls.cache_max_entries)),
+            cache_ttl=float(cache_config.get('ttl', cls.cache_ttl)),
+            prepared_statements=bool(db_config.get('prepared_statements', cls.prepared_statements)),
+            replicas=tuple(
+                (replica['host'], int(replica.get('port', db_config['port'])))
+                for replica in replica_config.get('hosts', ())
+            ),
+            replica_max_lag=float(replica_config.get('max_lag', cls.replica_max_lag)),
+            replica_check_interval=float(replica_config.get('check_interval', cls.replica_check_interval))
         )
 
+    def for_endpoint(self, host: str, port: int) -> 'DatabaseConfig':
+        # Same database and credentials on another server, e.g. a replica.
+        return replace(self, host=host, port=port, replicas=())
+
     def to_dict(self) -> dict:
         return {
             'host': self.host,
@@ -1,14 +1,64 @@
+import argparse
 import sys
+from datetime import datetime
 
-from config.config import DatabaseConfig
-from src.cmd.cli import BookingSystemCLI
+from src.utils.constants import DATETIME_FORMAT
+
+# Only the parser is built at import time; config, the service layer and the
+# database driver are imported once a command actually runs.
+
+
+def _parse_datetime(value: str) -> datetime:
+    try:
+        return datetime.strptime(value, DATETIME_FORMAT)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected {DATETIME_FORMAT}, got '{value}'")
+
+
+def _parse_offices(value: str) -> list[int]:
+    try:
+        return [int(office) for office in value.split(',') if office]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma separated office numbers, got '{value}'")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description='Office booking system. Without a command the interactive menu starts.'
+    )
+    commands = parser.add_subparsers(dest='command')
+
+    check = commands.add_parser('check', help='check whether an office is free (exit 1 when occupied)')
+    check.add_argument('office', type=int)
+    check.add_argument('start', type=_parse_datetime)
+    check.add_argument('end', type=_parse_datetime)
+
+    book = commands.add_parser('book', help='book an office (exit 1 when it could not be booked)')
+    book.add_argument('office', type=int)
+    book.add_argument('start', type=_parse_datetime)
+    book.add_argument('end', type=_parse_datetime)
+    book.add_argument('--name', required=True)
+    book.add_argument('--email', required=True)
+    book.add_argument('--phone', required=True)
+
+    free = commands.add_parser('free', help='list free slots per office')
+    free.add_argument('start', type=_parse_datetime)
+    free.add_argument('end', type=_parse_datetime)
+    free.add_argument('--min-minutes', type=int, default=0)
+    free.add_argument('--offices', type=_parse_offices, help='comma separated office numbers')
+    return parser
 
 
 def main() -> None:
+    args = build_parser().parse_args()
     try:
-        db_config = DatabaseConfig.from_yaml()
-        cli = BookingSystemCLI(db_config)
-        cli.run()
+        from config.config import DatabaseConfig
+        from src.cmd.cli import BookingSystemCLI
+        cli = BookingSystemCLI(DatabaseConfig.from_yaml(), long_running=args.command is None)
+        if args.command is None:
+            cli.run()
+        else:
+            sys.exit(cli.run_command(args))
     except Exception as e:
         print(f"Fatal error: {e}")
         sys.exit(1)
@@ -1,36 +1,92 @@
 # migrations/manager.py
 import os
-from typing import List, Tuple, Optional
+import time
+from dataclasses import dataclass
+from typing import List, Optional
 import psycopg2
 from psycopg2.extensions import connection
 import logging
 from src.utils.exceptions import DatabaseError, MigrationFileError
 from config.config import DatabaseConfig
+from src.repositories.pool import ConnectionPool
 
 logger = logging.getLogger(__name__)
 
+# Session advisory lock held for the whole run, so instances starting
+# together apply migrations one after another instead of racing.
+MIGRATION_LOCK_CLASS = 6
+
+# Files whose first line is this marker run in autocommit mode, for
+# statements such as CREATE INDEX CONCURRENTLY that refuse to run inside a
+# transaction block. Postgres also runs a multi-statement query as one
+# implicit transaction, so such a file must hold a single statement.
+NO_TRANSACTION_MARKER = '-- migrate:no-transaction'
+
+
+@dataclass
+class Migration:
+    version: str
+    direction: str
+    sql: str
+    transactional: bool
+
+
+@dataclass
+class MigrationTiming:
+    version: str
+    direction: str
+    seconds: float
+
 
 class MigrationManager:
-    def __init__(self, db_config: DatabaseConfig):
+    def __init__(
+            self,
+            db_config: DatabaseConfig,
+            pool: Optional[ConnectionPool] = None
+    ):
         self.db_config = db_config
+        self.pool = pool
         self.conn: Optional[connection] = None
         self.migrations_dir = os.path.join(
             os.path.dirname(__file__), 'versions'
         )
+        self._files: Optional[dict[tuple[str, str], str]] = None
+
+    def __enter__(self) -> 'MigrationManager':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
 
     def connect(self) -> None:
         try:
-            self.conn = psycopg2.connect(
-                host=self.db_config.host,
-                port=self.db_config.port,
-                database=self.db_config.name,
-                user=self.db_config.user,
-                password=self.db_config.password
-            )
-            self._ensure_migrations_table()
+            if self.pool is not None:
+                self.conn = self.pool.getconn()
+            else:
+                self.conn = psycopg2.connect(
+                    host=self.db_config.host,
+                    port=self.db_config.port,
+                    database=self.db_config.name,
+                    user=self.db_config.user,
+                    password=self.db_config.password
+                )
         except psycopg2.Error as e:
             raise DatabaseError(f"Failed to connect to database: {e}")
 
+    def _lock(self) -> None:
+        with self.conn.cursor() as cur:
+            cur.execute('SELECT pg_try_advisory_lock(%s, 0)', (MIGRATION_LOCK_CLASS,))
+            if not cur.fetchone()[0]:
+                logger.info("Waiting for another instance to finish migrating")
+                cur.execute('SELECT pg_advisory_lock(%s, 0)', (MIGRATION_LOCK_CLASS,))
+        self.conn.commit()
+
+    def _unlock(self) -> None:
+        self.conn.rollback()
+        with self.conn.cursor() as cur:
+            cur.execute('SELECT pg_advisory_unlock(%s, 0)', (MIGRATION_LOCK_CLASS,))
+        self.conn.commit()
+
     def _ensure_migrations_table(self) -> None:
         with self.conn.cursor() as cur:
             cur.execute('''
@@ -43,99 +99,165 @@ class MigrationManager:
             self.conn.commit()
 
     def get_applied_migrations(self) -> List[str]:
+        # Newest first, the order migrations are rolled back in.
         with self.conn.cursor() as cur:
+            cur.execute("SELECT to_regclass('migrations') IS NOT NULL")
+            if not cur.fetchone()[0]:
+                return []
             cur.execute('SELECT version FROM migrations ORDER BY id DESC')
             return [row[0] for row in cur.fetchall()]
 
-    def _parse_migration_file(self, file_path: str) -> Tuple[str, str]:
+    def _migration_files(self) -> dict[tuple[str, str], str]:
+        # (version, direction) -> path, listed once per manager.
+        if self._files is None:
+            self._files = {}
+            for entry in os.scandir(self.migrations_dir):
+                version, _, suffix = entry.name.partition('.')
+                if suffix in ('up.sql', 'down.sql'):
+                    self._files[version, suffix.removesuffix('.sql')] = entry.path
+        return self._files
+
+    def _read_migration_file(self, file_path: str) -> str:
         try:
             with open(file_path, 'r') as f:
-                content = f.read()
-            parts = content.split('-- +migrate Down')
-            if len(parts) != 2:
-                raise MigrationFileError(
-                    f"Invalid migration file format: {file_path}"
-                )
-            up_sql = parts[0].replace('-- +migrate Up', '').strip()
-            down_sql = parts[1].strip()
-            return up_sql, down_sql
+                return f.read()
         except IOError as e:
             raise MigrationFileError(f"Failed to read migration file: {e}")
 
-    def migrate(self, direction: str = 'up', steps: Optional[int] = None) -> None:
+    def _load(self, version: str, direction: str) -> Migration:
+        path = self._migration_files().get((version, direction))
+        if path is None:
+            raise MigrationFileError(f"Missing {direction} migration for version {version}")
+        sql = self._read_migration_file(path)
+        first_line = sql.lstrip().partition('\n')[0].strip()
+        return Migration(version, direction, sql, first_line != NO_TRANSACTION_MARKER)
+
+    def plan(self, direction: str = 'up', steps: Optional[int] = None) -> List[Migration]:
+        applied_migrations = self.get_applied_migrations()
+        if direction == 'up':
+            applied = set(applied_migrations)
+            pending = sorted(
+                version for version, file_direction in self._migration_files()
+                if file_direction == 'up' and version not in applied
+            )
+            return [self._load(version, 'up') for version in pending]
+        return [self._load(version, 'down') for version in applied_migrations[:steps or 1]]
+
+    def migrate(
+            self,
+            direction: str = 'up',
+            steps: Optional[int] = None,
+            single_transaction: bool = False,
+            dry_run: bool = False
+    ) -> List[MigrationTiming]:
+        # With single_transaction, consecutive transactional migrations are
+        # applied and committed together, so a failure leaves none of them
+        # behind. Migrations marked with NO_TRANSACTION_MARKER always run on
+        # their own in autocommit mode. A dry run only logs the plan.
         try:
             self.connect()
-            applied_migrations = self.get_applied_migrations()
+            if dry_run:
+                for migration in self.plan(direction, steps):
+                    logger.info(
+                        f"Would {'apply' if direction == 'up' else 'roll back'} {migration.version}"
+                        f"{'' if migration.transactional else ' (outside a transaction)'}"
+                    )
+                self.conn.rollback()
+                return []
 
-            if direction == 'up':
-                self._migrate_up(applied_migrations)
-            else:
-                self._migrate_down(applied_migrations, steps)
+            self._lock()
+            try:
+                self._ensure_migrations_table()
+                return self._run(self.plan(direction, steps), single_transaction)
+            finally:
+                self._unlock()
+        except psycopg2.Error as e:
+            raise DatabaseError(f"Migration failed: {e}")
         finally:
             self.close()
 
-    def _migrate_up(self, applied_migrations: List[str]) -> None:
-        all_migrations = sorted(
-            f for f in os.listdir(self.migrations_dir)
-            if f.endswith('.up.sql')
-        )
-
-        for filename in all_migrations:
-            version = filename.replace('.up.sql', '')
-            if version not in applied_migrations:
-                logger.info(f"Applying migration: {version}")
-                migration_path = os.path.join(self.migrations_dir, filename)
-                up_sql, _ = self._parse_migration_file(migration_path)
-                self._execute_migration(version, up_sql, is_up=True)
+    def _run(self, migrations: List[Migration], single_transaction: bool) -> List[MigrationTiming]:
+        timings, batch = [], []
+        for migration in migrations:
+            if not migration.transactional:
+                timings += self._execute_batch(batch)
+                batch = []
+                timings.append(self._execute_outside_transaction(migration))
+            elif single_transaction:
+                batch.append(migration)
+            else:
+                timings += self._execute_batch([migration])
+        timings += self._execute_batch(batch)
+        if timings:
+            logger.info(f"Ran {len(timings)} migrations in {sum(t.seconds for t in timings) * 1000:.0f} ms")
+        return timings
 
-    def _migrate_down(
-            self,
-            applied_migrations: List[str],
-            steps: Optional[int]
-    ) -> None:
-        steps = steps or 1
-        migrations_to_rollback = applied_migrations[:steps]
-
-        for version in migrations_to_rollback:
-            logger.info(f"Rolling back migration: {version}")
-            migration_path = os.path.join(
-                self.migrations_dir,
-                f"{version}.down.sql"
+    def _record(self, cur, migration: Migration) -> None:
+        if migration.direction == 'up':
+            cur.execute(
+                'INSERT INTO migrations (version) VALUES (%s)',
+                (migration.version,)
+            )
+        else:
+            cur.execute(
+                'DELETE FROM migrations WHERE version = %s',
+                (migration.version,)
             )
-            _, down_sql = self._parse_migration_file(migration_path)
-            self._execute_migration(version, down_sql, is_up=False)
 
-    def _execute_migration(
-            self,
-            version: str,
-            sql: str,
-            is_up: bool
-    ) -> None:
+    def _execute_batch(self, migrations: List[Migration]) -> List[MigrationTiming]:
+        timings = []
+        if not migrations:
+            return timings
+        migration = migrations[0]
         try:
             with self.conn.cursor() as cur:
-                cur.execute(sql)
-                if is_up:
-                    cur.execute(
-                        'INSERT INTO migrations (version) VALUES (%s)',
-                        (version,)
-                    )
-                else:
-                    cur.execute(
-                        'DELETE FROM migrations WHERE version = %s',
-                        (version,)
-                    )
-                self.conn.commit()
-                logger.info(
-                    f"Successfully {'applied' if is_up else 'rolled back'} "
-                    f"migration: {version}"
-                )
+                for migration in migrations:
+                    started = time.perf_counter()
+                    cur.execute(migration.sql)
+                    self._record(cur, migration)
+                    timings.append(self._timed(migration, started))
+            self.conn.commit()
         except psycopg2.Error as e:
             self.conn.rollback()
             raise DatabaseError(
-                f"Failed to {'apply' if is_up else 'roll back'} "
-                f"migration {version}: {e}"
+                f"Failed to {'apply' if migration.direction == 'up' else 'roll back'} "
+                f"migration {migration.version}: {e}"
+                + (f"; {len(timings)} earlier migrations in the batch were rolled back" if timings else '')
             )
+        return timings
+
+    def _execute_outside_transaction(self, migration: Migration) -> MigrationTiming:
+        # Reading the plan left a transaction open, and psycopg2 refuses to
+        # switch to autocommit inside one; nothing in it needs keeping.
+        self.conn.rollback()
+        started = time.perf_counter()
+        self.conn.autocommit = True
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute(migration.sql)
+                self._record(cur, migration)
+        except psycopg2.Error as e:
+            raise DatabaseError(
+                f"Failed to {'apply' if migration.direction == 'up' else 'roll back'} "
+                f"migration {migration.version} (outside a transaction): {e}"
+            )
+        finally:
+            self.conn.autocommit = False
+        return self._timed(migration, started)
+
+    @staticmethod
+    def _timed(migration: Migration, started: float) -> MigrationTiming:
+        timing = MigrationTiming(migration.version, migration.direction, time.perf_counter() - started)
+        logger.info(
+            f"{'Applied' if migration.direction == 'up' else 'Rolled back'} "
+            f"migration {migration.version} in {timing.seconds * 1000:.1f} ms"
+        )
+        return timing
 
     def close(self) -> None:
         if self.conn:
-            self.conn.close()
+            if self.pool is not None:
+                self.pool.putconn(self.conn)
+            else:
+                self.conn.close()
+            self.conn = None
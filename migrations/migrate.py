@@ -1,10 +1,23 @@
 import argparse
+import logging
+
+from config.config import DatabaseConfig
 from migrations.manager import MigrationManager
 
 
-def run_migrations(direction: str = 'up', steps: int = None):
-    with MigrationManager() as manager:
-        manager.migrate(direction=direction, steps=steps)
+def run_migrations(
+        direction: str = 'up',
+        steps: int = None,
+        single_transaction: bool = False,
+        dry_run: bool = False
+):
+    with MigrationManager(DatabaseConfig.from_yaml()) as manager:
+        return manager.migrate(
+            direction=direction,
+            steps=steps,
+            single_transaction=single_transaction,
+            dry_run=dry_run
+        )
 
 
 if __name__ == "__main__":
@@ -12,6 +25,17 @@ if __name__ == "__main__":
     parser.add_argument('--direction', choices=['up', 'down'], default='up',
                         help='Migration direction (up or down)')
     parser.add_argument('--steps', type=int, help='Number of migrations to roll back')
+    parser.add_argument('--single-transaction', action='store_true',
+                        help='Apply all pending migrations in one transaction '
+                             '(migrations marked -- migrate:no-transaction still run on their own)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Only list the migrations that would run')
 
     args = parser.parse_args()
-    run_migrations(direction=args.direction, steps=args.steps)
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    run_migrations(
+        direction=args.direction,
+        steps=args.steps,
+        single_transaction=args.single_transaction,
+        dry_run=args.dry_run
+    )
@@ -0,0 +1,2 @@
+ALTER TABLE bookings DROP CONSTRAINT IF EXISTS bookings_no_overlap;
+ALTER TABLE bookings DROP COLUMN IF EXISTS period;
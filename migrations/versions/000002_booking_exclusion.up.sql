@@ -0,0 +1,38 @@
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+ALTER TABLE bookings
+ADD COLUMN period TSRANGE
+GENERATED ALWAYS AS (tsrange(start_time, end_time, '[)')) STORED;
+
+-- Bookings made before the constraint existed may already overlap, and
+-- ADD CONSTRAINT would then fail on the first clash without naming it.
+-- Every booking that starts before an earlier one of its office has ended
+-- is reported instead; move or delete one side of each clash, then run the
+-- migration again.
+DO $$
+DECLARE
+    clashes TEXT;
+BEGIN
+    SELECT string_agg(format('%s (office %s)', id, office_number), ', ' ORDER BY office_number, id)
+    INTO clashes
+    FROM (
+        SELECT id, office_number, start_time,
+               max(end_time) OVER (
+                   PARTITION BY office_number
+                   ORDER BY start_time, id
+                   ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+               ) AS earlier_end
+        FROM bookings
+    ) AS ordered
+    WHERE earlier_end > start_time;
+
+    IF clashes IS NOT NULL THEN
+        RAISE EXCEPTION 'Cannot add bookings_no_overlap: bookings % overlap an earlier booking of their office', clashes
+            USING HINT = 'Move or delete the overlapping bookings, then run the migration again.';
+    END IF;
+END
+$$;
+
+ALTER TABLE bookings
+ADD CONSTRAINT bookings_no_overlap
+EXCLUDE USING gist (office_number WITH =, period WITH &&);
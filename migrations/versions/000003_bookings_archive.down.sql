@@ -0,0 +1,9 @@
+INSERT INTO bookings (id, office_number, user_name, user_email, user_phone, start_time, end_time, created_at)
+SELECT id, office_number, user_name, user_email, user_phone, start_time, end_time, created_at
+FROM bookings_archive;
+
+DROP VIEW IF EXISTS bookings_history;
+DROP FUNCTION IF EXISTS ensure_bookings_archive_partition(TIMESTAMP);
+DROP TABLE IF EXISTS bookings_archive_state;
+DROP TABLE IF EXISTS bookings_archive;
+DROP INDEX IF EXISTS idx_bookings_end_time;
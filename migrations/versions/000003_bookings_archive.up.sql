@@ -0,0 +1,78 @@
+CREATE INDEX IF NOT EXISTS idx_bookings_end_time ON bookings (end_time);
+
+CREATE TABLE IF NOT EXISTS bookings_archive (
+    id INTEGER NOT NULL,
+    office_number INTEGER,
+    user_name TEXT,
+    user_email TEXT,
+    user_phone TEXT,
+    start_time TIMESTAMP NOT NULL,
+    end_time TIMESTAMP,
+    created_at TIMESTAMP,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, start_time)
+) PARTITION BY RANGE (start_time);
+
+CREATE TABLE IF NOT EXISTS bookings_archive_default
+PARTITION OF bookings_archive DEFAULT;
+
+CREATE INDEX IF NOT EXISTS idx_bookings_archive_office_time
+ON bookings_archive (office_number, start_time, end_time);
+
+CREATE TABLE IF NOT EXISTS bookings_archive_state (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    archived_before TIMESTAMP,
+    max_duration INTERVAL NOT NULL DEFAULT INTERVAL '0'
+);
+
+INSERT INTO bookings_archive_state (id) VALUES (TRUE) ON CONFLICT DO NOTHING;
+
+-- Creates the month's partition if it is missing. Rows archived before
+-- the partition existed sit in bookings_archive_default, and attaching over
+-- them would fail, so the partition is built detached, the month's rows are
+-- moved into it, and it is attached afterwards, all in the caller's
+-- transaction.
+CREATE OR REPLACE FUNCTION ensure_bookings_archive_partition(month_start TIMESTAMP)
+RETURNS VOID AS $$
+DECLARE
+    partition_name TEXT := 'bookings_archive_' || to_char(month_start, 'YYYY_MM');
+    range_start TIMESTAMP := date_trunc('month', month_start);
+    range_end TIMESTAMP := date_trunc('month', month_start) + INTERVAL '1 month';
+BEGIN
+    IF to_regclass(quote_ident(partition_name)) IS NOT NULL THEN
+        RETURN;
+    END IF;
+
+    -- SHARE ROW EXCLUSIVE conflicts with itself, so concurrent callers for
+    -- the same month queue here and the loser finds the partition made.
+    LOCK TABLE bookings_archive_default IN SHARE ROW EXCLUSIVE MODE;
+    IF to_regclass(quote_ident(partition_name)) IS NOT NULL THEN
+        RETURN;
+    END IF;
+
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE bookings_archive INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+        partition_name
+    );
+    EXECUTE format(
+        'WITH moved AS (
+            DELETE FROM bookings_archive_default
+            WHERE start_time >= %L AND start_time < %L
+            RETURNING *
+        )
+        INSERT INTO %I SELECT * FROM moved',
+        range_start, range_end, partition_name
+    );
+    EXECUTE format(
+        'ALTER TABLE bookings_archive ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        partition_name, range_start, range_end
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE VIEW bookings_history AS
+SELECT id, office_number, user_name, user_email, user_phone, start_time, end_time, created_at
+FROM bookings
+UNION ALL
+SELECT id, office_number, user_name, user_email, user_phone, start_time, end_time, created_at
+FROM bookings_archive;
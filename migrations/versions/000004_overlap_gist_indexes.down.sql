@@ -0,0 +1,4 @@
+CREATE INDEX IF NOT EXISTS idx_bookings_office_time
+ON bookings (office_number, start_time, end_time);
+
+DROP INDEX IF EXISTS idx_bookings_archive_office_period;
@@ -0,0 +1,4 @@
+CREATE INDEX IF NOT EXISTS idx_bookings_archive_office_period
+ON bookings_archive USING gist (office_number, tsrange(start_time, end_time, '[)'));
+
+DROP INDEX IF EXISTS idx_bookings_office_time;
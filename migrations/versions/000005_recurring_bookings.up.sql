@@ -0,0 +1,20 @@
+CREATE TABLE IF NOT EXISTS recurring_bookings (
+    id SERIAL PRIMARY KEY,
+    office_number INTEGER NOT NULL,
+    user_name TEXT,
+    user_email TEXT,
+    user_phone TEXT,
+    start_time TIMESTAMP NOT NULL,
+    end_time TIMESTAMP NOT NULL,
+    frequency TEXT NOT NULL CHECK (frequency IN ('daily', 'weekly')),
+    repeat_interval INTEGER NOT NULL DEFAULT 1 CHECK (repeat_interval > 0),
+    repeat_until TIMESTAMP,
+    repeat_count INTEGER CHECK (repeat_count > 0),
+    -- End of the last occurrence, NULL while the series repeats forever.
+    series_end TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CHECK (end_time > start_time)
+);
+
+CREATE INDEX IF NOT EXISTS idx_recurring_bookings_office_time
+ON recurring_bookings (office_number, start_time, series_end);
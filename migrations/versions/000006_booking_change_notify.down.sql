@@ -0,0 +1,8 @@
+DROP TRIGGER IF EXISTS recurring_bookings_notify_delete ON recurring_bookings;
+DROP TRIGGER IF EXISTS recurring_bookings_notify_insert ON recurring_bookings;
+DROP FUNCTION IF EXISTS notify_recurring_bookings_changed();
+DROP TRIGGER IF EXISTS bookings_notify_update_new ON bookings;
+DROP TRIGGER IF EXISTS bookings_notify_update_old ON bookings;
+DROP TRIGGER IF EXISTS bookings_notify_delete ON bookings;
+DROP TRIGGER IF EXISTS bookings_notify_insert ON bookings;
+DROP FUNCTION IF EXISTS notify_bookings_changed();
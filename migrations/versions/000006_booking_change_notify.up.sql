@@ -0,0 +1,65 @@
+-- Statement-level triggers send one notification per office and statement,
+-- so bulk imports and archival runs do not flood the channel.
+CREATE OR REPLACE FUNCTION notify_bookings_changed() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify(
+        'bookings_changed',
+        json_build_object(
+            'office_number', office_number,
+            'start_time', min(start_time),
+            'end_time', max(end_time)
+        )::text
+    )
+    FROM changed_rows
+    GROUP BY office_number;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER bookings_notify_insert
+AFTER INSERT ON bookings
+REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_bookings_changed();
+
+CREATE TRIGGER bookings_notify_delete
+AFTER DELETE ON bookings
+REFERENCING OLD TABLE AS changed_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_bookings_changed();
+
+CREATE TRIGGER bookings_notify_update_old
+AFTER UPDATE ON bookings
+REFERENCING OLD TABLE AS changed_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_bookings_changed();
+
+CREATE TRIGGER bookings_notify_update_new
+AFTER UPDATE ON bookings
+REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_bookings_changed();
+
+-- A series can touch any day from its start on, so its office is
+-- invalidated from the first occurrence onwards.
+CREATE OR REPLACE FUNCTION notify_recurring_bookings_changed() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify(
+        'bookings_changed',
+        json_build_object(
+            'office_number', office_number,
+            'start_time', min(start_time),
+            'end_time', NULL
+        )::text
+    )
+    FROM changed_rows
+    GROUP BY office_number;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER recurring_bookings_notify_insert
+AFTER INSERT ON recurring_bookings
+REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_recurring_bookings_changed();
+
+CREATE TRIGGER recurring_bookings_notify_delete
+AFTER DELETE ON recurring_bookings
+REFERENCING OLD TABLE AS changed_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_recurring_bookings_changed();
@@ -0,0 +1,3 @@
+DROP TRIGGER IF EXISTS offices_notify_changed ON offices;
+DROP FUNCTION IF EXISTS notify_offices_changed();
+DROP TABLE IF EXISTS offices;
@@ -0,0 +1,25 @@
+CREATE TABLE IF NOT EXISTS offices (
+    office_number INTEGER PRIMARY KEY,
+    site TEXT NOT NULL,
+    capacity INTEGER NOT NULL DEFAULT 1 CHECK (capacity > 0),
+    attributes TEXT[] NOT NULL DEFAULT '{}',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- The five offices that used to be hard-coded.
+INSERT INTO offices (office_number, site)
+SELECT office_number, 'main'
+FROM generate_series(1, 5) AS office_number
+ON CONFLICT (office_number) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION notify_offices_changed() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('offices_changed', '{}');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER offices_notify_changed
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON offices
+FOR EACH STATEMENT EXECUTE FUNCTION notify_offices_changed();
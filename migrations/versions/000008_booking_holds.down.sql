@@ -0,0 +1 @@
+DROP TABLE IF EXISTS booking_holds;
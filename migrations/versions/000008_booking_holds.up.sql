@@ -0,0 +1,28 @@
+-- Short holds taken while a booking is completed. They are taken under the
+-- office's exclusive advisory lock and checked by every booking under the
+-- shared one, so a hold and a booking never both win the same slot. Rows
+-- past expires_at are ignored and cleared by the next hold on the office.
+CREATE TABLE IF NOT EXISTS booking_holds (
+    hold_id TEXT PRIMARY KEY,
+    office_number INTEGER NOT NULL,
+    start_time TIMESTAMP NOT NULL,
+    end_time TIMESTAMP NOT NULL,
+    expires_at TIMESTAMP NOT NULL,
+    period TSRANGE GENERATED ALWAYS AS (tsrange(start_time, end_time, '[)')) STORED,
+    CHECK (end_time > start_time)
+);
+
+CREATE INDEX IF NOT EXISTS idx_booking_holds_office_period
+ON booking_holds USING gist (office_number, period);
+
+-- Holds count as conflicts, so taking and dropping them is announced on
+-- bookings_changed like any booking.
+CREATE TRIGGER booking_holds_notify_insert
+AFTER INSERT ON booking_holds
+REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_bookings_changed();
+
+CREATE TRIGGER booking_holds_notify_delete
+AFTER DELETE ON booking_holds
+REFERENCING OLD TABLE AS changed_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_bookings_changed();
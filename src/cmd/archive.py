@@ -0,0 +1,32 @@
+import argparse
+import logging
+import sys
+from datetime import datetime, timedelta
+
+from config.config import DatabaseConfig
+from src.repositories.database import Database
+from src.utils.exceptions import BookingSystemError
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Move closed bookings into the partitioned archive')
+    parser.add_argument('--older-than-days', type=int, default=30,
+                        help='Archive bookings that ended more than this many days ago')
+    parser.add_argument('--batch-size', type=int, default=10000)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    before = datetime.now() - timedelta(days=args.older_than_days)
+    try:
+        with Database(DatabaseConfig.from_yaml()) as db:
+            archived = db.archive_bookings(before, args.batch_size)
+    except BookingSystemError as e:
+        logger.error(f"Archival failed: {e}")
+        sys.exit(1)
+    logger.info(f"Archived {archived} bookings that ended before {before:%Y-%m-%d %H:%M}")
+
+
+if __name__ == '__main__':
+    main()
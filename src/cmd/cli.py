@@ -1,17 +1,15 @@
-from datetime import datetime
+import argparse
+from datetime import datetime, timedelta
 import sys
 from dataclasses import dataclass
 
 from config.config import DatabaseConfig
-from src.utils.constants import DATETIME_FORMAT
-from src.models.models import BookingRequest
-from src.services.booking import OfficeBookingSystem
-from src.repositories.database import Database
-from src.services.notification import NotificationManager, EmailService, SMSService
+from src.utils.constants import DATETIME_FORMAT, Messages
+from src.models.models import BookingRequest, Occupancy, TimeWindow, RecurrenceRule, RecurringBooking
 from src.utils.exceptions import BookingSystemError
 
 
-@dataclass
+@dataclass(slots=True)
 class UserInput:
     office_number: int
     start_time: datetime
@@ -22,25 +20,84 @@ class UserInput:
 
 
 class BookingSystemCLI:
-    def __init__(self, db_config: DatabaseConfig):
+    def __init__(self, db_config: DatabaseConfig, long_running: bool = True):
         self.db_config = db_config
-        self.database = Database(self.db_config)
-        self.notification_manager = NotificationManager(
-            email_service=EmailService(),
-            sms_service=SMSService()
-        )
-        self.booking_system = OfficeBookingSystem(
-            database=self.database,
-            notification_manager=self.notification_manager
-        )
+        self.long_running = long_running
+        self._booking_system = None
+
+    # Built on first use, so the menu and --help come up without the service
+    # modules or a database connection, and a database that is briefly down
+    # only fails the command that needs it.
+    @property
+    def booking_system(self):
+        if self._booking_system is None:
+            from src.repositories.factory import create_repository
+            from src.services.booking import OfficeBookingSystem
+            from src.services.notification import (
+                NotificationManager,
+                NotificationDispatcher,
+                EmailService,
+                SMSService
+            )
+            self._booking_system = OfficeBookingSystem(
+                database=create_repository(self.db_config, self.long_running),
+                notification_manager=NotificationManager(
+                    email_service=EmailService(),
+                    sms_service=SMSService(),
+                    dispatcher=NotificationDispatcher()
+                )
+            )
+        return self._booking_system
+
+    def close(self) -> None:
+        if self._booking_system is not None:
+            self._booking_system.notification_manager.close()
+            self._booking_system.db.close()
+            self._booking_system = None
+
+    def run_command(self, args: argparse.Namespace) -> int:
+        # Non-interactive entry point; returns the process exit code: 0 when
+        # the office is free or booked, 1 when it is occupied or invalid.
+        try:
+            match args.command:
+                case 'check':
+                    result = self.booking_system.check_availability(args.office, args.start, args.end)
+                    print(result)
+                    return 0 if result == Messages.AVAILABLE.format(args.office) else 1
+                case 'book':
+                    result = self.booking_system.book_office(BookingRequest(
+                        office_number=args.office,
+                        user_name=args.name,
+                        user_email=args.email,
+                        user_phone=args.phone,
+                        start_time=args.start,
+                        end_time=args.end
+                    ))
+                    print(result)
+                    return 0 if result == Messages.BOOKING_SUCCESS.format(args.office) else 1
+                case 'free':
+                    self.print_free_slots(
+                        TimeWindow(args.start, args.end),
+                        timedelta(minutes=args.min_minutes),
+                        args.offices
+                    )
+                    return 0
+        except BookingSystemError as e:
+            print(f"Error: {e}")
+            return 1
+        finally:
+            self.close()
 
     def run(self) -> None:
         while True:
             print("\nOffice Booking System")
             print("1. Check office availability")
             print("2. Book an office")
-            print("3. Exit")
-            choice = input("Enter your choice (1-3): ").strip()
+            print("3. Find free offices")
+            print("4. Import bookings from file")
+            print("5. Book a recurring office slot")
+            print("6. Exit")
+            choice = input("Enter your choice (1-6): ").strip()
 
             try:
                 match choice:
@@ -48,7 +105,13 @@ class BookingSystemCLI:
                         self.handle_availability_check()
                     case '2':
                         self.handle_booking()
-                    case '3' | 'q' | 'quit':
+                    case '3':
+                        self.handle_free_slots()
+                    case '4':
+                        self.handle_import()
+                    case '5':
+                        self.handle_recurring_booking()
+                    case '6' | 'q' | 'quit':
                         self.handle_exit()
                     case _:
                         print("Invalid choice. Please try again.")
@@ -69,21 +132,105 @@ class BookingSystemCLI:
         print(result)
 
     def handle_booking(self) -> None:
+        # The slot is held as soon as the times are entered, so it cannot be
+        # taken while the contact details are typed in.
+        basic_input = self.get_basic_input()
+        held = self.booking_system.hold_slot(
+            basic_input.office_number,
+            basic_input.start_time,
+            basic_input.end_time
+        )
+        if not held.held:
+            print(held.error or self.occupied_message(basic_input.office_number, held.conflicts[0]))
+            return
+        print(Messages.HOLD_SUCCESS.format(basic_input.office_number, int(self.booking_system.hold_ttl)))
+
+        # A confirmed hold is consumed by the booking; any other outcome
+        # gives the slot back straight away rather than at expiry.
+        try:
+            user_input = self.get_booking_input(basic_input)
+            result = self.booking_system.confirm_hold(held.hold.hold_id, BookingRequest(
+                office_number=user_input.office_number,
+                start_time=user_input.start_time,
+                end_time=user_input.end_time,
+                user_name=user_input.user_name,
+                user_email=user_input.user_email,
+                user_phone=user_input.user_phone
+            ))
+        except BaseException:
+            self.booking_system.release_hold(held.hold.hold_id)
+            raise
+        if result.error:
+            self.booking_system.release_hold(held.hold.hold_id)
+
+        if result.error:
+            print(result.error)
+        elif result.conflicts:
+            print(self.occupied_message(user_input.office_number, result.conflicts[0]))
+        else:
+            print(Messages.BOOKING_SUCCESS.format(user_input.office_number))
+
+    def handle_recurring_booking(self) -> None:
         user_input = self.get_booking_input()
-        booking_request = BookingRequest(
+        frequency = input("Repeat daily or weekly: ").strip().lower()
+        interval = input("Repeat every N days/weeks (default 1): ").strip()
+        until = input(f"Repeat until ({DATETIME_FORMAT}, blank for no end date): ").strip()
+        count = input("Number of occurrences (blank for no limit): ").strip()
+
+        booking = RecurringBooking(
             office_number=user_input.office_number,
-            start_time=user_input.start_time,
-            end_time=user_input.end_time,
             user_name=user_input.user_name,
             user_email=user_input.user_email,
-            user_phone=user_input.user_phone
+            user_phone=user_input.user_phone,
+            start_time=user_input.start_time,
+            end_time=user_input.end_time,
+            rule=RecurrenceRule(
+                frequency=frequency,
+                interval=int(interval or 1),
+                until=datetime.strptime(until, DATETIME_FORMAT) if until else None,
+                count=int(count) if count else None
+            )
         )
+        print(self.booking_system.book_recurring(booking))
 
-        result = self.booking_system.book_office(booking_request)
-        print(result)
+    def handle_free_slots(self) -> None:
+        start_time = self.get_datetime("Enter window start")
+        end_time = self.get_datetime("Enter window end")
+        min_minutes = input("Minimum free duration in minutes (default 0): ").strip()
+        min_duration = timedelta(minutes=int(min_minutes or 0))
+        self.print_free_slots(TimeWindow(start_time, end_time), min_duration)
 
-    @staticmethod
-    def handle_exit():
+    def print_free_slots(
+            self,
+            window: TimeWindow,
+            min_duration: timedelta,
+            offices: list[int] | None = None
+    ) -> None:
+        free_slots = self.booking_system.find_free_slots(window, min_duration, offices)
+        for office_number, slots in free_slots.items():
+            if not slots:
+                print(f"Office {office_number}: no free slots")
+                continue
+            print(f"Office {office_number}:")
+            for slot in slots:
+                print(f"  {slot.start_time:{DATETIME_FORMAT}} - {slot.end_time:{DATETIME_FORMAT}}")
+
+    def handle_import(self) -> None:
+        from src.cmd.importer import read_booking_requests
+        path = input("Enter path to a .csv or .jsonl file: ").strip()
+        booking_requests = list(read_booking_requests(path))
+        results = self.booking_system.book_many(booking_requests)
+
+        for line, result in enumerate(results, start=1):
+            if result.error:
+                print(f"#{line}: {result.error}")
+            elif not result.booked:
+                print(f"#{line}: " + self.occupied_message(result.request.office_number, result.conflicts[0]))
+        booked = sum(result.booked for result in results)
+        print(Messages.IMPORT_SUMMARY.format(booked, len(results)))
+
+    def handle_exit(self):
+        self.close()
         print("Thank you for using the Office Booking System. Goodbye!")
         sys.exit(0)
 
@@ -98,8 +245,8 @@ class BookingSystemCLI:
             end_time=end_time
         )
 
-    def get_booking_input(self) -> UserInput:
-        basic_input = self.get_basic_input()
+    def get_booking_input(self, basic_input: UserInput | None = None) -> UserInput:
+        basic_input = basic_input or self.get_basic_input()
         user_name = input("Enter your name: ").strip()
         user_email = input("Enter your email: ").strip()
         user_phone = input("Enter your phone number: ").strip()
@@ -113,12 +260,21 @@ class BookingSystemCLI:
             user_phone=user_phone
         )
 
+    @staticmethod
+    def occupied_message(office_number: int, occupancy: Occupancy) -> str:
+        return Messages.OCCUPIED.format(
+            office_number,
+            occupancy.user_name,
+            occupancy.start_time,
+            occupancy.end_time
+        )
+
     @staticmethod
     def get_office_number() -> int:
         try:
-            return int(input("Enter office number (1-5): "))
+            return int(input("Enter office number: "))
         except ValueError:
-            raise ValueError("Office number must be a number between 1 and 5")
+            raise ValueError("Office number must be a number")
 
     @staticmethod
     def get_datetime(prompt: str) -> datetime:
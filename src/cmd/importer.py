@@ -0,0 +1,49 @@
+import csv
+import json
+from pathlib import Path
+from typing import Iterator
+
+from src.models.models import BookingRequest
+from src.utils.validators import parse_datetime
+
+BOOKING_FIELDS = (
+    'office_number',
+    'user_name',
+    'user_email',
+    'user_phone',
+    'start_time',
+    'end_time'
+)
+
+
+def _to_booking_request(record: dict, line: int) -> BookingRequest:
+    missing = [name for name in BOOKING_FIELDS if record.get(name) in (None, '')]
+    if missing:
+        raise ValueError(f"Line {line}: missing fields {', '.join(missing)}")
+    try:
+        return BookingRequest(
+            office_number=int(record['office_number']),
+            user_name=str(record['user_name']).strip(),
+            user_email=str(record['user_email']).strip(),
+            user_phone=str(record['user_phone']).strip(),
+            start_time=parse_datetime(str(record['start_time'])),
+            end_time=parse_datetime(str(record['end_time']))
+        )
+    except ValueError as e:
+        raise ValueError(f"Line {line}: {e}")
+
+
+def read_booking_requests(path: str | Path) -> Iterator[BookingRequest]:
+    path = Path(path)
+    with open(path, newline='') as f:
+        if path.suffix in ('.jsonl', '.ndjson', '.json'):
+            for line, raw in enumerate(f, start=1):
+                if raw.strip():
+                    yield _to_booking_request(json.loads(raw), line)
+        elif path.suffix == '.csv':
+            for line, record in enumerate(csv.DictReader(f), start=2):
+                yield _to_booking_request(record, line)
+        else:
+            raise ValueError(
+                f"Unsupported import format '{path.suffix}', use .csv or .jsonl"
+            )
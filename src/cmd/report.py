@@ -0,0 +1,62 @@
+import argparse
+import logging
+import sys
+
+from config.config import DatabaseConfig
+from src.repositories.factory import create_repository
+from src.services.reports import (
+    daily_peaks,
+    daily_usage,
+    histogram_records,
+    hourly_histogram,
+    stream_occupancy,
+    write_csv,
+    write_jsonl,
+)
+from src.utils.exceptions import BookingSystemError
+from src.utils.validators import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+WRITERS = {'csv': write_csv, 'jsonl': write_jsonl}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Stream occupancy reports as CSV or JSON lines')
+    parser.add_argument('report', choices=['usage', 'peaks', 'hourly', 'bookings'])
+    parser.add_argument('--start', type=parse_datetime, required=True)
+    parser.add_argument('--end', type=parse_datetime, required=True)
+    parser.add_argument('--offices', type=lambda value: [int(office) for office in value.split(',')])
+    parser.add_argument('--format', choices=sorted(WRITERS), default='csv')
+    parser.add_argument('--output', help='Write here instead of stdout')
+    parser.add_argument('--top-users', type=int, default=3)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    try:
+        with create_repository(DatabaseConfig.from_yaml()) as repo:
+            rows = stream_occupancy(repo, args.start, args.end, args.offices)
+            match args.report:
+                case 'usage':
+                    records = daily_usage(rows, args.start, args.end, args.top_users)
+                case 'peaks':
+                    records = daily_peaks(rows)
+                case 'hourly':
+                    records = histogram_records(hourly_histogram(rows, args.start, args.end))
+                case _:
+                    records = rows
+
+            out = open(args.output, 'w', newline='') if args.output else sys.stdout
+            try:
+                written = WRITERS[args.format](records, out)
+            finally:
+                if args.output:
+                    out.close()
+    except BookingSystemError as e:
+        logger.error(f"Report failed: {e}")
+        sys.exit(1)
+    logger.info(f"Wrote {written} {args.report} records")
+
+
+if __name__ == '__main__':
+    main()
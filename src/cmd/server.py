@@ -0,0 +1,393 @@
+import argparse
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from functools import partial
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qs
+
+from config.config import DatabaseConfig
+from src.models.models import BookingRequest, TimeWindow
+from src.services.booking import OfficeBookingSystem
+from src.utils.exceptions import BookingSystemError, DatabaseError, ValidationError
+from src.utils.metrics import registry
+from src.utils.validators import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_SIZE = 1024 * 1024
+JSON_CONTENT_TYPE = 'application/json'
+
+
+class HTTPError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _to_json(value) -> bytes:
+    return json.dumps(value, default=lambda o: o.isoformat() if isinstance(o, datetime) else str(o)).encode()
+
+
+def _parse_datetime(value: str | None, name: str) -> datetime:
+    if not value:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"Missing '{name}'")
+    try:
+        return parse_datetime(value)
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"Invalid datetime for '{name}': {value}")
+
+
+def _parse_int(value, name: str) -> int:
+    # JSON bodies can carry true or 2.5, which int() would quietly turn into
+    # 1 and 2.
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"'{name}' must be an integer")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"'{name}' must be an integer")
+
+
+def _content_length(value: str | None) -> int | None:
+    # None unless the header is absent or plain ASCII digits; int() would
+    # also take signs, underscores and surrounding whitespace.
+    if value is None:
+        return 0
+    if not (value.isascii() and value.isdigit()):
+        return None
+    return int(value)
+
+
+def _parse_offices(query: dict) -> list[int] | None:
+    if not query.get('offices'):
+        return None
+    return [_parse_int(office, 'offices') for office in query['offices'].split(',')]
+
+
+class BookingHTTPServer:
+    def __init__(
+            self,
+            booking_system: OfficeBookingSystem,
+            max_workers: int = DatabaseConfig.pool_max_size,
+            max_pending: int = 256
+    ):
+        self.booking_system = booking_system
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='booking-api')
+        self.max_pending = max_pending
+        self._pending: asyncio.Semaphore | None = None
+        self.routes = {
+            ('GET', '/health'): self.health,
+            ('GET', '/metrics'): self.metrics,
+            ('GET', '/availability'): self.availability,
+            ('POST', '/bookings'): self.book,
+            ('POST', '/holds'): self.hold,
+            ('DELETE', '/holds'): self.release_hold,
+            ('GET', '/free-slots'): self.free_slots,
+            ('GET', '/free-offices'): self.free_offices,
+            ('GET', '/common-slot'): self.common_slot,
+            ('GET', '/offices'): self.offices,
+        }
+
+    async def _run_blocking(self, func, *args):
+        # Blocking repository calls run on a bounded executor; the semaphore
+        # sheds load instead of letting the executor queue grow without bound.
+        if self._pending.locked():
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "Server is overloaded, retry later")
+        async with self._pending:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, partial(func, *args))
+
+    async def health(self, query: dict, body: bytes):
+        return HTTPStatus.OK, {'status': 'ok'}
+
+    async def metrics(self, query: dict, body: bytes):
+        return HTTPStatus.OK, registry.to_prometheus()
+
+    async def availability(self, query: dict, body: bytes):
+        office_number = _parse_int(query.get('office'), 'office')
+        start_time = _parse_datetime(query.get('start'), 'start')
+        end_time = _parse_datetime(query.get('end'), 'end')
+        conflicts = await self._run_blocking(
+            self.booking_system.find_conflicts, office_number, start_time, end_time
+        )
+        return HTTPStatus.OK, {
+            'office_number': office_number,
+            'available': not conflicts,
+            'conflicts': [asdict(occupancy) for occupancy in conflicts],
+        }
+
+    @staticmethod
+    def _parse_object(body: bytes, what: str) -> dict:
+        try:
+            payload = json.loads(body or b'{}')
+        except json.JSONDecodeError as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Invalid JSON body: {e}")
+        if not isinstance(payload, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"{what} must be a JSON object")
+        return payload
+
+    async def book(self, query: dict, body: bytes):
+        payload = self._parse_object(body, 'Booking')
+        booking_request = BookingRequest(
+            office_number=_parse_int(payload.get('office_number'), 'office_number'),
+            user_name=str(payload.get('user_name', '')),
+            user_email=str(payload.get('user_email', '')),
+            user_phone=str(payload.get('user_phone', '')),
+            start_time=_parse_datetime(payload.get('start_time'), 'start_time'),
+            end_time=_parse_datetime(payload.get('end_time'), 'end_time')
+        )
+        hold_id = payload.get('hold_id')
+        if hold_id is not None:
+            result = await self._run_blocking(self.booking_system.confirm_hold, str(hold_id), booking_request)
+        else:
+            result = await self._run_blocking(self.booking_system.book, booking_request)
+        if result.error:
+            return HTTPStatus.BAD_REQUEST, {'error': result.error, 'fields': result.field_errors}
+        if result.conflicts:
+            return HTTPStatus.CONFLICT, {
+                'booked': False,
+                'conflicts': [asdict(occupancy) for occupancy in result.conflicts],
+            }
+        return HTTPStatus.CREATED, {'booked': True, 'booking': asdict(booking_request)}
+
+    async def hold(self, query: dict, body: bytes):
+        payload = self._parse_object(body, 'Hold')
+        office_number = _parse_int(payload.get('office_number'), 'office_number')
+        result = await self._run_blocking(
+            self.booking_system.hold_slot,
+            office_number,
+            _parse_datetime(payload.get('start_time'), 'start_time'),
+            _parse_datetime(payload.get('end_time'), 'end_time')
+        )
+        if result.error:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, result.error)
+        if result.conflicts:
+            return HTTPStatus.CONFLICT, {
+                'held': False,
+                'conflicts': [asdict(occupancy) for occupancy in result.conflicts],
+            }
+        return HTTPStatus.CREATED, {
+            'held': True,
+            'hold_id': result.hold.hold_id,
+            'expires_in': self.booking_system.hold_ttl,
+        }
+
+    async def release_hold(self, query: dict, body: bytes):
+        hold_id = query.get('hold_id')
+        if not hold_id:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Missing 'hold_id'")
+        if not await self._run_blocking(self.booking_system.release_hold, hold_id):
+            raise HTTPError(HTTPStatus.NOT_FOUND, "No such hold")
+        return HTTPStatus.OK, {'released': True}
+
+    async def free_slots(self, query: dict, body: bytes):
+        window = TimeWindow(
+            _parse_datetime(query.get('start'), 'start'),
+            _parse_datetime(query.get('end'), 'end')
+        )
+        min_duration = timedelta(minutes=_parse_int(query.get('min_minutes', 0), 'min_minutes'))
+        offices = _parse_offices(query)
+        free_slots = await self._run_blocking(
+            self.booking_system.find_free_slots, window, min_duration, offices
+        )
+        return HTTPStatus.OK, {
+            str(office_number): [
+                {'start_time': slot.start_time, 'end_time': slot.end_time} for slot in slots
+            ]
+            for office_number, slots in free_slots.items()
+        }
+
+    async def free_offices(self, query: dict, body: bytes):
+        window = TimeWindow(
+            _parse_datetime(query.get('start'), 'start'),
+            _parse_datetime(query.get('end'), 'end')
+        )
+        free_offices = await self._run_blocking(
+            self.booking_system.find_free_offices, window, _parse_offices(query)
+        )
+        return HTTPStatus.OK, {'offices': free_offices}
+
+    async def common_slot(self, query: dict, body: bytes):
+        window = TimeWindow(
+            _parse_datetime(query.get('start'), 'start'),
+            _parse_datetime(query.get('end'), 'end')
+        )
+        duration = timedelta(minutes=_parse_int(query.get('minutes'), 'minutes'))
+        rooms = _parse_int(query.get('rooms', 1), 'rooms')
+        slots = await self._run_blocking(
+            self.booking_system.find_common_slot, window, duration, rooms, _parse_offices(query)
+        )
+        if not slots:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"No {rooms} offices are free together in the window")
+        return HTTPStatus.OK, {
+            'start_time': slots[0].start_time,
+            'end_time': slots[0].end_time,
+            'offices': [slot.office_number for slot in slots],
+        }
+
+    async def offices(self, query: dict, body: bytes):
+        min_capacity = query.get('min_capacity')
+        offices = await self._run_blocking(
+            self.booking_system.find_offices,
+            query.get('site'),
+            _parse_int(min_capacity, 'min_capacity') if min_capacity is not None else None,
+            query['attributes'].split(',') if query.get('attributes') else None
+        )
+        return HTTPStatus.OK, [
+            {
+                'office_number': office.office_number,
+                'site': office.site,
+                'capacity': office.capacity,
+                'attributes': sorted(office.attributes),
+            }
+            for office in offices
+        ]
+
+    async def dispatch(self, method: str, target: str, body: bytes) -> tuple[HTTPStatus, bytes, str]:
+        url = urlsplit(target)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        handler = self.routes.get((method, url.path))
+        try:
+            if handler is None:
+                allowed = any(path == url.path for _, path in self.routes)
+                raise HTTPError(
+                    HTTPStatus.METHOD_NOT_ALLOWED if allowed else HTTPStatus.NOT_FOUND,
+                    f"No route for {method} {url.path}"
+                )
+            status, payload = await handler(query, body)
+        except HTTPError as e:
+            status, payload = e.status, {'error': str(e)}
+        except ValidationError as e:
+            status, payload = HTTPStatus.BAD_REQUEST, {'error': str(e)}
+        except DatabaseError as e:
+            logger.error(f"Database error while serving {method} {url.path}: {e}")
+            status, payload = HTTPStatus.SERVICE_UNAVAILABLE, {'error': 'Database unavailable'}
+        except BookingSystemError as e:
+            status, payload = HTTPStatus.BAD_REQUEST, {'error': str(e)}
+        except Exception:
+            logger.exception(f"Unhandled error while serving {method} {url.path}")
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': 'Internal server error'}
+
+        if isinstance(payload, str):
+            return status, payload.encode(), 'text/plain; version=0.0.4'
+        return status, _to_json(payload), JSON_CONTENT_TYPE
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                # The body cannot be skipped without a valid length, so the
+                # connection is closed after the error.
+                length = _content_length(headers.get('content-length'))
+                if length is None or length > MAX_BODY_SIZE:
+                    if length is None:
+                        status, error = HTTPStatus.BAD_REQUEST, 'Invalid Content-Length'
+                    else:
+                        status, error = HTTPStatus.REQUEST_ENTITY_TOO_LARGE, 'Request body too large'
+                    payload, content_type = _to_json({'error': error}), JSON_CONTENT_TYPE
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b''
+                    status, payload, content_type = await self.dispatch(method, target, body)
+                    connection_header = headers.get('connection', '').lower()
+                    keep_alive = (connection_header != 'close' if version == 'HTTP/1.1'
+                                  else connection_header == 'keep-alive')
+
+                writer.write(
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                    "\r\n".encode('latin-1') + payload
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str, port: int) -> asyncio.AbstractServer:
+        self._pending = asyncio.Semaphore(self.max_pending)
+        return await asyncio.start_server(self.handle_connection, host, port, limit=MAX_BODY_SIZE)
+
+    async def serve_forever(self, host: str, port: int) -> None:
+        server = await self.start(host, port)
+        addresses = ', '.join(str(sock.getsockname()) for sock in server.sockets)
+        logger.info(f"Serving booking API on {addresses}")
+        async with server:
+            await server.serve_forever()
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
+
+
+def build_booking_system(db_config: DatabaseConfig) -> OfficeBookingSystem:
+    from src.repositories.factory import create_repository
+    from src.services.notification import (
+        NotificationManager,
+        NotificationDispatcher,
+        EmailService,
+        SMSService
+    )
+    return OfficeBookingSystem(
+        database=create_repository(db_config, long_running=True),
+        notification_manager=NotificationManager(
+            email_service=EmailService(),
+            sms_service=SMSService(),
+            dispatcher=NotificationDispatcher()
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Office booking HTTP API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int,
+                        help='Threads running blocking repository calls (default: database.pool.max_size)')
+    parser.add_argument('--max-pending', type=int, default=256,
+                        help='Requests allowed in flight before answering 503')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    db_config = DatabaseConfig.from_yaml()
+    # Workers beyond the pool size only wait on the pool, holding a request
+    # slot while they do.
+    workers = args.workers or db_config.pool_max_size
+    if workers > db_config.pool_max_size:
+        logger.warning("--workers %d exceeds database.pool.max_size %d", workers, db_config.pool_max_size)
+    booking_system = build_booking_system(db_config)
+    server = BookingHTTPServer(booking_system, workers, args.max_pending)
+    try:
+        asyncio.run(server.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        booking_system.notification_manager.close()
+        booking_system.db.close()
+
+
+if __name__ == '__main__':
+    main()
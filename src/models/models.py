@@ -1,7 +1,12 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 
-@dataclass
+# Every model is slotted, as whole days of bookings are held at once by the
+# caches, reports and imports. Small value types are frozen as well; the
+# ones built in bulk are not, since a frozen __init__ costs about twice as
+# much per instance.
+
+@dataclass(slots=True)
 class BookingRequest:
     office_number: int
     user_name: str
@@ -10,8 +15,73 @@ class BookingRequest:
     start_time: datetime
     end_time: datetime
 
-@dataclass
+@dataclass(slots=True)
 class Occupancy:
     user_name: str
     start_time: datetime
     end_time: datetime
+
+@dataclass(slots=True)
+class BookingResult:
+    request: BookingRequest
+    booking_id: int | None = None
+    conflicts: list[Occupancy] = field(default_factory=list)
+    error: str | None = None
+    field_errors: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def booked(self) -> bool:
+        return self.error is None and not self.conflicts
+
+@dataclass(slots=True, frozen=True)
+class Hold:
+    hold_id: str
+    office_number: int
+    start_time: datetime
+    end_time: datetime
+    expires_at: datetime
+
+@dataclass(slots=True)
+class HoldResult:
+    hold: Hold | None = None
+    conflicts: list[Occupancy] = field(default_factory=list)
+    error: str | None = None
+
+    @property
+    def held(self) -> bool:
+        return self.hold is not None
+
+@dataclass(slots=True, frozen=True)
+class TimeWindow:
+    start_time: datetime
+    end_time: datetime
+
+@dataclass(slots=True)
+class FreeSlot:
+    office_number: int
+    start_time: datetime
+    end_time: datetime
+
+@dataclass(slots=True, frozen=True)
+class RecurrenceRule:
+    frequency: str
+    interval: int = 1
+    until: datetime | None = None
+    count: int | None = None
+
+@dataclass(slots=True)
+class RecurringBooking:
+    office_number: int
+    user_name: str
+    user_email: str
+    user_phone: str
+    start_time: datetime
+    end_time: datetime
+    rule: RecurrenceRule
+
+@dataclass(slots=True, frozen=True)
+class Office:
+    office_number: int
+    site: str
+    capacity: int = 1
+    attributes: frozenset[str] = frozenset()
@@ -0,0 +1,229 @@
+import bisect
+import threading
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from src.models.models import Hold, Occupancy, RecurringBooking
+from src.repositories.holds import SlotHolds
+from src.utils.recurrence import occurrence_conflicts
+
+BookingRow = tuple[int, int, str, datetime, datetime]
+
+
+class _OfficeIntervals:
+    def __init__(self):
+        self.starts: list[datetime] = []
+        self.occupancies: list[Occupancy] = []
+        self.booking_ids: list[int] = []
+        self.max_duration = timedelta(0)
+
+    def add(self, booking_id: int, occupancy: Occupancy) -> None:
+        position = bisect.bisect_right(self.starts, occupancy.start_time)
+        self.starts.insert(position, occupancy.start_time)
+        self.occupancies.insert(position, occupancy)
+        self.booking_ids.insert(position, booking_id)
+        self.max_duration = max(
+            self.max_duration,
+            occupancy.end_time - occupancy.start_time
+        )
+
+    def remove(self, occupancy: Occupancy) -> None:
+        position = bisect.bisect_left(self.starts, occupancy.start_time)
+        while self.occupancies[position] is not occupancy:
+            position += 1
+        del self.starts[position]
+        del self.occupancies[position]
+        del self.booking_ids[position]
+
+    def _slice(self, start_time: datetime, end_time: datetime) -> slice:
+        # Nothing starting earlier than start_time - max_duration can still be
+        # running at start_time, so only that slice of the array is scanned.
+        lo = bisect.bisect_left(self.starts, start_time - self.max_duration)
+        hi = bisect.bisect_left(self.starts, end_time)
+        return slice(lo, hi)
+
+    def conflicts(self, start_time: datetime, end_time: datetime) -> list[Occupancy]:
+        return [
+            occupancy for occupancy in self.occupancies[self._slice(start_time, end_time)]
+            if occupancy.end_time > start_time
+        ]
+
+    def booking_ids_in(self, start_time: datetime, end_time: datetime) -> list[int]:
+        window = self._slice(start_time, end_time)
+        return [
+            booking_id
+            for booking_id, occupancy in zip(self.booking_ids[window], self.occupancies[window])
+            if occupancy.end_time > start_time
+        ]
+
+
+# Bookings per office kept sorted by start time, along with the series and
+# live holds. Every invalidate() bumps version, so a full reload that read
+# the tables before the reset can be told apart and dropped.
+class AvailabilityIndex:
+    def __init__(self):
+        self._offices: dict[int, _OfficeIntervals] = {}
+        self._bookings: dict[int, tuple[int, Occupancy]] = {}
+        self._rules: dict[int, dict[int, RecurringBooking]] = {}
+        self.holds = SlotHolds()
+        self._lock = threading.RLock()
+        self.version = 0
+        self.is_loaded = False
+
+    def load(self, rows: Iterable[BookingRow]) -> None:
+        with self._lock:
+            for row in rows:
+                self.add(*row)
+            self.is_loaded = True
+
+    def add(
+            self,
+            booking_id: int,
+            office_number: int,
+            user_name: str,
+            start_time: datetime,
+            end_time: datetime
+    ) -> None:
+        with self._lock:
+            if booking_id in self._bookings:
+                return
+            occupancy = Occupancy(user_name, start_time, end_time)
+            self._bookings[booking_id] = (office_number, occupancy)
+            intervals = self._offices.setdefault(office_number, _OfficeIntervals())
+            intervals.add(booking_id, occupancy)
+
+    def reload(
+            self,
+            rows: Iterable[BookingRow],
+            rules: Iterable[tuple[int, RecurringBooking]],
+            version: int,
+            holds: Iterable[Hold] = ()
+    ) -> bool:
+        # Replaces the contents with a full read of the tables started at
+        # `version`. Returns False, leaving the index unloaded, when it was
+        # invalidated since.
+        with self._lock:
+            if version != self.version:
+                return False
+            self._offices.clear()
+            self._bookings.clear()
+            self.holds.clear()
+            for hold in holds:
+                self.holds.add(hold)
+            self.load(rows)
+            self.load_rules(rules)
+            return True
+
+    def reload_window(
+            self,
+            office_number: int,
+            start_time: datetime,
+            end_time: datetime,
+            rows: Iterable[BookingRow],
+            holds: Iterable[Hold] = ()
+    ) -> None:
+        # Replaces the office's bookings and holds overlapping the window
+        # with a fresh read of it, which drops deleted rows along with
+        # adding new ones.
+        with self._lock:
+            if not self.is_loaded:
+                return
+            intervals = self._offices.get(office_number)
+            if intervals is not None:
+                for booking_id in intervals.booking_ids_in(start_time, end_time):
+                    self.remove(booking_id)
+            for row in rows:
+                self.add(*row)
+            self.holds.reload_window(office_number, start_time, end_time, list(holds))
+
+    def reload_rules(self, office_number: int, rules: Iterable[tuple[int, RecurringBooking]]) -> None:
+        with self._lock:
+            if not self.is_loaded:
+                return
+            self._rules[office_number] = dict(rules)
+
+    def load_rules(self, rules: Iterable[tuple[int, RecurringBooking]]) -> None:
+        with self._lock:
+            self._rules.clear()
+            for rule_id, booking in rules:
+                self.add_rule(rule_id, booking)
+
+    def add_rule(self, rule_id: int, booking: RecurringBooking) -> None:
+        with self._lock:
+            self._rules.setdefault(booking.office_number, {})[rule_id] = booking
+
+    def remove_rule(self, rule_id: int) -> None:
+        with self._lock:
+            for rules in self._rules.values():
+                rules.pop(rule_id, None)
+
+    def rules(self, office_number: int) -> list[RecurringBooking]:
+        with self._lock:
+            return list(self._rules.get(office_number, {}).values())
+
+    def remove(self, booking_id: int) -> None:
+        with self._lock:
+            entry = self._bookings.pop(booking_id, None)
+            if entry is not None:
+                office_number, occupancy = entry
+                self._offices[office_number].remove(occupancy)
+
+    def bookings(self, office_number: int, start_time: datetime, end_time: datetime) -> list[Occupancy]:
+        with self._lock:
+            intervals = self._offices.get(office_number)
+            if intervals is None:
+                return []
+            return intervals.conflicts(start_time, end_time)
+
+    def add_hold(self, hold: Hold) -> None:
+        with self._lock:
+            self.holds.add(hold)
+
+    def remove_hold(self, hold_id: str) -> None:
+        with self._lock:
+            self.holds.release(hold_id)
+
+    def occupancy(self, office_number: int, start_time: datetime, end_time: datetime) -> list[Occupancy]:
+        # Bookings and series occurrences, without holds.
+        with self._lock:
+            occupancy = self.bookings(office_number, start_time, end_time)
+            rules = self._rules.get(office_number)
+            if rules:
+                occupancy += occurrence_conflicts(rules.values(), start_time, end_time)
+                occupancy.sort(key=lambda entry: entry.start_time)
+            return occupancy
+
+    def conflicts(
+            self,
+            office_number: int,
+            start_time: datetime,
+            end_time: datetime,
+            exclude_hold: str | None = None
+    ) -> list[Occupancy]:
+        # Everything in the way of a booking: occupancy plus live holds
+        # other than `exclude_hold`.
+        with self._lock:
+            conflicts = self.occupancy(office_number, start_time, end_time)
+            held = self.holds.conflicts(office_number, start_time, end_time, exclude_hold)
+            if held:
+                conflicts += held
+                conflicts.sort(key=lambda occupancy: occupancy.start_time)
+            return conflicts
+
+    def offices(self) -> list[int]:
+        with self._lock:
+            return sorted(self._offices.keys() | {
+                office_number for office_number, rules in self._rules.items() if rules
+            })
+
+    def is_available(self, office_number: int, start_time: datetime, end_time: datetime) -> bool:
+        return not self.conflicts(office_number, start_time, end_time)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._offices.clear()
+            self._bookings.clear()
+            self._rules.clear()
+            self.holds.clear()
+            self.version += 1
+            self.is_loaded = False
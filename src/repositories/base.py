@@ -0,0 +1,139 @@
+from abc import ABC, abstractmethod
+from contextlib import AbstractContextManager
+from datetime import datetime
+from typing import Callable, Iterator
+
+from src.models.models import Occupancy, BookingRequest, BookingResult, Hold, Office, RecurringBooking
+from src.repositories.office_catalogue import OfficeCatalogue
+
+# (office_number, user_name, start_time, end_time)
+ReportRow = tuple[int, str, datetime, datetime]
+
+# Called with (office_number, start_time, end_time) of a write by any
+# process; end_time is None for a recurring series.
+ChangeCallback = Callable[[int, datetime | None, datetime | None], None]
+
+
+class BookingRepository(ABC):
+    @abstractmethod
+    def transaction(self) -> AbstractContextManager:
+        pass
+
+    # Bookings, series occurrences and live holds overlapping the slot.
+    @abstractmethod
+    def find_conflicts(self, office_number: int, start_time: datetime, end_time: datetime) -> list[Occupancy]:
+        pass
+
+    @abstractmethod
+    def get_window_occupancy(
+            self,
+            start_time: datetime,
+            end_time: datetime,
+            offices: list[int] | None = None
+    ) -> dict[int, list[Occupancy]]:
+        pass
+
+    # Every booking path counts live holds as conflicts.
+    @abstractmethod
+    def book_office(self, booking: BookingRequest) -> list[Occupancy]:
+        pass
+
+    @abstractmethod
+    def book_many(self, bookings: list[BookingRequest]) -> list[BookingResult]:
+        pass
+
+    @abstractmethod
+    def book_recurring(self, booking: RecurringBooking) -> list[Occupancy]:
+        pass
+
+    @abstractmethod
+    def hold_slot(self, office_number: int, start_time: datetime, end_time: datetime, ttl: float) -> Hold | list[Occupancy]:
+        # The new hold, or the bookings and live holds overlapping the slot.
+        pass
+
+    @abstractmethod
+    def confirm_hold(self, hold_id: str, booking: BookingRequest) -> list[Occupancy] | None:
+        # Books the held slot and consumes the hold in one step. None when
+        # hold_id is not a live hold on exactly the booking's office and
+        # times; the hold is then left as it was.
+        pass
+
+    @abstractmethod
+    def get_hold(self, hold_id: str) -> Hold | None:
+        # The hold if it is still live.
+        pass
+
+    @abstractmethod
+    def release_hold(self, hold_id: str) -> bool:
+        pass
+
+    @abstractmethod
+    def get_window_holds(
+            self,
+            start_time: datetime,
+            end_time: datetime,
+            offices: list[int] | None = None
+    ) -> dict[int, list[Occupancy]]:
+        # Live holds overlapping the window, for the offices holding any.
+        pass
+
+    @abstractmethod
+    def get_recurring_bookings(
+            self,
+            start_time: datetime,
+            end_time: datetime,
+            offices: list[int] | None = None
+    ) -> list[RecurringBooking]:
+        pass
+
+    @abstractmethod
+    def iter_bookings(
+            self,
+            start_time: datetime,
+            end_time: datetime,
+            offices: list[int] | None = None
+    ) -> Iterator[ReportRow]:
+        # Concrete bookings overlapping the window ordered by start_time,
+        # streamed without holding the result set in memory.
+        pass
+
+    @abstractmethod
+    def get_offices(self) -> list[Office]:
+        pass
+
+    @abstractmethod
+    def save_office(self, office: Office) -> None:
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
+
+    @property
+    def office_catalogue(self) -> OfficeCatalogue:
+        catalogue = getattr(self, '_office_catalogue', None)
+        if catalogue is None:
+            catalogue = self._office_catalogue = OfficeCatalogue(self.get_offices())
+        return catalogue
+
+    def invalidate_office_catalogue(self) -> None:
+        self._office_catalogue = None
+
+    def subscribe_changes(self, on_change: ChangeCallback, on_reset: Callable[[], None]) -> bool:
+        # Relays writes announced by other processes; on_reset is called
+        # when announcements may have been missed. False when this
+        # repository does not follow other writers.
+        return False
+
+    def is_office_available(self, office_number: int, start_time: datetime, end_time: datetime) -> bool:
+        return not self.find_conflicts(office_number, start_time, end_time)
+
+    def get_office_occupancy(self, office_number: int, start_time: datetime, end_time: datetime):
+        conflicts = self.find_conflicts(office_number, start_time, end_time)
+        return conflicts[0] if conflicts else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -1,33 +1,570 @@
+import logging
+import threading
+import time
 import psycopg2
 from contextlib import contextmanager
 from datetime import datetime
+from functools import partial
+from itertools import compress, starmap
+from operator import itemgetter
+from typing import Callable, Iterator
+from psycopg2.extensions import connection
+from psycopg2.extras import execute_values
 
 from config.config import DatabaseConfig
-from migrations.manager import MigrationManager
 from src.utils.exceptions import DatabaseError
-from src.models.models import Occupancy, BookingRequest
+from src.utils.metrics import MetricsRegistry, registry, instrumented
+from src.models.models import (
+    Occupancy,
+    BookingRequest,
+    BookingResult,
+    Hold,
+    Office,
+    RecurrenceRule,
+    RecurringBooking
+)
+from src.repositories.availability_index import AvailabilityIndex
+from src.repositories.base import BookingRepository, ChangeCallback, ReportRow
+from src.repositories.holds import HELD_BY, new_hold_id
+from src.repositories.listener import BOOKINGS_CHANNEL, OFFICES_CHANNEL, ChangeListener
+from src.repositories.occupancy_cache import OccupancyCache, CacheStats
+from src.repositories.pool import ConnectionPool, PoolStats
+from src.repositories.replicas import PRIMARY_LSN_SQL, UNKNOWN_LSN, ReplicaRouter, ReplicaStats
+from src.repositories.rows import RowMapper
+from src.repositories.statements import StatementRegistry, StatementStats
+from src.utils.recurrence import occurrence_conflicts, series_conflicts, series_end
 
+logger = logging.getLogger(__name__)
+
+# Rows fetched per round trip when streaming through a server-side cursor.
+REPORT_BATCH_SIZE = 10000
+
+# Advisory lock class guarding the recurring series and holds of one office.
+# Single bookings hold it shared while they check the series and holds, new
+# series and holds take it exclusively while they check everything already
+# booked.
+RECURRENCE_LOCK_CLASS = 5
+
+# A booking rejected by the exclusion constraint whose conflicting row is
+# gone by the time it is read back is tried again, this many times in all.
+BOOK_OFFICE_ATTEMPTS = 3
+
+RECURRING_COLUMNS = '''
+    user_name, user_email, user_phone, start_time, end_time,
+    frequency, repeat_interval, repeat_until, repeat_count
+'''
+
+# Overlap lookups use the range operator so they are bound by the GiST index
+# behind the bookings_no_overlap exclusion constraint on (office_number, period).
+# Recurring series come back as a single row each and are expanded in Python
+# for the requested window only. Live holds come back with the seconds they
+# have left in a trailing column.
+FIND_CONFLICTS_SQL = f'''
+    SELECT office_number, user_name, user_email, user_phone, start_time, end_time,
+           NULL, NULL, NULL, NULL, NULL
+    FROM bookings
+    WHERE office_number = %(office_number)s AND
+          period && tsrange(%(start_time)s, %(end_time)s, '[)')
+    UNION ALL
+    SELECT office_number, {RECURRING_COLUMNS}, NULL
+    FROM recurring_bookings
+    WHERE office_number = %(office_number)s AND
+          start_time < %(end_time)s AND
+          (series_end IS NULL OR series_end > %(start_time)s)
+    UNION ALL
+    SELECT office_number, '{HELD_BY}', NULL, NULL, start_time, end_time,
+           NULL, NULL, NULL, NULL, EXTRACT(EPOCH FROM expires_at - LOCALTIMESTAMP)
+    FROM booking_holds
+    WHERE office_number = %(office_number)s AND
+          period && tsrange(%(start_time)s, %(end_time)s, '[)') AND
+          expires_at > LOCALTIMESTAMP
+'''
+
+FIND_RECURRING_SQL = f'''
+    SELECT office_number, {RECURRING_COLUMNS}
+    FROM recurring_bookings
+    WHERE office_number = ANY(%(offices)s) AND
+          start_time < %(end_time)s AND
+          (series_end IS NULL OR series_end > %(start_time)s)
+'''
+
+# Live holds, shaped like occupancy rows.
+FIND_HOLDS_SQL = f'''
+    SELECT office_number, '{HELD_BY}', NULL, NULL, start_time, end_time,
+           NULL, NULL, NULL, NULL
+    FROM booking_holds
+    WHERE office_number = ANY(%(offices)s) AND
+          period && tsrange(%(start_time)s, %(end_time)s, '[)') AND
+          expires_at > LOCALTIMESTAMP
+'''
+
+LIVE_HOLDS_SQL = '''
+    SELECT hold_id, office_number, start_time, end_time, expires_at
+    FROM booking_holds
+    WHERE expires_at > LOCALTIMESTAMP
+'''
+
+# What a single booking checks besides the exclusion constraint.
+FIND_BLOCKERS_SQL = f'''
+    {FIND_RECURRING_SQL}
+    UNION ALL
+    {FIND_HOLDS_SQL}
+'''
+
+LOCK_OFFICE_SHARED_SQL = f'SELECT pg_advisory_xact_lock_shared({RECURRENCE_LOCK_CLASS}, %(office_number)s)'
+
+INSERT_BOOKING_SQL = '''
+    INSERT INTO bookings (
+        office_number,
+        user_name,
+        user_email,
+        user_phone,
+        start_time,
+        end_time
+    )
+    VALUES (
+        %(office_number)s,
+        %(user_name)s,
+        %(user_email)s,
+        %(user_phone)s,
+        %(start_time)s,
+        %(end_time)s
+    )
+    ON CONFLICT ON CONSTRAINT bookings_no_overlap DO NOTHING
+    RETURNING id
+'''
+
+BOOKING_TYPES = {
+    'office_number': 'integer',
+    'user_name': 'text',
+    'user_email': 'text',
+    'user_phone': 'text',
+    'start_time': 'timestamp',
+    'end_time': 'timestamp',
+}
+
+# Statements run on every availability check and single booking.
+HOT_STATEMENTS = {
+    'find_conflicts': (FIND_CONFLICTS_SQL, {
+        'office_number': 'integer',
+        'start_time': 'timestamp',
+        'end_time': 'timestamp',
+    }),
+    'lock_office_shared': (LOCK_OFFICE_SHARED_SQL, {'office_number': 'integer'}),
+    'find_blockers': (FIND_BLOCKERS_SQL, {
+        'offices': 'integer[]',
+        'start_time': 'timestamp',
+        'end_time': 'timestamp',
+    }),
+    'insert_booking': (INSERT_BOOKING_SQL, BOOKING_TYPES),
+}
+
+
+# Occupancy rows are (office_number, RECURRING_COLUMNS...); the rule
+# columns are NULL on concrete bookings.
+OCCUPANCY_ROW = RowMapper(Occupancy, 1, 4, 5)
+RECURRING_BOOKING_COLUMNS = itemgetter(0, 1, 2, 3, 4, 5)
+RECURRENCE_RULE_COLUMNS = itemgetter(6, 7, 8, 9)
+FREQUENCY_COLUMN = 6
+HOLD_EXPIRES_IN_COLUMN = 10
+
+
+def _to_recurring(row: tuple) -> RecurringBooking:
+    return RecurringBooking(*RECURRING_BOOKING_COLUMNS(row), RecurrenceRule(*RECURRENCE_RULE_COLUMNS(row)))
+
+
+def _expand_occupancy(rows: list[tuple], start_time: datetime, end_time: datetime) -> list[Occupancy]:
+    concrete = [row[FREQUENCY_COLUMN] is None for row in rows]
+    occupancy = OCCUPANCY_ROW.many(compress(rows, concrete))
+    if len(occupancy) < len(rows):
+        recurring = [_to_recurring(row) for row, is_concrete in zip(rows, concrete) if not is_concrete]
+        occupancy += occurrence_conflicts(recurring, start_time, end_time)
+    occupancy.sort(key=lambda entry: entry.start_time)
+    return occupancy
 
-class Database:
-    def __init__(self, db_config: DatabaseConfig):
-        try:
-            self.db_config = db_config
-            self.conn = psycopg2.connect(**db_config.to_dict())
-        except psycopg2.Error as e:
-            raise DatabaseError(f"Failed to initialize database: {e}")
+
+# Slow-query log summaries: office numbers, times and counts only, never the
+# contact details the bookings carry.
+def _office_summary(office_number: int, start_time: datetime, end_time: datetime, *args, **kwargs) -> str:
+    return f'office={office_number} start={start_time} end={end_time}'
+
+
+def _booking_summary(booking: BookingRequest | RecurringBooking, *args, **kwargs) -> str:
+    return _office_summary(booking.office_number, booking.start_time, booking.end_time)
+
+
+def _window_summary(start_time: datetime, end_time: datetime, offices: list[int] | None = None) -> str:
+    return f'start={start_time} end={end_time} offices={len(offices) if offices is not None else "all"}'
+
+
+class Database(BookingRepository):
+    def __init__(
+            self,
+            db_config: DatabaseConfig,
+            availability_index: AvailabilityIndex | None = None,
+            index_refresh_interval: float | None = None,
+            pool: ConnectionPool | None = None,
+            metrics: MetricsRegistry | None = None,
+            occupancy_cache: OccupancyCache | None = None,
+            statements: StatementRegistry | None = None,
+            replicas: ReplicaRouter | None = None,
+            listen: bool = False
+    ):
+        self.db_config = db_config
+        self._owns_pool = pool is None
+        self.pool = pool or ConnectionPool(db_config)
+        self._local = threading.local()
+
+        self.metrics = metrics or registry
+        if db_config.metrics_enabled:
+            self.metrics.configure(True, db_config.slow_query_threshold_ms)
+        self.metrics.register_collector('db.pool', self._pool_gauges)
+
+        self.statements = statements or StatementRegistry(db_config.prepared_statements)
+        for name, (sql, types) in HOT_STATEMENTS.items():
+            self.statements.register(name, sql, types)
+        self.metrics.register_collector('db.statements', self._statement_gauges)
+
+        self.replicas = replicas
+        if self.replicas is None and db_config.replicas:
+            self.replicas = ReplicaRouter.from_config(db_config)
+        if self.replicas is not None:
+            self.metrics.register_collector('db.replicas', self._replica_gauges)
+
+        # The index is loaded on first use and then kept current from
+        # bookings_changed notifications; index_refresh_interval adds a
+        # periodic full reload on top.
+        self.availability_index = availability_index
+        self.index_refresh_interval = index_refresh_interval
+        self._index_synced_at = 0.0
+
+        # Long-running processes follow other writers through LISTEN/NOTIFY
+        # on one extra connection; the occupancy cache and the availability
+        # index depend on it. One-shot commands load the office catalogue
+        # once and exit without it.
+        self.occupancy_cache = occupancy_cache
+        self._change_listener = None
+        self._change_subscribers: list[tuple[ChangeCallback, Callable[[], None]]] = []
+        if self.occupancy_cache is not None:
+            self.metrics.register_collector('db.occupancy_cache', self._cache_gauges)
+        if listen or self.occupancy_cache is not None or self.availability_index is not None:
+            self._start_change_listener()
 
     def _run_migrations(self):
-        with MigrationManager(self.db_config) as manager:
-            manager.migrate()
+        from migrations.manager import MigrationManager
+        MigrationManager(self.db_config, pool=self.pool).migrate()
+
+    @property
+    def conn(self) -> connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            raise DatabaseError(
+                "No connection is bound outside of a transaction; "
+                "use Database.connection() instead"
+            )
+        return conn
 
     @contextmanager
-    def transaction(self):
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            yield conn
+            return
+        with self.pool.connection() as conn:
+            yield conn
+            conn.commit()
+
+    @contextmanager
+    def _read_connection(self, offices: list[int] | None):
+        # Reads outside a transaction go to a replica when one is caught up
+        # with this process's writes to those offices. Anything running
+        # inside a transaction is part of a write and stays on the primary.
+        replica = None
+        if self.replicas is not None and getattr(self._local, 'conn', None) is None:
+            replica = self.replicas.choose(offices)
+        conn = None
+        if replica is not None:
+            try:
+                conn = replica.pool.getconn()
+            except DatabaseError:
+                self.replicas.mark_unhealthy(replica)
+        if conn is None:
+            with self.connection() as conn:
+                yield conn
+            return
+
+        discard = False
         try:
+            yield conn
+            conn.commit()
+        except psycopg2.OperationalError:
+            discard = True
+            self.replicas.mark_unhealthy(replica)
+            raise
+        finally:
+            replica.pool.putconn(conn, discard=discard)
+
+    @contextmanager
+    def transaction(self):
+        if getattr(self._local, 'conn', None) is not None:
             yield
-            self.conn.commit()
+            return
+
+        with self.pool.connection() as conn, self.metrics.timer('db.transaction'):
+            self._local.conn = conn
+            self._local.pending_index_updates = []
+            self._local.written_offices = set()
+            try:
+                yield
+                conn.commit()
+                if self._local.written_offices:
+                    self._publish_writes(conn, self._local.written_offices)
+            except psycopg2.Error as e:
+                conn.rollback()
+                self.metrics.increment('db.transaction.rollbacks')
+                raise DatabaseError(f"Transaction failed: {e}")
+            except BaseException:
+                conn.rollback()
+                self.metrics.increment('db.transaction.rollbacks')
+                raise
+            finally:
+                self._local.conn = None
+        for update in self._local.pending_index_updates:
+            update()
+
+    def _record_index_update(self, update) -> None:
+        # Index updates wait for the commit so a rolled back write never
+        # becomes visible through the index.
+        if getattr(self._local, 'conn', None) is not None:
+            self._local.pending_index_updates.append(update)
+        else:
+            update()
+
+    def _record_write(self, office_number: int) -> None:
+        # Reads of an office this process wrote stay on the primary until a
+        # replica has replayed past the commit.
+        if self.replicas is None:
+            return
+        if getattr(self._local, 'conn', None) is not None:
+            self._local.written_offices.add(office_number)
+        else:
+            with self.pool.connection() as conn:
+                self._publish_writes(conn, {office_number})
+
+    def _publish_writes(self, conn: connection, offices: set[int]) -> None:
+        # The write is already committed, so failing here must not fail the
+        # caller; the offices are read from the primary until the next write.
+        try:
+            with conn.cursor() as cur:
+                cur.execute(PRIMARY_LSN_SQL)
+                lsn = int(cur.fetchone()[0])
+            conn.commit()
+        except psycopg2.Error:
+            lsn = UNKNOWN_LSN
+        self.replicas.record_write(offices, lsn)
+
+    def _record_index_row(self, row: tuple) -> None:
+        if self.availability_index is not None:
+            self._record_index_update(partial(self.availability_index.add, *row))
+
+    def _record_index_rule(self, rule_id: int, booking: RecurringBooking) -> None:
+        if self.availability_index is not None:
+            self._record_index_update(partial(self.availability_index.add_rule, rule_id, booking))
+
+    def _record_index_hold(self, hold: Hold) -> None:
+        if self.availability_index is not None:
+            self._record_index_update(partial(self.availability_index.add_hold, hold))
+
+    def _record_index_release(self, hold_id: str) -> None:
+        if self.availability_index is not None:
+            self._record_index_update(partial(self.availability_index.remove_hold, hold_id))
+
+    def _invalidate_cache(
+            self,
+            office_number: int,
+            start_time: datetime,
+            end_time: datetime | None
+    ) -> None:
+        # Other processes learn about the write through NOTIFY; this process
+        # drops its own buckets as soon as the write commits.
+        if self.occupancy_cache is not None:
+            self._record_index_update(
+                partial(self.occupancy_cache.invalidate, office_number, start_time, end_time)
+            )
+
+    def _start_change_listener(self) -> None:
+        self._change_listener = ChangeListener(
+            self.db_config,
+            handlers={
+                BOOKINGS_CHANNEL: self._on_bookings_changed,
+                OFFICES_CHANNEL: self._on_offices_changed,
+            },
+            on_reset=self._on_listener_reset
+        )
+        self._change_listener.start()
+
+    def _on_bookings_changed(self, payload: dict) -> None:
+        office_number = int(payload['office_number'])
+        start_time, end_time = payload.get('start_time'), payload.get('end_time')
+        start_time = datetime.fromisoformat(start_time) if start_time is not None else None
+        end_time = datetime.fromisoformat(end_time) if end_time is not None else None
+        if self.occupancy_cache is not None:
+            self.occupancy_cache.invalidate(office_number, start_time, end_time)
+        if self.availability_index is not None:
+            self._refresh_index(office_number, start_time, end_time)
+        for on_change, _ in tuple(self._change_subscribers):
+            on_change(office_number, start_time, end_time)
+
+    def _refresh_index(self, office_number: int, start_time: datetime | None, end_time: datetime | None) -> None:
+        # Re-reads what the notification covers, so commits landing out of
+        # id order and deleted rows are both picked up. A series change
+        # comes without an end and reloads the office's rules.
+        index = self.availability_index
+        if not index.is_loaded:
+            return
+        if start_time is None:
+            index.invalidate()
+            return
+        try:
+            with self.connection() as conn, conn.cursor() as cur:
+                if end_time is None:
+                    cur.execute(f'''
+                        SELECT id, office_number, {RECURRING_COLUMNS}
+                        FROM recurring_bookings
+                        WHERE office_number = %s
+                    ''', (office_number,))
+                    index.reload_rules(office_number, ((row[0], _to_recurring(row[1:])) for row in cur.fetchall()))
+                    return
+                cur.execute('''
+                    SELECT id, office_number, user_name, start_time, end_time
+                    FROM bookings
+                    WHERE office_number = %s AND
+                          period && tsrange(%s, %s, '[)')
+                ''', (office_number, start_time, end_time))
+                rows = cur.fetchall()
+                cur.execute(f'''
+                    {LIVE_HOLDS_SQL} AND
+                    office_number = %s AND
+                    period && tsrange(%s, %s, '[)')
+                ''', (office_number, start_time, end_time))
+                holds = list(starmap(Hold, cur.fetchall()))
+                index.reload_window(office_number, start_time, end_time, rows, holds)
+        except (psycopg2.Error, DatabaseError) as e:
+            # Runs on the listener thread; the next lookup reloads in full.
+            logger.warning(f"Failed to refresh availability index for office {office_number}: {e}")
+            index.invalidate()
+
+    def _on_offices_changed(self, payload: dict) -> None:
+        self.invalidate_office_catalogue()
+
+    def _on_listener_reset(self) -> None:
+        if self.occupancy_cache is not None:
+            self.occupancy_cache.clear()
+        # Notifications may have been missed while disconnected.
+        self.invalidate_availability_index()
+        self.invalidate_office_catalogue()
+        for _, on_reset in tuple(self._change_subscribers):
+            on_reset()
+
+    def subscribe_changes(self, on_change: ChangeCallback, on_reset: Callable[[], None]) -> bool:
+        if self._change_listener is None:
+            return False
+        self._change_subscribers.append((on_change, on_reset))
+        return True
+
+    def pool_stats(self) -> PoolStats:
+        return self.pool.stats()
+
+    def cache_stats(self) -> CacheStats | None:
+        return self.occupancy_cache.stats() if self.occupancy_cache is not None else None
+
+    def _cache_gauges(self) -> dict[str, float]:
+        stats = self.occupancy_cache.stats()
+        return {
+            'size': stats.size,
+            'hits': stats.hits,
+            'misses': stats.misses,
+            'hit_ratio': stats.hit_ratio,
+            'evictions': stats.evictions,
+            'expirations': stats.expirations,
+            'invalidations': stats.invalidations,
+        }
+
+    def statement_stats(self) -> StatementStats:
+        return self.statements.stats()
+
+    def _statement_gauges(self) -> dict[str, float]:
+        stats = self.statements.stats()
+        return {
+            'prepares': stats.prepares,
+            'executions': stats.executions,
+            'text_executions': stats.text_executions,
+            'fallbacks': stats.fallbacks,
+        }
+
+    def replica_stats(self) -> ReplicaStats | None:
+        return self.replicas.stats() if self.replicas is not None else None
+
+    def _replica_gauges(self) -> dict[str, float]:
+        stats = self.replicas.stats()
+        return {
+            'replica_reads': stats.replica_reads,
+            'primary_reads': stats.primary_reads,
+            'lagging_skips': stats.lagging_skips,
+            'unreplayed_skips': stats.unreplayed_skips,
+            'probe_failures': stats.probe_failures,
+        }
+
+    def _pool_gauges(self) -> dict[str, float]:
+        stats = self.pool.stats()
+        return {
+            'size': stats.size,
+            'in_use': stats.in_use,
+            'checkouts': stats.checkouts,
+            'waits': stats.waits,
+            'wait_seconds': stats.wait_time,
+            'max_wait_seconds': stats.max_wait_time,
+            'timeouts': stats.timeouts,
+        }
+
+    @instrumented('db.sync_availability_index', slow_log=True)
+    def sync_availability_index(self) -> bool:
+        # Full reload. False when the listener reset the index meanwhile, as
+        # the read may then miss writes whose notifications were lost.
+        index = self.availability_index
+        if index is None:
+            return False
+        version = index.version
+        try:
+            with self.connection() as conn, conn.cursor() as cur:
+                cur.execute('SELECT id, office_number, user_name, start_time, end_time FROM bookings')
+                rows = cur.fetchall()
+                cur.execute(f'SELECT id, office_number, {RECURRING_COLUMNS} FROM recurring_bookings')
+                rules = [(row[0], _to_recurring(row[1:])) for row in cur.fetchall()]
+                cur.execute(LIVE_HOLDS_SQL)
+                holds = list(starmap(Hold, cur.fetchall()))
         except psycopg2.Error as e:
-            self.conn.rollback()
-            raise DatabaseError(f"Transaction failed: {e}")
+            raise DatabaseError(f"Failed to sync availability index: {e}")
+        if not index.reload(rows, rules, version, holds):
+            return False
+        self._index_synced_at = time.monotonic()
+        return True
+
+    def invalidate_availability_index(self) -> None:
+        if self.availability_index is not None:
+            self.availability_index.invalidate()
+
+    def _current_index(self) -> AvailabilityIndex | None:
+        index = self.availability_index
+        if index is None:
+            return None
+        if self.index_refresh_interval is not None and (
+                time.monotonic() - self._index_synced_at >= self.index_refresh_interval):
+            index.invalidate()
+        if not index.is_loaded and not self.sync_availability_index():
+            # Reset while loading; this lookup goes to the database.
+            return None
+        return index
 
     def _create_tables(self) -> None:
         with self.transaction():
@@ -44,59 +581,707 @@ class Database:
                     )
                 ''')
 
-    def is_office_available(self, office_number: int, start_time: datetime, end_time: datetime) -> bool:
+    @instrumented('db.find_conflicts')
+    def find_conflicts(self, office_number: int, start_time: datetime, end_time: datetime) -> list[Occupancy]:
+        index = self._current_index()
+        if index is not None:
+            return index.conflicts(office_number, start_time, end_time)
+        if self.occupancy_cache is not None:
+            conflicts = self.occupancy_cache.conflicts(
+                office_number, start_time, end_time, self._load_occupancy_bucket
+            )
+            if conflicts is not None:
+                return conflicts
+        return self._query_conflicts(office_number, start_time, end_time, replica=True)
+
+    def _load_occupancy_bucket(
+            self,
+            office_number: int,
+            start_time: datetime,
+            end_time: datetime
+    ) -> tuple[list[Occupancy], float | None]:
+        # Buckets live until invalidated or expired, so they are always
+        # loaded from the primary rather than a replica that may lag. A
+        # bucket holding a hold expires with the hold.
+        rows = self._query_conflict_rows(office_number, start_time, end_time, replica=False)
+        expires_in = [float(row[HOLD_EXPIRES_IN_COLUMN]) for row in rows if row[HOLD_EXPIRES_IN_COLUMN] is not None]
+        return _expand_occupancy(rows, start_time, end_time), min(expires_in, default=None)
+
+    def _query_conflicts(
+            self,
+            office_number: int,
+            start_time: datetime,
+            end_time: datetime,
+            replica: bool = False
+    ) -> list[Occupancy]:
+        rows = self._query_conflict_rows(office_number, start_time, end_time, replica)
+        return _expand_occupancy(rows, start_time, end_time)
+
+    @instrumented('db.query_conflicts', slow_log=True, summary=_office_summary)
+    def _query_conflict_rows(
+            self,
+            office_number: int,
+            start_time: datetime,
+            end_time: datetime,
+            replica: bool
+    ) -> list[tuple]:
         try:
-            with self.conn.cursor() as cur:
-                cur.execute('''
-                    SELECT 1
-                    FROM bookings
-                    WHERE office_number = %s AND
-                          NOT (%s > end_time OR %s > start_time)
-                ''', (office_number, start_time, end_time))
-                return cur.fetchone() is None
+            with (self._read_connection([office_number]) if replica else self.connection()) as conn, \
+                    conn.cursor() as cur:
+                self.statements.execute(cur, 'find_conflicts', params={
+                    'office_number': office_number,
+                    'start_time': start_time,
+                    'end_time': end_time,
+                })
+                return cur.fetchall()
         except psycopg2.Error as e:
-            raise DatabaseError(f"Failed to check availability: {e}")
+            raise DatabaseError(f"Failed to find conflicting bookings: {e}")
+
+    @instrumented('db.get_window_occupancy', slow_log=True, summary=_window_summary)
+    def get_window_occupancy(
+            self,
+            start_time: datetime,
+            end_time: datetime,
+            offices: list[int] | None = None
+    ) -> dict[int, list[Occupancy]]:
+        return self._query_window_occupancy(start_time, end_time, offices, replica=True)
+
+    def _query_window_occupancy(
+            self,
+            start_time: datetime,
+            end_time: datetime,
+            offices: list[int] | None,
+            replica: bool
+    ) -> dict[int, list[Occupancy]]:
+        # Archived bookings all ended before the archival cutoff, which is
+        # never in the future, so windows starting now or later only need
+        # the hot table.
+        includes_history = start_time < datetime.now()
+        index = None if includes_history else self._current_index()
+        if index is not None and offices is not None:
+            return {
+                office_number: index.occupancy(office_number, start_time, end_time)
+                for office_number in offices
+            }
 
-    def get_office_occupancy(self, office_number: int, start_time: datetime, end_time: datetime):
+        office_filter = ' AND office_number = ANY(%(offices)s)' if offices is not None else ''
+        params = {
+            'start_time': start_time,
+            'end_time': end_time,
+            'offices': list(offices) if offices is not None else None,
+        }
+        query = f'''
+            SELECT office_number, user_name, user_email, user_phone, start_time, end_time,
+                   NULL, NULL, NULL, NULL
+            FROM bookings
+            WHERE period && tsrange(%(start_time)s, %(end_time)s, '[)'){office_filter}
+            UNION ALL
+            SELECT office_number, {RECURRING_COLUMNS}
+            FROM recurring_bookings
+            WHERE start_time < %(end_time)s AND
+                  (series_end IS NULL OR series_end > %(start_time)s){office_filter}
+        '''
+        if includes_history:
+            # The lower bound on start_time lets the planner prune archive
+            # partitions on both sides of the window.
+            query += f'''
+                UNION ALL
+                SELECT office_number, user_name, user_email, user_phone, start_time, end_time,
+                       NULL, NULL, NULL, NULL
+                FROM bookings_archive
+                WHERE tsrange(start_time, end_time, '[)') && tsrange(%(start_time)s, %(end_time)s, '[)'){office_filter} AND
+                      start_time >= %(start_time)s::timestamp - (SELECT max_duration FROM bookings_archive_state)
+            '''
+
+        rows: dict[int, list[tuple]] = {office_number: [] for office_number in offices or ()}
         try:
-            with self.conn.cursor() as cur:
-                cur.execute('''
-                    SELECT user_name, start_time, end_time
-                    FROM bookings
-                    WHERE office_number = %s AND
-                          NOT (%s > end_time OR %s > start_time)
-                ''', (office_number, start_time, end_time))
-                result = cur.fetchone()
-                return Occupancy(*result) if result else None
+            with (self._read_connection(offices) if replica else self.connection()) as conn, \
+                    conn.cursor() as cur:
+                cur.execute(query, params)
+                # Rows are grouped as the driver returned them, not copied.
+                for row in cur:
+                    rows.setdefault(row[0], []).append(row)
         except psycopg2.Error as e:
-            raise DatabaseError(f"Failed to get occupancy: {e}")
+            raise DatabaseError(f"Failed to get window occupancy: {e}")
+        return {
+            office_number: _expand_occupancy(office_rows, start_time, end_time)
+            for office_number, office_rows in rows.items()
+        }
+
+    @instrumented('db.book_office', slow_log=True, summary=_booking_summary)
+    def book_office(self, booking: BookingRequest) -> list[Occupancy]:
+        for _ in range(BOOK_OFFICE_ATTEMPTS):
+            inserted = self._insert_booking(booking)
+            if isinstance(inserted, list):
+                return inserted
+            if inserted is not None:
+                break
+            # The exclusion constraint rejected the row; the conflicting
+            # bookings are committed by now, so read them back from the table
+            # itself. Nothing there means they were deleted in between and
+            # the slot is free again.
+            conflicts = self._query_conflicts(
+                booking.office_number,
+                booking.start_time,
+                booking.end_time
+            )
+            if conflicts:
+                return conflicts
+        else:
+            raise DatabaseError(
+                f"Failed to book office: the slot kept changing after {BOOK_OFFICE_ATTEMPTS} attempts"
+            )
 
-    def book_office(self, booking: BookingRequest) -> None:
+        self._record_index_row((
+            inserted[0],
+            booking.office_number,
+            booking.user_name,
+            booking.start_time,
+            booking.end_time
+        ))
+        self._invalidate_cache(booking.office_number, booking.start_time, booking.end_time)
+        self._record_write(booking.office_number)
+        return []
+
+    def _insert_booking(self, booking: BookingRequest) -> tuple | list[Occupancy] | None:
+        # The new row's id, the series and holds in the way, or None when
+        # the exclusion constraint rejected the row.
         try:
-            with self.conn.cursor() as cur:
-                cur.execute('''
+            with self.connection() as conn, conn.cursor() as cur:
+                # The exclusion constraint only covers concrete rows, so the
+                # office's recurring series and live holds are checked under
+                # a shared lock in the same round trip.
+                self.statements.execute(cur, 'lock_office_shared', 'find_blockers', params={
+                    'office_number': booking.office_number,
+                    'offices': [booking.office_number],
+                    'start_time': booking.start_time,
+                    'end_time': booking.end_time,
+                })
+                blockers = _expand_occupancy(cur.fetchall(), booking.start_time, booking.end_time)
+                if blockers:
+                    return blockers
+
+                self.statements.execute(cur, 'insert_booking', params={
+                    'office_number': booking.office_number,
+                    'user_name': booking.user_name,
+                    'user_email': booking.user_email,
+                    'user_phone': booking.user_phone,
+                    'start_time': booking.start_time,
+                    'end_time': booking.end_time,
+                })
+                return cur.fetchone()
+        except psycopg2.Error as e:
+            raise DatabaseError(f"Failed to book office: {e}")
+
+    @instrumented('db.book_many', slow_log=True, summary=lambda bookings: f'rows={len(bookings)}')
+    def book_many(self, bookings: list[BookingRequest]) -> list[BookingResult]:
+        results = [BookingResult(request=booking) for booking in bookings]
+        if not bookings:
+            return results
+
+        try:
+            with self.connection() as conn, conn.cursor() as cur:
+                cur.execute(f'''
+                    SELECT count(pg_advisory_xact_lock_shared({RECURRENCE_LOCK_CLASS}, office_number))
+                    FROM (SELECT unnest(%(offices)s::int[]) AS office_number ORDER BY 1) AS offices;
+                    {FIND_BLOCKERS_SQL}
+                ''', {
+                    'offices': sorted({booking.office_number for booking in bookings}),
+                    'start_time': min(booking.start_time for booking in bookings),
+                    'end_time': max(booking.end_time for booking in bookings),
+                    'hold_id': None,
+                })
+                # Holds come back as concrete rows, series with their rule.
+                recurring: dict[int, list[RecurringBooking]] = {}
+                held = AvailabilityIndex()
+                for i, row in enumerate(cur.fetchall()):
+                    if row[FREQUENCY_COLUMN] is None:
+                        held.add(i, row[0], row[1], row[4], row[5])
+                    else:
+                        recurring.setdefault(row[0], []).append(_to_recurring(row))
+
+                # Both statements send the whole batch as one page: with the
+                # default page_size of 100 execute_values splits it into a
+                # round trip per hundred rows.
+                existing = execute_values(cur, '''
+                    SELECT r.idx, b.user_name, b.start_time, b.end_time
+                    FROM (VALUES %s) AS r(idx, office_number, start_time, end_time)
+                    JOIN bookings b ON b.office_number = r.office_number AND
+                                       b.period && tsrange(r.start_time, r.end_time, '[)')
+                    ORDER BY r.idx, b.start_time
+                ''', [
+                    (i, booking.office_number, booking.start_time, booking.end_time)
+                    for i, booking in enumerate(bookings)
+                ], template='(%s, %s, %s::timestamp, %s::timestamp)', page_size=len(bookings), fetch=True)
+                for idx, user_name, start_time, end_time in existing:
+                    results[idx].conflicts.append(Occupancy(user_name, start_time, end_time))
+
+                # Requests earlier in the batch win over later overlapping ones.
+                accepted = AvailabilityIndex()
+                for i, result in enumerate(results):
+                    if result.conflicts:
+                        continue
+                    booking = result.request
+                    result.conflicts = occurrence_conflicts(
+                        recurring.get(booking.office_number, ()), booking.start_time, booking.end_time
+                    ) or held.conflicts(
+                        booking.office_number, booking.start_time, booking.end_time
+                    ) or accepted.conflicts(
+                        booking.office_number, booking.start_time, booking.end_time
+                    )
+                    if not result.conflicts:
+                        accepted.add(i, booking.office_number, booking.user_name,
+                                     booking.start_time, booking.end_time)
+
+                pending = {
+                    (result.request.office_number, result.request.start_time): result
+                    for result in results if not result.conflicts
+                }
+                inserted = execute_values(cur, '''
                     INSERT INTO bookings (
-                        office_number, 
-                        user_name, 
-                        user_email, 
-                        user_phone, 
-                        start_time, 
+                        office_number,
+                        user_name,
+                        user_email,
+                        user_phone,
+                        start_time,
                         end_time
                     )
-                    VALUES (%s, %s, %s, %s, %s, %s)
+                    VALUES %s
+                    ON CONFLICT ON CONSTRAINT bookings_no_overlap DO NOTHING
+                    RETURNING id, office_number, start_time
+                ''', [
+                    (
+                        result.request.office_number,
+                        result.request.user_name,
+                        result.request.user_email,
+                        result.request.user_phone,
+                        result.request.start_time,
+                        result.request.end_time
+                    )
+                    for result in pending.values()
+                ], page_size=len(pending), fetch=True) if pending else []
+        except psycopg2.Error as e:
+            raise DatabaseError(f"Failed to book offices in bulk: {e}")
+
+        for booking_id, office_number, start_time in inserted:
+            result = pending.pop((office_number, start_time))
+            result.booking_id = booking_id
+            booking = result.request
+            self._record_index_row((
+                booking_id,
+                booking.office_number,
+                booking.user_name,
+                booking.start_time,
+                booking.end_time
+            ))
+            self._invalidate_cache(booking.office_number, booking.start_time, booking.end_time)
+            self._record_write(booking.office_number)
+
+        # Anything left was taken by a concurrent writer after the conflict query.
+        for result in pending.values():
+            booking = result.request
+            result.conflicts = self._query_conflicts(
+                booking.office_number, booking.start_time, booking.end_time
+            )
+        return results
+
+    @instrumented('db.book_recurring', slow_log=True, summary=_booking_summary)
+    def book_recurring(self, booking: RecurringBooking) -> list[Occupancy]:
+        last_end = series_end(booking)
+        try:
+            with self.connection() as conn, conn.cursor() as cur:
+                cur.execute(f'''
+                    SELECT pg_advisory_xact_lock({RECURRENCE_LOCK_CLASS}, %(office_number)s);
+                    {FIND_RECURRING_SQL}
+                ''', {
+                    'office_number': booking.office_number,
+                    'offices': [booking.office_number],
+                    'start_time': booking.start_time,
+                    'end_time': last_end or datetime.max,
+                })
+                recurring = [_to_recurring(row) for row in cur.fetchall()]
+
+                # Every concrete booking and live hold inside the series'
+                # lifetime is checked against the rule directly; occurrences
+                # are never generated for the whole span.
+                cur.execute(f'''
+                    SELECT user_name, start_time, end_time
+                    FROM bookings
+                    WHERE office_number = %(office_number)s AND
+                          period && tsrange(%(start_time)s, %(end_time)s, '[)')
+                    UNION ALL
+                    SELECT '{HELD_BY}', start_time, end_time
+                    FROM booking_holds
+                    WHERE office_number = %(office_number)s AND
+                          period && tsrange(%(start_time)s, %(end_time)s, '[)') AND
+                          expires_at > LOCALTIMESTAMP
+                    ORDER BY start_time
+                ''', {
+                    'office_number': booking.office_number,
+                    'start_time': booking.start_time,
+                    'end_time': last_end,
+                })
+                conflicts = series_conflicts(
+                    booking,
+                    starmap(Occupancy, cur),
+                    recurring
+                )
+                if conflicts:
+                    return conflicts
+
+                cur.execute('''
+                    INSERT INTO recurring_bookings (
+                        office_number,
+                        user_name,
+                        user_email,
+                        user_phone,
+                        start_time,
+                        end_time,
+                        frequency,
+                        repeat_interval,
+                        repeat_until,
+                        repeat_count,
+                        series_end
+                    )
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    RETURNING id
                 ''', (
                     booking.office_number,
                     booking.user_name,
                     booking.user_email,
                     booking.user_phone,
                     booking.start_time,
-                    booking.end_time
+                    booking.end_time,
+                    booking.rule.frequency,
+                    booking.rule.interval,
+                    booking.rule.until,
+                    booking.rule.count,
+                    last_end
                 ))
+                rule_id = cur.fetchone()[0]
         except psycopg2.Error as e:
-            raise DatabaseError(f"Failed to book office: {e}")
+            raise DatabaseError(f"Failed to book recurring office: {e}")
+
+        self._record_index_rule(rule_id, booking)
+        self._invalidate_cache(booking.office_number, booking.start_time, None)
+        self._record_write(booking.office_number)
+        return []
+
+    @instrumented('db.hold_slot', slow_log=True, summary=_office_summary)
+    def hold_slot(self, office_number: int, start_time: datetime, end_time: datetime, ttl: float) -> Hold | list[Occupancy]:
+        params = {
+            'office_number': office_number,
+            'start_time': start_time,
+            'end_time': end_time,
+        }
+        try:
+            with self.connection() as conn, conn.cursor() as cur:
+                # The exclusive lock waits for bookings of the office that are
+                # in flight, so everything below reads committed state from
+                # the primary and no booking can slip in before the insert.
+                cur.execute(f'''
+                    SELECT pg_advisory_xact_lock({RECURRENCE_LOCK_CLASS}, %(office_number)s);
+                    DELETE FROM booking_holds
+                    WHERE office_number = %(office_number)s AND expires_at <= LOCALTIMESTAMP;
+                    {FIND_CONFLICTS_SQL}
+                ''', params)
+                conflicts = _expand_occupancy(cur.fetchall(), start_time, end_time)
+                if conflicts:
+                    return conflicts
+
+                hold_id = new_hold_id()
+                cur.execute('''
+                    INSERT INTO booking_holds (hold_id, office_number, start_time, end_time, expires_at)
+                    VALUES (%s, %s, %s, %s, LOCALTIMESTAMP + %s * INTERVAL '1 second')
+                    RETURNING expires_at
+                ''', (hold_id, office_number, start_time, end_time, ttl))
+                expires_at, = cur.fetchone()
+        except psycopg2.Error as e:
+            raise DatabaseError(f"Failed to hold office: {e}")
+        hold = Hold(hold_id, office_number, start_time, end_time, expires_at)
+        self._record_index_hold(hold)
+        self._invalidate_cache(office_number, start_time, end_time)
+        self._record_write(office_number)
+        return hold
+
+    @instrumented('db.confirm_hold', slow_log=True, summary=lambda hold_id, booking: _booking_summary(booking))
+    def confirm_hold(self, hold_id: str, booking: BookingRequest) -> list[Occupancy] | None:
+        # Nothing else can take a held slot, so the booking needs no checks
+        # of its own: one statement consumes the hold if it is live and
+        # covers exactly these times, and inserts the booking in its place.
+        # The exclusion constraint remains the last guard.
+        try:
+            with self.connection() as conn, conn.cursor() as cur:
+                cur.execute('''
+                    WITH held AS (
+                        DELETE FROM booking_holds
+                        WHERE hold_id = %(hold_id)s AND
+                              office_number = %(office_number)s AND
+                              start_time = %(start_time)s AND
+                              end_time = %(end_time)s AND
+                              expires_at > LOCALTIMESTAMP
+                        RETURNING hold_id
+                    ), booked AS (
+                        INSERT INTO bookings (office_number, user_name, user_email, user_phone, start_time, end_time)
+                        SELECT %(office_number)s, %(user_name)s, %(user_email)s, %(user_phone)s,
+                               %(start_time)s, %(end_time)s
+                        FROM held
+                        ON CONFLICT ON CONSTRAINT bookings_no_overlap DO NOTHING
+                        RETURNING id
+                    )
+                    SELECT EXISTS (SELECT 1 FROM held), (SELECT id FROM booked)
+                ''', {
+                    'hold_id': hold_id,
+                    'office_number': booking.office_number,
+                    'user_name': booking.user_name,
+                    'user_email': booking.user_email,
+                    'user_phone': booking.user_phone,
+                    'start_time': booking.start_time,
+                    'end_time': booking.end_time,
+                })
+                held, booking_id = cur.fetchone()
+        except psycopg2.Error as e:
+            raise DatabaseError(f"Failed to confirm hold: {e}")
+        if not held:
+            return None
+
+        self._record_index_release(hold_id)
+        self._invalidate_cache(booking.office_number, booking.start_time, booking.end_time)
+        self._record_write(booking.office_number)
+        if booking_id is None:
+            return self._query_conflicts(booking.office_number, booking.start_time, booking.end_time)
+        self._record_index_row((
+            booking_id,
+            booking.office_number,
+            booking.user_name,
+            booking.start_time,
+            booking.end_time
+        ))
+        return []
+
+    @instrumented('db.get_hold')
+    def get_hold(self, hold_id: str) -> Hold | None:
+        try:
+            with self.connection() as conn, conn.cursor() as cur:
+                cur.execute('''
+                    SELECT hold_id, office_number, start_time, end_time, expires_at
+                    FROM booking_holds
+                    WHERE hold_id = %s AND expires_at > LOCALTIMESTAMP
+                ''', (hold_id,))
+                row = cur.fetchone()
+        except psycopg2.Error as e:
+            raise DatabaseError(f"Failed to get hold: {e}")
+        return Hold(*row) if row is not None else None
+
+    @instrumented('db.release_hold')
+    def release_hold(self, hold_id: str) -> bool:
+        try:
+            with self.connection() as conn, conn.cursor() as cur:
+                cur.execute('''
+                    DELETE FROM booking_holds
+                    WHERE hold_id = %s
+                    RETURNING office_number, start_time, end_time, expires_at > LOCALTIMESTAMP
+                ''', (hold_id,))
+                row = cur.fetchone()
+        except psycopg2.Error as e:
+            raise DatabaseError(f"Failed to release hold: {e}")
+        if row is None:
+            return False
+        office_number, start_time, end_time, live = row
+        self._record_index_release(hold_id)
+        self._invalidate_cache(office_number, start_time, end_time)
+        self._record_write(office_number)
+        return live
+
+    @instrumented('db.get_window_holds')
+    def get_window_holds(
+            self,
+            start_time: datetime,
+            end_time: datetime,
+            offices: list[int] | None = None
+    ) -> dict[int, list[Occupancy]]:
+        # Holds last minutes, so they are always read from the primary.
+        office_filter = ' AND office_number = ANY(%(offices)s)' if offices is not None else ''
+        held: dict[int, list[Occupancy]] = {}
+        try:
+            with self.connection() as conn, conn.cursor() as cur:
+                cur.execute(f'''
+                    SELECT office_number, start_time, end_time
+                    FROM booking_holds
+                    WHERE period && tsrange(%(start_time)s, %(end_time)s, '[)') AND
+                          expires_at > LOCALTIMESTAMP{office_filter}
+                    ORDER BY office_number, start_time
+                ''', {
+                    'start_time': start_time,
+                    'end_time': end_time,
+                    'offices': list(offices) if offices is not None else None,
+                })
+                for office_number, held_from, held_until in cur:
+                    held.setdefault(office_number, []).append(Occupancy(HELD_BY, held_from, held_until))
+        except psycopg2.Error as e:
+            raise DatabaseError(f"Failed to get holds: {e}")
+        return held
+
+    @instrumented('db.get_offices')
+    def get_offices(self) -> list[Office]:
+        try:
+            with self.connection() as conn, conn.cursor() as cur:
+                cur.execute('''
+                    SELECT office_number, site, capacity, attributes
+                    FROM offices
+                    ORDER BY office_number
+                ''')
+                return [
+                    Office(office_number, site, capacity, frozenset(attributes))
+                    for office_number, site, capacity, attributes in cur.fetchall()
+                ]
+        except psycopg2.Error as e:
+            raise DatabaseError(f"Failed to load offices: {e}")
+
+    @instrumented('db.save_office')
+    def save_office(self, office: Office) -> None:
+        try:
+            with self.connection() as conn, conn.cursor() as cur:
+                cur.execute('''
+                    INSERT INTO offices (office_number, site, capacity, attributes)
+                    VALUES (%s, %s, %s, %s)
+                    ON CONFLICT (office_number) DO UPDATE
+                    SET site = EXCLUDED.site,
+                        capacity = EXCLUDED.capacity,
+                        attributes = EXCLUDED.attributes,
+                        updated_at = CURRENT_TIMESTAMP
+                ''', (office.office_number, office.site, office.capacity, sorted(office.attributes)))
+        except psycopg2.Error as e:
+            raise DatabaseError(f"Failed to save office: {e}")
+        self._record_index_update(self.invalidate_office_catalogue)
+
+    @instrumented('db.get_recurring_bookings')
+    def get_recurring_bookings(
+            self,
+            start_time: datetime,
+            end_time: datetime,
+            offices: list[int] | None = None
+    ) -> list[RecurringBooking]:
+        office_filter = ' AND office_number = ANY(%(offices)s)' if offices is not None else ''
+        try:
+            with self._read_connection(offices) as conn, conn.cursor() as cur:
+                cur.execute(f'''
+                    SELECT office_number, {RECURRING_COLUMNS}
+                    FROM recurring_bookings
+                    WHERE start_time < %(end_time)s AND
+                          (series_end IS NULL OR series_end > %(start_time)s){office_filter}
+                ''', {
+                    'start_time': start_time,
+                    'end_time': end_time,
+                    'offices': list(offices) if offices is not None else None,
+                })
+                return [_to_recurring(row) for row in cur.fetchall()]
+        except psycopg2.Error as e:
+            raise DatabaseError(f"Failed to get recurring bookings: {e}")
+
+    def iter_bookings(
+            self,
+            start_time: datetime,
+            end_time: datetime,
+            offices: list[int] | None = None,
+            batch_size: int = REPORT_BATCH_SIZE
+    ) -> Iterator[ReportRow]:
+        # A named cursor keeps the result set on the server and fetches it
+        # batch_size rows at a time, so memory stays flat however many rows
+        # the window covers. The pooled connection is held until the caller
+        # exhausts or closes the generator.
+        office_filter = ' AND office_number = ANY(%(offices)s)' if offices is not None else ''
+        query = f'''
+            SELECT office_number, user_name, start_time, end_time
+            FROM bookings
+            WHERE period && tsrange(%(start_time)s, %(end_time)s, '[)'){office_filter}
+        '''
+        if start_time < datetime.now():
+            query += f'''
+                UNION ALL
+                SELECT office_number, user_name, start_time, end_time
+                FROM bookings_archive
+                WHERE tsrange(start_time, end_time, '[)') && tsrange(%(start_time)s, %(end_time)s, '[)'){office_filter} AND
+                      start_time >= %(start_time)s::timestamp - (SELECT max_duration FROM bookings_archive_state)
+            '''
+        query += ' ORDER BY start_time'
+
+        try:
+            with self._read_connection(offices) as conn, conn.cursor(name='bookings_report') as cur:
+                cur.itersize = batch_size
+                cur.execute(query, {
+                    'start_time': start_time,
+                    'end_time': end_time,
+                    'offices': list(offices) if offices is not None else None,
+                })
+                yield from cur
+        except psycopg2.Error as e:
+            raise DatabaseError(f"Failed to stream bookings: {e}")
+
+    @instrumented('db.archive_bookings', slow_log=True, summary=lambda before, *args, **kwargs: f'before={before}')
+    def archive_bookings(self, before: datetime, batch_size: int = 10000) -> int:
+        if before > datetime.now():
+            raise ValueError("Only bookings that have already ended can be archived")
+
+        try:
+            with self.transaction():
+                with self.conn.cursor() as cur:
+                    cur.execute('''
+                        SELECT ensure_bookings_archive_partition(month_start)
+                        FROM (
+                            SELECT DISTINCT date_trunc('month', start_time) AS month_start
+                            FROM bookings
+                            WHERE end_time < %s
+                        ) months
+                    ''', (before,))
+
+            archived = 0
+            while True:
+                with self.transaction():
+                    with self.conn.cursor() as cur:
+                        cur.execute('''
+                            WITH moved AS (
+                                DELETE FROM bookings
+                                WHERE id IN (
+                                    SELECT id
+                                    FROM bookings
+                                    WHERE end_time < %s
+                                    ORDER BY id
+                                    LIMIT %s
+                                    FOR UPDATE SKIP LOCKED
+                                )
+                                RETURNING id, office_number, user_name, user_email,
+                                          user_phone, start_time, end_time, created_at
+                            ), copied AS (
+                                INSERT INTO bookings_archive (
+                                    id, office_number, user_name, user_email,
+                                    user_phone, start_time, end_time, created_at
+                                )
+                                SELECT * FROM moved
+                                RETURNING end_time - start_time AS duration
+                            )
+                            SELECT count(*), max(duration) FROM copied
+                        ''', (before, batch_size))
+                        moved, max_duration = cur.fetchone()
+                        cur.execute('''
+                            UPDATE bookings_archive_state
+                            SET archived_before = GREATEST(archived_before, %s),
+                                max_duration = GREATEST(max_duration, COALESCE(%s, INTERVAL '0'))
+                        ''', (before, max_duration))
+                archived += moved
+                if moved < batch_size:
+                    break
+        except psycopg2.Error as e:
+            raise DatabaseError(f"Failed to archive bookings: {e}")
 
-    def __enter__(self):
-        return self
+        if archived:
+            self.invalidate_availability_index()
+        return archived
 
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        self.conn.close()
+    def close(self) -> None:
+        if self._change_listener is not None:
+            self._change_listener.close()
+        if self.replicas is not None:
+            self.replicas.close()
+        if self._owns_pool:
+            self.pool.close()
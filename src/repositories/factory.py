@@ -0,0 +1,24 @@
+from config.config import DatabaseConfig
+from src.repositories.base import BookingRepository
+
+
+# Long-running processes (the HTTP server, the interactive menu) listen for
+# other processes' writes and may cache occupancy. One-shot commands get
+# neither, as they would exit before either paid off.
+def create_repository(db_config: DatabaseConfig, long_running: bool = False) -> BookingRepository:
+    match db_config.backend:
+        case 'postgres':
+            from src.repositories.database import Database
+            from src.repositories.occupancy_cache import OccupancyCache
+            occupancy_cache = None
+            if long_running and db_config.cache_enabled:
+                occupancy_cache = OccupancyCache(db_config.cache_max_entries, db_config.cache_ttl)
+            return Database(db_config, occupancy_cache=occupancy_cache, listen=long_running)
+        case 'sqlite':
+            from src.repositories.sqlite import SQLiteDatabase
+            return SQLiteDatabase(db_config.path or ':memory:')
+        case 'memory':
+            from src.repositories.memory import InMemoryDatabase
+            return InMemoryDatabase()
+        case _:
+            raise ValueError(f"Unknown database backend '{db_config.backend}'")
@@ -0,0 +1,147 @@
+import heapq
+import secrets
+import threading
+from datetime import datetime, timedelta
+
+from src.models.models import Hold, Occupancy
+
+DEFAULT_HOLD_TTL = 120.0
+# Shown in place of a user name for slots that are held but not yet booked.
+HELD_BY = 'a pending booking'
+
+
+def new_hold_id() -> str:
+    return secrets.token_urlsafe(12)
+
+
+# Tentative reservations that lapse after a TTL unless confirmed. The
+# in-memory backend keeps its holds here; the availability index mirrors a
+# database's booking_holds table in one. Holds are grouped per office for
+# conflict checks; expiry runs off a min-heap of deadlines, so each call only
+# pops the holds that have actually expired instead of scanning all of them.
+class SlotHolds:
+    def __init__(self, clock=datetime.now):
+        self.clock = clock
+        self._holds: dict[str, Hold] = {}
+        self._by_office: dict[int, dict[str, Hold]] = {}
+        self._expiry: list[tuple[datetime, str]] = []
+        self._lock = threading.Lock()
+
+    def _expire(self, now: datetime) -> None:
+        while self._expiry and self._expiry[0][0] <= now:
+            _, hold_id = heapq.heappop(self._expiry)
+            # Confirmed or released holds leave their heap entry behind.
+            hold = self._holds.get(hold_id)
+            if hold is not None and hold.expires_at <= now:
+                self._drop(hold)
+
+    def _drop(self, hold: Hold) -> None:
+        del self._holds[hold.hold_id]
+        office_holds = self._by_office[hold.office_number]
+        del office_holds[hold.hold_id]
+        if not office_holds:
+            del self._by_office[hold.office_number]
+
+    def _conflicts(
+            self,
+            office_number: int,
+            start_time: datetime,
+            end_time: datetime,
+            exclude: str | None = None
+    ) -> list[Occupancy]:
+        return sorted(
+            (
+                Occupancy(HELD_BY, hold.start_time, hold.end_time)
+                for hold in self._by_office.get(office_number, {}).values()
+                if hold.hold_id != exclude and hold.start_time < end_time and start_time < hold.end_time
+            ),
+            key=lambda occupancy: occupancy.start_time
+        )
+
+    def conflicts(
+            self,
+            office_number: int,
+            start_time: datetime,
+            end_time: datetime,
+            exclude: str | None = None
+    ) -> list[Occupancy]:
+        # Live holds overlapping the slot, other than `exclude`.
+        with self._lock:
+            self._expire(self.clock())
+            return self._conflicts(office_number, start_time, end_time, exclude)
+
+    def window(
+            self,
+            start_time: datetime,
+            end_time: datetime,
+            offices: list[int] | None = None
+    ) -> dict[int, list[Occupancy]]:
+        # Live holds overlapping the window, for every office holding any.
+        with self._lock:
+            self._expire(self.clock())
+            return {
+                office_number: conflicts
+                for office_number in (self._by_office if offices is None else offices)
+                if (conflicts := self._conflicts(office_number, start_time, end_time))
+            }
+
+    def hold(self, office_number: int, start_time: datetime, end_time: datetime, ttl: float) -> Hold | list[Occupancy]:
+        # Returns the new hold, or the holds that overlap the slot.
+        with self._lock:
+            now = self.clock()
+            self._expire(now)
+            conflicts = self._conflicts(office_number, start_time, end_time)
+            if conflicts:
+                return conflicts
+            hold = Hold(new_hold_id(), office_number, start_time, end_time, now + timedelta(seconds=ttl))
+            self._add(hold)
+            return hold
+
+    def _add(self, hold: Hold) -> None:
+        self._holds[hold.hold_id] = hold
+        self._by_office.setdefault(hold.office_number, {})[hold.hold_id] = hold
+        heapq.heappush(self._expiry, (hold.expires_at, hold.hold_id))
+
+    def add(self, hold: Hold) -> None:
+        # Takes a hold made elsewhere, or puts back one released by a
+        # booking that was rolled back.
+        with self._lock:
+            if hold.hold_id not in self._holds:
+                self._add(hold)
+
+    def reload_window(self, office_number: int, start_time: datetime, end_time: datetime, holds: list[Hold]) -> None:
+        # Replaces the office's holds overlapping the window with a fresh
+        # read of it.
+        with self._lock:
+            for hold in list(self._by_office.get(office_number, {}).values()):
+                if hold.start_time < end_time and start_time < hold.end_time:
+                    self._drop(hold)
+            for hold in holds:
+                if hold.hold_id not in self._holds:
+                    self._add(hold)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._holds.clear()
+            self._by_office.clear()
+            self._expiry.clear()
+
+    def get(self, hold_id: str) -> Hold | None:
+        # The hold if it is still live.
+        with self._lock:
+            self._expire(self.clock())
+            return self._holds.get(hold_id)
+
+    def release(self, hold_id: str) -> Hold | None:
+        # The released hold, None if it had already expired or gone.
+        with self._lock:
+            self._expire(self.clock())
+            hold = self._holds.get(hold_id)
+            if hold is not None:
+                self._drop(hold)
+            return hold
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire(self.clock())
+            return len(self._holds)
@@ -0,0 +1,100 @@
+import json
+import logging
+import os
+import select
+import threading
+from typing import Callable
+
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+from config.config import DatabaseConfig
+
+logger = logging.getLogger(__name__)
+
+BOOKINGS_CHANNEL = 'bookings_changed'
+OFFICES_CHANNEL = 'offices_changed'
+
+
+# Relays NOTIFY payloads from other processes to per-channel handlers. It runs
+# on its own connection outside the pool because a listening connection stays
+# open for the life of the process. Notifications sent while it was
+# disconnected are lost, so on_reset is called on every (re)connect.
+class ChangeListener:
+    def __init__(
+            self,
+            db_config: DatabaseConfig,
+            handlers: dict[str, Callable[[dict], None]],
+            on_reset: Callable[[], None],
+            poll_interval: float = 1.0,
+            reconnect_delay: float = 1.0
+    ):
+        self.db_config = db_config
+        self.handlers = handlers
+        self.on_reset = on_reset
+        self.poll_interval = poll_interval
+        self.reconnect_delay = reconnect_delay
+        self._stop = threading.Event()
+        # Written to by close() so the select in _listen returns at once.
+        self._wake_read, self._wake_write = os.pipe()
+        self._thread = threading.Thread(target=self._run, name='change-listener', daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(**self.db_config.to_dict())
+                conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cur:
+                    for channel in self.handlers:
+                        cur.execute(f'LISTEN {channel}')
+                self._reset()
+                self._listen(conn)
+            except psycopg2.Error as e:
+                logger.warning(f"Change listener lost its connection: {e}")
+                self._reset()
+                self._stop.wait(self.reconnect_delay)
+            except Exception:
+                # Anything else would end the thread, and every later write
+                # would go unnoticed; start over on a new connection instead.
+                logger.exception("Change listener failed")
+                self._reset()
+                self._stop.wait(self.reconnect_delay)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def _listen(self, conn) -> None:
+        while not self._stop.is_set():
+            readable, _, _ = select.select([conn, self._wake_read], [], [], self.poll_interval)
+            if conn not in readable:
+                continue
+            conn.poll()
+            while conn.notifies:
+                notify = conn.notifies.pop(0)
+                try:
+                    self.handlers[notify.channel](json.loads(notify.payload or '{}'))
+                except Exception:
+                    # The change was not applied, so whatever it touched is
+                    # dropped everywhere instead.
+                    logger.exception(f"Failed to handle {notify.channel} payload {notify.payload!r}")
+                    self._reset()
+
+    def _reset(self) -> None:
+        try:
+            self.on_reset()
+        except Exception:
+            logger.exception("Change listener reset failed")
+
+    def close(self) -> None:
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        os.write(self._wake_write, b'\0')
+        if self._thread.is_alive():
+            self._thread.join()
+        os.close(self._wake_read)
+        os.close(self._wake_write)
@@ -0,0 +1,204 @@
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from functools import partial
+from itertools import chain
+from typing import Iterator
+
+from src.models.models import Occupancy, BookingRequest, BookingResult, Hold, Office, RecurringBooking
+from src.repositories.availability_index import AvailabilityIndex
+from src.repositories.base import BookingRepository, ReportRow
+from src.utils.constants import DEFAULT_OFFICE_COUNT, DEFAULT_SITE
+from src.utils.recurrence import series_conflicts, series_end
+
+
+class InMemoryDatabase(BookingRepository):
+    def __init__(self, offices: list[Office] | None = None):
+        if offices is None:
+            offices = [Office(office_number, DEFAULT_SITE) for office_number in range(1, DEFAULT_OFFICE_COUNT + 1)]
+        self.offices: dict[int, Office] = {office.office_number: office for office in offices}
+        self.index = AvailabilityIndex()
+        self.holds = self.index.holds
+        self.bookings: dict[int, BookingRequest] = {}
+        self.recurring_bookings: dict[int, RecurringBooking] = {}
+        self._next_id = 1
+        self._next_rule_id = 1
+        self._lock = threading.RLock()
+        self._local = threading.local()
+
+    @contextmanager
+    def transaction(self):
+        if getattr(self._local, 'undo', None) is not None:
+            yield
+            return
+
+        # Transactions are serialised on one lock, and writes are applied
+        # immediately with an undo log so later reads in the same
+        # transaction see them.
+        with self._lock:
+            self._local.undo = []
+            try:
+                yield
+            except BaseException:
+                for undo in reversed(self._local.undo):
+                    undo()
+                raise
+            finally:
+                self._local.undo = None
+
+    def find_conflicts(self, office_number: int, start_time: datetime, end_time: datetime) -> list[Occupancy]:
+        with self._lock:
+            return self.index.conflicts(office_number, start_time, end_time)
+
+    def get_window_occupancy(
+            self,
+            start_time: datetime,
+            end_time: datetime,
+            offices: list[int] | None = None
+    ) -> dict[int, list[Occupancy]]:
+        with self._lock:
+            return {
+                office_number: self.index.occupancy(office_number, start_time, end_time)
+                for office_number in (self.index.offices() if offices is None else offices)
+            }
+
+    def book_office(self, booking: BookingRequest) -> list[Occupancy]:
+        with self.transaction():
+            conflicts = self.index.conflicts(booking.office_number, booking.start_time, booking.end_time)
+            if conflicts:
+                return conflicts
+            self._add_booking(booking)
+            return []
+
+    def _add_booking(self, booking: BookingRequest) -> None:
+        booking_id = self._next_id
+        self._next_id += 1
+        self.bookings[booking_id] = booking
+        self.index.add(
+            booking_id,
+            booking.office_number,
+            booking.user_name,
+            booking.start_time,
+            booking.end_time
+        )
+        self._local.undo.append(partial(self._remove_booking, booking_id))
+
+    def _remove_booking(self, booking_id: int) -> None:
+        self.index.remove(booking_id)
+        del self.bookings[booking_id]
+
+    def book_recurring(self, booking: RecurringBooking) -> list[Occupancy]:
+        with self.transaction():
+            last_end = series_end(booking) or datetime.max
+            conflicts = series_conflicts(
+                booking,
+                chain(
+                    self.index.bookings(booking.office_number, booking.start_time, last_end),
+                    self.holds.conflicts(booking.office_number, booking.start_time, last_end)
+                ),
+                self.index.rules(booking.office_number)
+            )
+            if conflicts:
+                return conflicts
+
+            rule_id = self._next_rule_id
+            self._next_rule_id += 1
+            self.recurring_bookings[rule_id] = booking
+            self.index.add_rule(rule_id, booking)
+            self._local.undo.append(partial(self._remove_rule, rule_id))
+            return []
+
+    def _remove_rule(self, rule_id: int) -> None:
+        self.index.remove_rule(rule_id)
+        del self.recurring_bookings[rule_id]
+
+    def book_many(self, bookings: list[BookingRequest]) -> list[BookingResult]:
+        results = []
+        with self.transaction():
+            for booking in bookings:
+                conflicts = self.book_office(booking)
+                results.append(BookingResult(
+                    request=booking,
+                    booking_id=None if conflicts else self._next_id - 1,
+                    conflicts=conflicts
+                ))
+        return results
+
+    def hold_slot(self, office_number: int, start_time: datetime, end_time: datetime, ttl: float) -> Hold | list[Occupancy]:
+        with self._lock:
+            conflicts = self.index.conflicts(office_number, start_time, end_time)
+            if conflicts:
+                return conflicts
+            return self.holds.hold(office_number, start_time, end_time, ttl)
+
+    def confirm_hold(self, hold_id: str, booking: BookingRequest) -> list[Occupancy] | None:
+        with self.transaction():
+            hold = self.holds.get(hold_id)
+            if hold is None or (hold.office_number, hold.start_time, hold.end_time) != (
+                    booking.office_number, booking.start_time, booking.end_time):
+                return None
+            self.holds.release(hold_id)
+            self._local.undo.append(partial(self.holds.add, hold))
+            conflicts = self.index.conflicts(booking.office_number, booking.start_time, booking.end_time)
+            if conflicts:
+                return conflicts
+            self._add_booking(booking)
+            return []
+
+    def get_hold(self, hold_id: str) -> Hold | None:
+        return self.holds.get(hold_id)
+
+    def release_hold(self, hold_id: str) -> bool:
+        return self.holds.release(hold_id) is not None
+
+    def get_window_holds(
+            self,
+            start_time: datetime,
+            end_time: datetime,
+            offices: list[int] | None = None
+    ) -> dict[int, list[Occupancy]]:
+        return self.holds.window(start_time, end_time, offices)
+
+    def get_offices(self) -> list[Office]:
+        with self._lock:
+            return [self.offices[office_number] for office_number in sorted(self.offices)]
+
+    def save_office(self, office: Office) -> None:
+        with self._lock:
+            self.offices[office.office_number] = office
+        self.invalidate_office_catalogue()
+
+    def get_recurring_bookings(
+            self,
+            start_time: datetime,
+            end_time: datetime,
+            offices: list[int] | None = None
+    ) -> list[RecurringBooking]:
+        with self._lock:
+            return [
+                booking for booking in self.recurring_bookings.values()
+                if (offices is None or booking.office_number in offices) and
+                booking.start_time < end_time and
+                (series_end(booking) or datetime.max) > start_time
+            ]
+
+    def iter_bookings(
+            self,
+            start_time: datetime,
+            end_time: datetime,
+            offices: list[int] | None = None
+    ) -> Iterator[ReportRow]:
+        with self._lock:
+            rows = sorted(
+                (
+                    (booking.office_number, booking.user_name, booking.start_time, booking.end_time)
+                    for booking in self.bookings.values()
+                    if (offices is None or booking.office_number in offices) and
+                    booking.start_time < end_time and booking.end_time > start_time
+                ),
+                key=lambda row: row[2]
+            )
+        yield from rows
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,139 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import date, datetime, time as day_time, timedelta
+from typing import Callable
+
+from src.models.models import Occupancy
+
+BucketKey = tuple[int, date]
+# Loads one bucket: its occupancy and, when it includes holds, the seconds
+# until the first of them lapses.
+BucketLoader = Callable[[int, datetime, datetime], tuple[list[Occupancy], float | None]]
+
+
+@dataclass
+class CacheStats:
+    size: int = 0
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, day_time.min)
+
+
+class OccupancyCache:
+    def __init__(self, max_entries: int = 1024, ttl: float = 30.0, max_span_days: int = 7):
+        if max_entries < 1:
+            raise ValueError(f"Invalid cache size: {max_entries}")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_span_days = max_span_days
+        self._entries: OrderedDict[BucketKey, tuple[float, list[Occupancy]]] = OrderedDict()
+        self._version = 0
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    def _get(self, key: BucketKey) -> list[Occupancy] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            expires_at, occupancies = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._stats.expirations += 1
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return occupancies
+
+    def _put(self, key: BucketKey, occupancies: list[Occupancy], version: int, ttl: float | None = None) -> None:
+        with self._lock:
+            # An invalidation that ran while the bucket was being loaded may
+            # have been for a write the load did not see; drop the result
+            # rather than cache it for a whole TTL.
+            if version != self._version:
+                return
+            ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+            self._entries[key] = (time.monotonic() + ttl, occupancies)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+
+    def conflicts(
+            self,
+            office_number: int,
+            start_time: datetime,
+            end_time: datetime,
+            load: BucketLoader
+    ) -> list[Occupancy] | None:
+        # Answers from (office, day) buckets holding every booking and hold
+        # that overlaps that day. Returns None for windows spanning too many days
+        # so the caller falls back to querying directly.
+        first_day = start_time.date()
+        last_day = (end_time - timedelta(microseconds=1)).date()
+        if (last_day - first_day).days >= self.max_span_days:
+            return None
+
+        conflicts, seen = [], set()
+        day = first_day
+        while day <= last_day:
+            key = (office_number, day)
+            occupancies = self._get(key)
+            if occupancies is None:
+                with self._lock:
+                    version = self._version
+                occupancies, expires_in = load(office_number, _day_start(day), _day_start(day + timedelta(days=1)))
+                self._put(key, occupancies, version, expires_in)
+            for occupancy in occupancies:
+                if occupancy.start_time < end_time and occupancy.end_time > start_time:
+                    # Bookings crossing midnight sit in more than one bucket.
+                    identity = (occupancy.user_name, occupancy.start_time, occupancy.end_time)
+                    if identity not in seen:
+                        seen.add(identity)
+                        conflicts.append(occupancy)
+            day += timedelta(days=1)
+        return conflicts
+
+    def invalidate(
+            self,
+            office_number: int,
+            start_time: datetime | None = None,
+            end_time: datetime | None = None
+    ) -> None:
+        # Missing bounds invalidate the office's buckets on that side.
+        first_day = start_time.date() if start_time is not None else date.min
+        last_day = end_time.date() if end_time is not None else date.max
+        with self._lock:
+            self._version += 1
+            stale = [
+                key for key in self._entries
+                if key[0] == office_number and first_day <= key[1] <= last_day
+            ]
+            for key in stale:
+                del self._entries[key]
+            self._stats.invalidations += len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._stats.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return replace(self._stats, size=len(self._entries))
@@ -0,0 +1,67 @@
+import bisect
+from typing import Iterable
+
+from src.models.models import Office
+
+
+class OfficeCatalogue:
+    # Built once from the offices table and never mutated; a refresh swaps
+    # in a new catalogue, so lookups need no locking.
+    def __init__(self, offices: Iterable[Office] = ()):
+        self._offices: dict[int, Office] = {}
+        self._by_site: dict[str, set[int]] = {}
+        self._by_attribute: dict[str, set[int]] = {}
+        for office in offices:
+            self._offices[office.office_number] = office
+            self._by_site.setdefault(office.site, set()).add(office.office_number)
+            for attribute in office.attributes:
+                self._by_attribute.setdefault(attribute, set()).add(office.office_number)
+
+        self._office_numbers = sorted(self._offices)
+        self._by_capacity = sorted(
+            (office.capacity, office.office_number) for office in self._offices.values()
+        )
+        self._capacities = [capacity for capacity, _ in self._by_capacity]
+
+    def __contains__(self, office_number: int) -> bool:
+        return office_number in self._offices
+
+    def __len__(self) -> int:
+        return len(self._offices)
+
+    def get(self, office_number: int) -> Office | None:
+        return self._offices.get(office_number)
+
+    def office_numbers(self) -> list[int]:
+        return list(self._office_numbers)
+
+    def sites(self) -> list[str]:
+        return sorted(self._by_site)
+
+    def find(
+            self,
+            site: str | None = None,
+            min_capacity: int | None = None,
+            attributes: Iterable[str] = ()
+    ) -> list[Office]:
+        # Start from the narrowest index hit and intersect the rest into it.
+        candidates: set[int] | None = None
+        if site is not None:
+            candidates = self._by_site.get(site, set())
+        for attribute in attributes:
+            matching = self._by_attribute.get(attribute, set())
+            candidates = matching if candidates is None else candidates & matching
+
+        if min_capacity is not None:
+            if candidates is None:
+                position = bisect.bisect_left(self._capacities, min_capacity)
+                candidates = {office_number for _, office_number in self._by_capacity[position:]}
+            else:
+                candidates = {
+                    office_number for office_number in candidates
+                    if self._offices[office_number].capacity >= min_capacity
+                }
+
+        if candidates is None:
+            return [self._offices[office_number] for office_number in self._office_numbers]
+        return [self._offices[office_number] for office_number in sorted(candidates)]
@@ -0,0 +1,175 @@
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+
+import psycopg2
+from psycopg2.extensions import connection, TRANSACTION_STATUS_IDLE
+
+from config.config import DatabaseConfig
+from src.utils.exceptions import DatabaseError, PoolTimeoutError
+
+
+@dataclass
+class PoolStats:
+    size: int = 0
+    idle: int = 0
+    checkouts: int = 0
+    waits: int = 0
+    wait_time: float = 0.0
+    max_wait_time: float = 0.0
+    timeouts: int = 0
+    connections_created: int = 0
+    connections_discarded: int = 0
+
+    @property
+    def in_use(self) -> int:
+        return self.size - self.idle
+
+    @property
+    def avg_wait_time(self) -> float:
+        return self.wait_time / self.waits if self.waits else 0.0
+
+
+class ConnectionPool:
+    def __init__(
+            self,
+            db_config: DatabaseConfig,
+            min_size: int | None = None,
+            max_size: int | None = None,
+            timeout: float | None = None,
+            **connect_kwargs
+    ):
+        self.db_config = db_config
+        self.min_size = db_config.pool_min_size if min_size is None else min_size
+        self.max_size = db_config.pool_max_size if max_size is None else max_size
+        self.timeout = db_config.pool_timeout if timeout is None else timeout
+        if not 0 <= self.min_size <= self.max_size or self.max_size < 1:
+            raise ValueError(
+                f"Invalid pool size: min={self.min_size}, max={self.max_size}"
+            )
+
+        self._connect_kwargs = connect_kwargs
+        self._idle: deque[connection] = deque()
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._stats = PoolStats()
+
+        for _ in range(self.min_size):
+            self._idle.append(self._connect(self.timeout))
+            self._size += 1
+            self._stats.connections_created += 1
+
+    def _connect(self, timeout: float) -> connection:
+        # Runs without the lock held, so an unreachable server stalls only
+        # the caller opening the connection, and at most for the timeout.
+        # libpq takes whole seconds.
+        connect_kwargs = {'connect_timeout': max(1, math.ceil(timeout)), **self._connect_kwargs}
+        try:
+            return psycopg2.connect(**self.db_config.to_dict(), **connect_kwargs)
+        except psycopg2.Error as e:
+            raise DatabaseError(f"Failed to open pooled connection: {e}")
+
+    def getconn(self, timeout: float | None = None) -> connection:
+        timeout = self.timeout if timeout is None else timeout
+        with self._condition:
+            if self._closed:
+                raise DatabaseError("Connection pool is closed")
+
+            waited_since = None
+            deadline = None
+            while not self._idle and self._size >= self.max_size:
+                if waited_since is None:
+                    waited_since = time.monotonic()
+                    deadline = waited_since + timeout
+                    self._stats.waits += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._condition.wait(remaining):
+                    if not self._idle and self._size >= self.max_size:
+                        self._stats.timeouts += 1
+                        self._record_wait(waited_since)
+                        raise PoolTimeoutError(
+                            f"Timed out after {timeout}s waiting for a database connection"
+                        )
+                if self._closed:
+                    raise DatabaseError("Connection pool is closed")
+
+            if waited_since is not None:
+                self._record_wait(waited_since)
+            self._stats.checkouts += 1
+            if self._idle:
+                conn = self._idle.pop()
+                if not conn.closed:
+                    return conn
+                self._size -= 1
+                self._stats.connections_discarded += 1
+            # Reserve the slot before letting go of the lock, so concurrent
+            # callers cannot open more than max_size connections.
+            self._size += 1
+
+        try:
+            conn = self._connect(timeout)
+        except BaseException:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            self._stats.connections_created += 1
+            if self._closed:
+                self._size -= 1
+                self._stats.connections_discarded += 1
+                conn.close()
+                raise DatabaseError("Connection pool is closed")
+        return conn
+
+    def _record_wait(self, waited_since: float) -> None:
+        waited = time.monotonic() - waited_since
+        self._stats.wait_time += waited
+        self._stats.max_wait_time = max(self._stats.max_wait_time, waited)
+
+    def putconn(self, conn: connection, discard: bool = False) -> None:
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                discard = True
+
+        with self._condition:
+            if discard or conn.closed or self._closed:
+                self._size -= 1
+                self._stats.connections_discarded += 1
+                if not conn.closed:
+                    conn.close()
+            else:
+                self._idle.append(conn)
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self, timeout: float | None = None):
+        conn = self.getconn(timeout)
+        discard = False
+        try:
+            yield conn
+        except psycopg2.InterfaceError:
+            discard = True
+            raise
+        finally:
+            self.putconn(conn, discard=discard)
+
+    def stats(self) -> PoolStats:
+        with self._condition:
+            return replace(self._stats, size=self._size, idle=len(self._idle))
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            while self._idle:
+                self._idle.pop().close()
+                self._size -= 1
+            self._condition.notify_all()
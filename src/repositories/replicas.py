@@ -0,0 +1,161 @@
+import itertools
+import logging
+import threading
+import time
+from dataclasses import dataclass, replace
+
+import psycopg2
+
+from config.config import DatabaseConfig
+from src.repositories.pool import ConnectionPool
+from src.utils.exceptions import DatabaseError
+
+logger = logging.getLogger(__name__)
+
+# WAL position as a plain byte offset. On a primary (handy for pointing a
+# "replica" at the primary in development) the lag is zero by definition.
+REPLICA_STATUS_SQL = '''
+    SELECT CASE WHEN pg_is_in_recovery()
+                THEN pg_last_wal_replay_lsn()
+                ELSE pg_current_wal_lsn()
+           END - '0/0'::pg_lsn,
+           CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn()
+                THEN 0
+                ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+           END
+'''
+
+PRIMARY_LSN_SQL = "SELECT pg_current_wal_lsn() - '0/0'::pg_lsn"
+
+# Used when the primary's position could not be read after a write: reads of
+# the written offices stay on the primary until the next successful write.
+UNKNOWN_LSN = float('inf')
+
+# Probes run on the read path, so a replica that does not answer must fail
+# fast rather than hold the read up for the pool's full timeout.
+REPLICA_PROBE_TIMEOUT = 1.0
+
+
+@dataclass
+class ReplicaStatus:
+    healthy: bool = False
+    replay_lsn: int = 0
+    lag: float = 0.0
+    checked_at: float = float('-inf')
+
+
+@dataclass
+class ReplicaStats:
+    replica_reads: int = 0
+    primary_reads: int = 0
+    lagging_skips: int = 0
+    unreplayed_skips: int = 0
+    probe_failures: int = 0
+
+
+class Replica:
+    def __init__(self, name: str, pool: ConnectionPool):
+        self.name = name
+        self.pool = pool
+        self.status = ReplicaStatus()
+        self.probing = threading.Lock()
+
+
+# Picks a replica for a read. A replica qualifies when its last probe found
+# it reachable, no further behind than max_lag seconds, and past every write
+# this process committed to the offices being read. The probe result is
+# reused for check_interval seconds; replay positions only move forward, so
+# an old probe can only make routing more conservative.
+class ReplicaRouter:
+    def __init__(
+            self,
+            replicas: list[Replica],
+            max_lag: float = 5.0,
+            check_interval: float = 1.0,
+            probe_timeout: float = REPLICA_PROBE_TIMEOUT
+    ):
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.probe_timeout = probe_timeout
+        self._next = itertools.cycle(range(len(replicas)))
+        self._written_lsn: dict[int, float] = {}
+        self._max_written_lsn: float = 0
+        self._lock = threading.Lock()
+        self._stats = ReplicaStats()
+
+    @classmethod
+    def from_config(cls, db_config: DatabaseConfig) -> 'ReplicaRouter':
+        # Replica pools open connections on demand so a replica that is down
+        # at startup only costs a failed probe.
+        return cls(
+            [
+                Replica(f'{host}:{port}', ConnectionPool(db_config.for_endpoint(host, port), min_size=0))
+                for host, port in db_config.replicas
+            ],
+            max_lag=db_config.replica_max_lag,
+            check_interval=db_config.replica_check_interval
+        )
+
+    def record_write(self, offices, lsn: float) -> None:
+        with self._lock:
+            for office_number in offices:
+                self._written_lsn[office_number] = lsn
+            self._max_written_lsn = max(self._max_written_lsn, lsn)
+
+    def _required_lsn(self, offices: list[int] | None) -> float:
+        if offices is None:
+            return self._max_written_lsn
+        return max((self._written_lsn.get(office_number, 0) for office_number in offices), default=0)
+
+    def choose(self, offices: list[int] | None = None) -> Replica | None:
+        required_lsn = self._required_lsn(offices)
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._next)]
+            status = self._status(replica)
+            if not status.healthy:
+                continue
+            if status.lag > self.max_lag:
+                self._stats.lagging_skips += 1
+                continue
+            if status.replay_lsn < required_lsn:
+                self._stats.unreplayed_skips += 1
+                continue
+            self._stats.replica_reads += 1
+            return replica
+        self._stats.primary_reads += 1
+        return None
+
+    def _status(self, replica: Replica) -> ReplicaStatus:
+        status = replica.status
+        if time.monotonic() - status.checked_at < self.check_interval:
+            return status
+        # One thread probes; the others keep using the previous result.
+        if not replica.probing.acquire(blocking=False):
+            return status
+        try:
+            replica.status = self._probe(replica)
+        finally:
+            replica.probing.release()
+        return replica.status
+
+    def _probe(self, replica: Replica) -> ReplicaStatus:
+        try:
+            with replica.pool.connection(timeout=self.probe_timeout) as conn, conn.cursor() as cur:
+                cur.execute(REPLICA_STATUS_SQL)
+                replay_lsn, lag = cur.fetchone()
+        except (psycopg2.Error, DatabaseError) as e:
+            logger.warning(f"Replica {replica.name} is unavailable: {e}")
+            self._stats.probe_failures += 1
+            return ReplicaStatus(healthy=False, checked_at=time.monotonic())
+        return ReplicaStatus(True, int(replay_lsn), float(lag), time.monotonic())
+
+    def mark_unhealthy(self, replica: Replica) -> None:
+        replica.status = ReplicaStatus(healthy=False, checked_at=time.monotonic())
+
+    def stats(self) -> ReplicaStats:
+        return replace(self._stats)
+
+    def close(self) -> None:
+        for replica in self.replicas:
+            replica.pool.close()
@@ -0,0 +1,26 @@
+from itertools import starmap
+from operator import itemgetter
+from typing import Callable, Generic, Iterable, Iterator, TypeVar
+
+Model = TypeVar('Model')
+
+
+# Builds models straight from driver row tuples. The wanted columns are
+# picked with itemgetter and passed to the constructor through starmap, so
+# rows are never sliced or unpacked into intermediate lists one at a time.
+class RowMapper(Generic[Model]):
+    def __init__(self, model: Callable[..., Model], *columns: int):
+        if len(columns) < 2:
+            raise ValueError("A row mapper needs at least two columns")
+        self.model = model
+        self.columns = columns
+        self._pick = itemgetter(*columns)
+
+    def __call__(self, row: tuple) -> Model:
+        return self.model(*self._pick(row))
+
+    def iter(self, rows: Iterable[tuple]) -> Iterator[Model]:
+        return starmap(self.model, map(self._pick, rows))
+
+    def many(self, rows: Iterable[tuple]) -> list[Model]:
+        return list(self.iter(rows))
@@ -0,0 +1,580 @@
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Iterator
+
+from src.models.models import (
+    Occupancy,
+    BookingRequest,
+    BookingResult,
+    Hold,
+    Office,
+    RecurrenceRule,
+    RecurringBooking
+)
+from src.repositories.availability_index import AvailabilityIndex
+from src.repositories.base import BookingRepository, ReportRow
+from src.repositories.holds import HELD_BY, new_hold_id
+from src.utils.constants import DEFAULT_OFFICE_COUNT, DEFAULT_SITE
+from src.utils.exceptions import DatabaseError
+from src.utils.recurrence import occurrence_conflicts, series_conflicts, series_end
+
+
+def _to_text(dt: datetime) -> str:
+    # Fixed-width timestamps compare correctly as plain strings.
+    return dt.isoformat(sep=' ', timespec='microseconds')
+
+
+def _to_occupancy(row: tuple) -> Occupancy:
+    user_name, start_time, end_time = row
+    return Occupancy(
+        user_name,
+        datetime.fromisoformat(start_time),
+        datetime.fromisoformat(end_time)
+    )
+
+
+def _to_recurring(row: tuple) -> RecurringBooking:
+    (office_number, user_name, user_email, user_phone, start_time, end_time,
+     frequency, interval, until, count) = row
+    return RecurringBooking(
+        office_number,
+        user_name,
+        user_email,
+        user_phone,
+        datetime.fromisoformat(start_time),
+        datetime.fromisoformat(end_time),
+        RecurrenceRule(
+            frequency,
+            interval,
+            datetime.fromisoformat(until) if until is not None else None,
+            count
+        )
+    )
+
+
+class SQLiteDatabase(BookingRepository):
+    def __init__(self, path: str = ':memory:'):
+        try:
+            self.path = path
+            self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self.conn.execute('PRAGMA journal_mode=WAL')
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to initialize database: {e}")
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._create_tables()
+
+    def _create_tables(self) -> None:
+        with self.transaction():
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS bookings (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    office_number INTEGER,
+                    user_name TEXT,
+                    user_email TEXT,
+                    user_phone TEXT,
+                    start_time TEXT,
+                    end_time TEXT,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            self.conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_bookings_office_time
+                ON bookings (office_number, start_time, end_time)
+            ''')
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS recurring_bookings (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    office_number INTEGER,
+                    user_name TEXT,
+                    user_email TEXT,
+                    user_phone TEXT,
+                    start_time TEXT,
+                    end_time TEXT,
+                    frequency TEXT,
+                    repeat_interval INTEGER,
+                    repeat_until TEXT,
+                    repeat_count INTEGER,
+                    series_end TEXT,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            self.conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_recurring_bookings_office_time
+                ON recurring_bookings (office_number, start_time, series_end)
+            ''')
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS offices (
+                    office_number INTEGER PRIMARY KEY,
+                    site TEXT NOT NULL,
+                    capacity INTEGER NOT NULL DEFAULT 1,
+                    attributes TEXT NOT NULL DEFAULT '[]',
+                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS booking_holds (
+                    hold_id TEXT PRIMARY KEY,
+                    office_number INTEGER NOT NULL,
+                    start_time TEXT NOT NULL,
+                    end_time TEXT NOT NULL,
+                    expires_at TEXT NOT NULL
+                )
+            ''')
+            self.conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_booking_holds_office_time
+                ON booking_holds (office_number, start_time, end_time)
+            ''')
+            if self.conn.execute('SELECT count(*) FROM offices').fetchone()[0] == 0:
+                self.conn.executemany(
+                    'INSERT INTO offices (office_number, site) VALUES (?, ?)',
+                    [(office_number, DEFAULT_SITE) for office_number in range(1, DEFAULT_OFFICE_COUNT + 1)]
+                )
+
+    @contextmanager
+    def transaction(self):
+        if getattr(self._local, 'depth', 0):
+            yield
+            return
+
+        with self._lock:
+            self._local.depth = 1
+            try:
+                self.conn.execute('BEGIN IMMEDIATE')
+                yield
+                self.conn.execute('COMMIT')
+            except sqlite3.Error as e:
+                self.conn.execute('ROLLBACK')
+                raise DatabaseError(f"Transaction failed: {e}")
+            except BaseException:
+                self.conn.execute('ROLLBACK')
+                raise
+            finally:
+                self._local.depth = 0
+
+    def get_offices(self) -> list[Office]:
+        try:
+            with self._lock:
+                rows = self.conn.execute('''
+                    SELECT office_number, site, capacity, attributes
+                    FROM offices
+                    ORDER BY office_number
+                ''').fetchall()
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to load offices: {e}")
+        return [
+            Office(office_number, site, capacity, frozenset(json.loads(attributes)))
+            for office_number, site, capacity, attributes in rows
+        ]
+
+    def save_office(self, office: Office) -> None:
+        with self.transaction():
+            try:
+                self.conn.execute('''
+                    INSERT INTO offices (office_number, site, capacity, attributes)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT (office_number) DO UPDATE
+                    SET site = excluded.site,
+                        capacity = excluded.capacity,
+                        attributes = excluded.attributes,
+                        updated_at = CURRENT_TIMESTAMP
+                ''', (office.office_number, office.site, office.capacity, json.dumps(sorted(office.attributes))))
+            except sqlite3.Error as e:
+                raise DatabaseError(f"Failed to save office: {e}")
+        self.invalidate_office_catalogue()
+
+    def get_recurring_bookings(
+            self,
+            start_time: datetime,
+            end_time: datetime,
+            offices: list[int] | None = None
+    ) -> list[RecurringBooking]:
+        query = '''
+            SELECT office_number, user_name, user_email, user_phone, start_time, end_time,
+                   frequency, repeat_interval, repeat_until, repeat_count
+            FROM recurring_bookings
+            WHERE start_time < ? AND (series_end IS NULL OR series_end > ?)
+        '''
+        params = [_to_text(end_time), _to_text(start_time)]
+        if offices is not None:
+            query += f" AND office_number IN ({', '.join('?' * len(offices))})"
+            params.extend(offices)
+        try:
+            with self._lock:
+                rows = self.conn.execute(query, params).fetchall()
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to get recurring bookings: {e}")
+        return [_to_recurring(row) for row in rows]
+
+    def iter_bookings(
+            self,
+            start_time: datetime,
+            end_time: datetime,
+            offices: list[int] | None = None,
+            batch_size: int = 10000
+    ) -> Iterator[ReportRow]:
+        query = '''
+            SELECT office_number, user_name, start_time, end_time
+            FROM bookings
+            WHERE start_time < ? AND end_time > ?
+        '''
+        params = [_to_text(end_time), _to_text(start_time)]
+        if offices is not None:
+            query += f" AND office_number IN ({', '.join('?' * len(offices))})"
+            params.extend(offices)
+        query += ' ORDER BY start_time'
+
+        try:
+            with self._lock:
+                cur = self.conn.execute(query, params)
+            while True:
+                with self._lock:
+                    rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                for office_number, user_name, booked_from, booked_until in rows:
+                    yield (
+                        office_number,
+                        user_name,
+                        datetime.fromisoformat(booked_from),
+                        datetime.fromisoformat(booked_until)
+                    )
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to stream bookings: {e}")
+
+    def find_conflicts(self, office_number: int, start_time: datetime, end_time: datetime) -> list[Occupancy]:
+        try:
+            with self._lock:
+                rows = self.conn.execute('''
+                    SELECT user_name, start_time, end_time
+                    FROM bookings
+                    WHERE office_number = :office_number AND
+                          start_time < :end_time AND end_time > :start_time
+                    UNION ALL
+                    SELECT :held_by, start_time, end_time
+                    FROM booking_holds
+                    WHERE office_number = :office_number AND
+                          start_time < :end_time AND end_time > :start_time AND
+                          expires_at > :now
+                    ORDER BY 2
+                ''', {
+                    'office_number': office_number,
+                    'start_time': _to_text(start_time),
+                    'end_time': _to_text(end_time),
+                    'held_by': HELD_BY,
+                    'now': _to_text(datetime.now()),
+                }).fetchall()
+                recurring = self.get_recurring_bookings(start_time, end_time, [office_number])
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to find conflicting bookings: {e}")
+        conflicts = [_to_occupancy(row) for row in rows]
+        if recurring:
+            conflicts += occurrence_conflicts(recurring, start_time, end_time)
+            conflicts.sort(key=lambda occupancy: occupancy.start_time)
+        return conflicts
+
+    def get_window_occupancy(
+            self,
+            start_time: datetime,
+            end_time: datetime,
+            offices: list[int] | None = None
+    ) -> dict[int, list[Occupancy]]:
+        query = '''
+            SELECT office_number, user_name, start_time, end_time
+            FROM bookings
+            WHERE start_time < ? AND end_time > ?
+        '''
+        params = [_to_text(end_time), _to_text(start_time)]
+        if offices is not None:
+            query += f" AND office_number IN ({', '.join('?' * len(offices))})"
+            params.extend(offices)
+        query += ' ORDER BY office_number, start_time'
+
+        occupancy: dict[int, list[Occupancy]] = {office_number: [] for office_number in offices or ()}
+        try:
+            with self._lock:
+                rows = self.conn.execute(query, params).fetchall()
+                recurring = self.get_recurring_bookings(start_time, end_time, offices)
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to get window occupancy: {e}")
+        for office_number, *row in rows:
+            occupancy.setdefault(office_number, []).append(_to_occupancy(row))
+        for booking in recurring:
+            occupancies = occupancy.setdefault(booking.office_number, [])
+            occupancies += occurrence_conflicts([booking], start_time, end_time)
+            occupancies.sort(key=lambda entry: entry.start_time)
+        return occupancy
+
+    def _insert(self, booking: BookingRequest) -> int:
+        cur = self.conn.execute('''
+            INSERT INTO bookings (
+                office_number,
+                user_name,
+                user_email,
+                user_phone,
+                start_time,
+                end_time
+            )
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (
+            booking.office_number,
+            booking.user_name,
+            booking.user_email,
+            booking.user_phone,
+            _to_text(booking.start_time),
+            _to_text(booking.end_time)
+        ))
+        return cur.lastrowid
+
+    def _held(self, office_number: int, start_time: datetime, end_time: datetime) -> list[Occupancy]:
+        rows = self.conn.execute('''
+            SELECT ?, start_time, end_time
+            FROM booking_holds
+            WHERE office_number = ? AND
+                  start_time < ? AND end_time > ? AND
+                  expires_at > ?
+            ORDER BY start_time
+        ''', (HELD_BY, office_number, _to_text(end_time), _to_text(start_time), _to_text(datetime.now())))
+        return [_to_occupancy(row) for row in rows]
+
+    def book_office(self, booking: BookingRequest) -> list[Occupancy]:
+        # BEGIN IMMEDIATE takes SQLite's write lock, so the conflict check and
+        # the insert cannot interleave with another writer.
+        with self.transaction():
+            try:
+                conflicts = self.find_conflicts(booking.office_number, booking.start_time, booking.end_time)
+                if conflicts:
+                    return conflicts
+                self._insert(booking)
+            except sqlite3.Error as e:
+                raise DatabaseError(f"Failed to book office: {e}")
+            return []
+
+    def confirm_hold(self, hold_id: str, booking: BookingRequest) -> list[Occupancy] | None:
+        with self.transaction():
+            try:
+                cur = self.conn.execute('''
+                    DELETE FROM booking_holds
+                    WHERE hold_id = ? AND office_number = ? AND start_time = ? AND end_time = ? AND expires_at > ?
+                ''', (
+                    hold_id,
+                    booking.office_number,
+                    _to_text(booking.start_time),
+                    _to_text(booking.end_time),
+                    _to_text(datetime.now())
+                ))
+                if cur.rowcount == 0:
+                    return None
+                conflicts = self.find_conflicts(booking.office_number, booking.start_time, booking.end_time)
+                if conflicts:
+                    return conflicts
+                self._insert(booking)
+            except sqlite3.Error as e:
+                raise DatabaseError(f"Failed to confirm hold: {e}")
+            return []
+
+    def book_many(self, bookings: list[BookingRequest]) -> list[BookingResult]:
+        results = [BookingResult(request=booking) for booking in bookings]
+        if not bookings:
+            return results
+
+        with self.transaction():
+            try:
+                self.conn.execute('''
+                    CREATE TEMP TABLE IF NOT EXISTS booking_batch (
+                        idx INTEGER PRIMARY KEY,
+                        office_number INTEGER,
+                        start_time TEXT,
+                        end_time TEXT
+                    )
+                ''')
+                self.conn.execute('DELETE FROM booking_batch')
+                self.conn.executemany(
+                    'INSERT INTO booking_batch VALUES (?, ?, ?, ?)',
+                    [
+                        (i, booking.office_number, _to_text(booking.start_time), _to_text(booking.end_time))
+                        for i, booking in enumerate(bookings)
+                    ]
+                )
+                existing = self.conn.execute('''
+                    SELECT r.idx, b.user_name, b.start_time, b.end_time
+                    FROM booking_batch r
+                    JOIN bookings b ON b.office_number = r.office_number AND
+                                       b.start_time < r.end_time AND
+                                       b.end_time > r.start_time
+                    UNION ALL
+                    SELECT r.idx, ?, h.start_time, h.end_time
+                    FROM booking_batch r
+                    JOIN booking_holds h ON h.office_number = r.office_number AND
+                                            h.start_time < r.end_time AND
+                                            h.end_time > r.start_time AND
+                                            h.expires_at > ?
+                    ORDER BY 1, 3
+                ''', (HELD_BY, _to_text(datetime.now()))).fetchall()
+                for idx, *row in existing:
+                    results[idx].conflicts.append(_to_occupancy(row))
+
+                recurring: dict[int, list[RecurringBooking]] = {}
+                for booking in self.get_recurring_bookings(
+                        min(booking.start_time for booking in bookings),
+                        max(booking.end_time for booking in bookings),
+                        sorted({booking.office_number for booking in bookings})
+                ):
+                    recurring.setdefault(booking.office_number, []).append(booking)
+
+                accepted = AvailabilityIndex()
+                for i, result in enumerate(results):
+                    if result.conflicts:
+                        continue
+                    booking = result.request
+                    result.conflicts = occurrence_conflicts(
+                        recurring.get(booking.office_number, ()), booking.start_time, booking.end_time
+                    ) or accepted.conflicts(
+                        booking.office_number, booking.start_time, booking.end_time
+                    )
+                    if not result.conflicts:
+                        accepted.add(i, booking.office_number, booking.user_name,
+                                     booking.start_time, booking.end_time)
+                        result.booking_id = self._insert(booking)
+            except sqlite3.Error as e:
+                raise DatabaseError(f"Failed to book offices in bulk: {e}")
+        return results
+
+    def book_recurring(self, booking: RecurringBooking) -> list[Occupancy]:
+        last_end = series_end(booking)
+        with self.transaction():
+            try:
+                query = '''
+                    SELECT user_name, start_time, end_time
+                    FROM bookings
+                    WHERE office_number = ? AND end_time > ?
+                '''
+                params = [booking.office_number, _to_text(booking.start_time)]
+                if last_end is not None:
+                    query += ' AND start_time < ?'
+                    params.append(_to_text(last_end))
+                concrete = [_to_occupancy(row) for row in self.conn.execute(query, params)]
+                concrete += self._held(booking.office_number, booking.start_time, last_end or datetime.max)
+                conflicts = series_conflicts(
+                    booking,
+                    concrete,
+                    self.get_recurring_bookings(booking.start_time, last_end or datetime.max, [booking.office_number])
+                )
+                if conflicts:
+                    return conflicts
+
+                self.conn.execute('''
+                    INSERT INTO recurring_bookings (
+                        office_number,
+                        user_name,
+                        user_email,
+                        user_phone,
+                        start_time,
+                        end_time,
+                        frequency,
+                        repeat_interval,
+                        repeat_until,
+                        repeat_count,
+                        series_end
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    booking.office_number,
+                    booking.user_name,
+                    booking.user_email,
+                    booking.user_phone,
+                    _to_text(booking.start_time),
+                    _to_text(booking.end_time),
+                    booking.rule.frequency,
+                    booking.rule.interval,
+                    _to_text(booking.rule.until) if booking.rule.until is not None else None,
+                    booking.rule.count,
+                    _to_text(last_end) if last_end is not None else None
+                ))
+            except sqlite3.Error as e:
+                raise DatabaseError(f"Failed to book recurring office: {e}")
+            return []
+
+    def hold_slot(self, office_number: int, start_time: datetime, end_time: datetime, ttl: float) -> Hold | list[Occupancy]:
+        now = datetime.now()
+        with self.transaction():
+            try:
+                self.conn.execute(
+                    'DELETE FROM booking_holds WHERE office_number = ? AND expires_at <= ?',
+                    (office_number, _to_text(now))
+                )
+                conflicts = self.find_conflicts(office_number, start_time, end_time)
+                if conflicts:
+                    return conflicts
+                hold = Hold(new_hold_id(), office_number, start_time, end_time, now + timedelta(seconds=ttl))
+                self.conn.execute(
+                    'INSERT INTO booking_holds VALUES (?, ?, ?, ?, ?)',
+                    (hold.hold_id, office_number, _to_text(start_time), _to_text(end_time), _to_text(hold.expires_at))
+                )
+            except sqlite3.Error as e:
+                raise DatabaseError(f"Failed to hold office: {e}")
+            return hold
+
+    def get_hold(self, hold_id: str) -> Hold | None:
+        try:
+            with self._lock:
+                row = self.conn.execute('''
+                    SELECT hold_id, office_number, start_time, end_time, expires_at
+                    FROM booking_holds
+                    WHERE hold_id = ? AND expires_at > ?
+                ''', (hold_id, _to_text(datetime.now()))).fetchone()
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to get hold: {e}")
+        if row is None:
+            return None
+        hold_id, office_number, start_time, end_time, expires_at = row
+        return Hold(
+            hold_id,
+            office_number,
+            datetime.fromisoformat(start_time),
+            datetime.fromisoformat(end_time),
+            datetime.fromisoformat(expires_at)
+        )
+
+    def release_hold(self, hold_id: str) -> bool:
+        with self.transaction():
+            try:
+                cur = self.conn.execute(
+                    'DELETE FROM booking_holds WHERE hold_id = ? AND expires_at > ?',
+                    (hold_id, _to_text(datetime.now()))
+                )
+            except sqlite3.Error as e:
+                raise DatabaseError(f"Failed to release hold: {e}")
+            return cur.rowcount > 0
+
+    def get_window_holds(
+            self,
+            start_time: datetime,
+            end_time: datetime,
+            offices: list[int] | None = None
+    ) -> dict[int, list[Occupancy]]:
+        query = '''
+            SELECT office_number, ?, start_time, end_time
+            FROM booking_holds
+            WHERE start_time < ? AND end_time > ? AND expires_at > ?
+        '''
+        params = [HELD_BY, _to_text(end_time), _to_text(start_time), _to_text(datetime.now())]
+        if offices is not None:
+            query += f" AND office_number IN ({', '.join('?' * len(offices))})"
+            params.extend(offices)
+        query += ' ORDER BY office_number, start_time'
+        try:
+            with self._lock:
+                rows = self.conn.execute(query, params).fetchall()
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to get holds: {e}")
+        held: dict[int, list[Occupancy]] = {}
+        for office_number, *row in rows:
+            held.setdefault(office_number, []).append(_to_occupancy(row))
+        return held
+
+    def close(self) -> None:
+        self.conn.close()
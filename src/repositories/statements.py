@@ -0,0 +1,119 @@
+import re
+import threading
+import weakref
+from dataclasses import dataclass, replace
+
+from psycopg2.errors import InvalidSqlStatementName
+from psycopg2.extensions import connection, cursor, TRANSACTION_STATUS_IDLE
+
+PARAM_PATTERN = re.compile(r'%\((\w+)\)s')
+
+
+@dataclass
+class StatementStats:
+    prepares: int = 0
+    executions: int = 0
+    text_executions: int = 0
+    fallbacks: int = 0
+
+
+@dataclass(frozen=True)
+class Statement:
+    name: str
+    sql: str
+    prepare_sql: str
+    execute_sql: str
+
+
+# Hot queries are written once with named parameters. On each connection they
+# are PREPAREd the first time any of them is used, in the same transaction as
+# that call, and afterwards run with EXECUTE so Postgres skips parsing and
+# planning. Connections opened later (or reopened after a failure) are new
+# objects, so they are prepared again on first use.
+class StatementRegistry:
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._statements: dict[str, Statement] = {}
+        # connection -> backend pid the statements were prepared on
+        self._prepared: weakref.WeakKeyDictionary[connection, int] = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._stats = StatementStats()
+
+    def register(self, name: str, sql: str, types: dict[str, str]) -> None:
+        # types maps each named parameter to its SQL type, in $n order.
+        positions = {param: i for i, param in enumerate(types, start=1)}
+        missing = set(PARAM_PATTERN.findall(sql)) - positions.keys()
+        if missing:
+            raise ValueError(f"Statement {name} has untyped parameters: {', '.join(sorted(missing))}")
+        prepare_sql = (
+            f"PREPARE {name} ({', '.join(types.values())}) AS "
+            + PARAM_PATTERN.sub(lambda match: f'${positions[match.group(1)]}', sql)
+        )
+        execute_sql = f"EXECUTE {name} ({', '.join(f'%({param})s' for param in types)})"
+        with self._lock:
+            self._statements[name] = Statement(name, sql, prepare_sql, execute_sql)
+            self._prepared.clear()
+
+    def execute(self, cur: cursor, *names: str, params: dict) -> None:
+        # Several statements sharing the same parameters go out in a single
+        # round trip; the cursor holds the result of the last one.
+        statements = [self._statements[name] for name in names]
+        if not self.enabled:
+            self._count('text_executions')
+            cur.execute('; '.join(statement.sql for statement in statements), params)
+            return
+
+        conn = cur.connection
+        idle = conn.get_transaction_status() == TRANSACTION_STATUS_IDLE
+        self._ensure_prepared(cur)
+        try:
+            cur.execute('; '.join(statement.execute_sql for statement in statements), params)
+            self._count('executions')
+        except InvalidSqlStatementName:
+            # The session lost its statements behind our back (a pooler
+            # issuing DISCARD ALL, say). Without earlier work in the
+            # transaction to lose, retry as plain text; otherwise the
+            # caller's transaction is already aborted and must fail.
+            with self._lock:
+                self._prepared.pop(conn, None)
+            if not idle:
+                raise
+            conn.rollback()
+            self._count('fallbacks')
+            cur.execute('; '.join(statement.sql for statement in statements), params)
+
+    def _ensure_prepared(self, cur: cursor) -> None:
+        conn = cur.connection
+        backend_pid = conn.info.backend_pid
+        with self._lock:
+            if self._prepared.get(conn) == backend_pid:
+                return
+        # The session may already hold some of them: prepared statements
+        # outlive a rolled back transaction, and other registries can share
+        # the pool.
+        cur.execute(
+            'SELECT name FROM pg_prepared_statements WHERE name = ANY(%s)',
+            (list(self._statements),)
+        )
+        existing = {name for name, in cur.fetchall()}
+        missing = [
+            statement.prepare_sql for name, statement in self._statements.items() if name not in existing
+        ]
+        if missing:
+            cur.execute('; '.join(missing))
+        with self._lock:
+            self._prepared[conn] = backend_pid
+            self._stats.prepares += 1
+
+    def _count(self, counter: str) -> None:
+        # Connections on other threads share the registry.
+        with self._lock:
+            setattr(self._stats, counter, getattr(self._stats, counter) + 1)
+
+    def forget(self, conn: connection) -> None:
+        with self._lock:
+            self._prepared.pop(conn, None)
+
+    def stats(self) -> StatementStats:
+        with self._lock:
+            return replace(self._stats)
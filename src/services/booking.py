@@ -1,53 +1,364 @@
-from datetime import datetime
-from src.utils.constants import MAX_OFFICE_NUMBER, Messages
-from src.models.models import BookingRequest
-from src.repositories.database import Database
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+from src.utils.constants import Messages
+from src.utils.exceptions import ValidationError
+from src.models.models import (
+    BookingRequest,
+    BookingResult,
+    Occupancy,
+    TimeWindow,
+    FreeSlot,
+    Office,
+    RecurringBooking,
+    HoldResult
+)
+from src.repositories.base import BookingRepository
+from src.repositories.holds import DEFAULT_HOLD_TTL
 from src.services.notification import NotificationManager
+from src.services.slots import free_intervals
+from src.utils.recurrence import FREQUENCIES
+from src.utils.metrics import MetricsRegistry, registry, instrumented
+from src.utils.validators import BookingValidator
+
+if TYPE_CHECKING:
+    from src.services.occupancy import OccupancyMatrix
 
 
 class OfficeBookingSystem:
-    def __init__(self, database: Database, notification_manager: NotificationManager):
+    def __init__(
+            self,
+            database: BookingRepository,
+            notification_manager: NotificationManager,
+            metrics: MetricsRegistry | None = None,
+            hold_ttl: float = DEFAULT_HOLD_TTL,
+            occupancy: 'OccupancyMatrix | None' = None
+    ):
         self.db = database
         self.notification_manager = notification_manager
+        self.metrics = metrics or registry
+        self.validator = BookingValidator()
+        self.hold_ttl = hold_ttl
+        self._occupancy = occupancy
+        self._occupancy_built = occupancy is not None
+
+    # The occupancy matrix is built on first use, so only callers asking
+    # for whole-fleet answers pay for importing NumPy. It is None when
+    # NumPy is missing.
+    @property
+    def occupancy(self) -> 'OccupancyMatrix | None':
+        if not self._occupancy_built:
+            from src.services.occupancy import build_occupancy_matrix
+            self._occupancy = build_occupancy_matrix(self.db)
+            self._occupancy_built = True
+        return self._occupancy
 
+    def _record_booking(self, booking_request: BookingRequest) -> None:
+        if self._occupancy is not None:
+            self._occupancy.add(booking_request.office_number, booking_request.start_time, booking_request.end_time)
+
+    @instrumented('booking.check_availability')
     def check_availability(self, office_number: int, start_time: datetime, end_time: datetime) -> str:
         if not self.is_valid_office_number(office_number):
-            return Messages.INVALID_OFFICE
+            return Messages.INVALID_OFFICE.format(office_number)
+        if end_time <= start_time:
+            return Messages.INVALID_TIME_RANGE
 
-        if self.db.is_office_available(office_number, start_time, end_time):
+        conflicts = self.db.find_conflicts(office_number, start_time, end_time)
+        if not conflicts:
             return Messages.AVAILABLE.format(office_number)
+        return self._occupied_message(office_number, conflicts[0])
 
-        occupancy = self.db.get_office_occupancy(office_number, start_time, end_time)
-        if occupancy:
-            return Messages.OCCUPIED.format(
-                office_number,
-                occupancy.user_name,
-                occupancy.start_time,
-                occupancy.end_time
-            )
-        return Messages.UNAVAILABLE
+    @instrumented('booking.find_conflicts')
+    def find_conflicts(self, office_number: int, start_time: datetime, end_time: datetime) -> list[Occupancy]:
+        if not self.is_valid_office_number(office_number):
+            raise ValidationError(Messages.INVALID_OFFICE.format(office_number))
+        if end_time <= start_time:
+            raise ValidationError(Messages.INVALID_TIME_RANGE)
+        return self.db.find_conflicts(office_number, start_time, end_time)
 
     def book_office(self, booking_request: BookingRequest) -> str:
-        if not self.is_valid_office_number(booking_request.office_number):
-            return Messages.INVALID_OFFICE
-
-        occupancy = self.db.get_office_occupancy(booking_request.office_number,
-                                                 booking_request.start_time,
-                                                 booking_request.end_time)
-        if occupancy:
-            return Messages.OCCUPIED.format(
-                booking_request.office_number,
-                occupancy.user_name,
-                occupancy.start_time,
-                occupancy.end_time
-            )
+        result = self.book(booking_request)
+        if result.error:
+            return result.error
+        if result.conflicts:
+            return self._occupied_message(booking_request.office_number, result.conflicts[0])
+        return Messages.BOOKING_SUCCESS.format(booking_request.office_number)
+
+    @instrumented('booking.book_office')
+    def book(self, booking_request: BookingRequest) -> BookingResult:
+        field_errors = self.validator.validate(booking_request, datetime.now(), self.db.office_catalogue)
+        if field_errors:
+            return self._invalid_result(booking_request, field_errors)
 
         with self.db.transaction():
-            self.db.book_office(booking_request)
+            conflicts = self.db.book_office(booking_request)
+
+        result = BookingResult(booking_request, conflicts=conflicts)
+        if result.conflicts:
+            self.metrics.increment('booking.conflicts')
+        else:
+            self._record_booking(booking_request)
             self.notification_manager.send_booking_confirmation(booking_request)
+        return result
 
-        return Messages.BOOKING_SUCCESS.format(booking_request.office_number)
+    @instrumented('booking.book_many')
+    def book_many(self, booking_requests: list[BookingRequest]) -> list[BookingResult]:
+        results: list[BookingResult | None] = [None] * len(booking_requests)
+        positions, valid_requests = [], []
+        all_errors = self.validator.validate_many(booking_requests, offices=self.db.office_catalogue)
+        for i, (booking_request, field_errors) in enumerate(zip(booking_requests, all_errors)):
+            if field_errors:
+                results[i] = self._invalid_result(booking_request, field_errors)
+            else:
+                positions.append(i)
+                valid_requests.append(booking_request)
+
+        with self.db.transaction():
+            booked = self.db.book_many(valid_requests)
+
+        for i, result in zip(positions, booked):
+            results[i] = result
+            if result.booked:
+                self._record_booking(result.request)
+                self.notification_manager.send_booking_confirmation(result.request)
+        return results
+
+    @instrumented('booking.hold_slot')
+    def hold_slot(self, office_number: int, start_time: datetime, end_time: datetime) -> HoldResult:
+        # Reserves the slot for hold_ttl seconds while the rest of the
+        # booking is collected. Booked slots and other holds both count; the
+        # repository checks them against the primary in the transaction that
+        # takes the hold, so every process sees it.
+        if not self.is_valid_office_number(office_number):
+            return HoldResult(error=Messages.INVALID_OFFICE.format(office_number))
+        if start_time < datetime.now():
+            return HoldResult(error=Messages.PAST_START_TIME)
+        if end_time <= start_time:
+            return HoldResult(error=Messages.INVALID_TIME_RANGE)
+
+        with self.db.transaction():
+            hold = self.db.hold_slot(office_number, start_time, end_time, self.hold_ttl)
+        if isinstance(hold, list):
+            return HoldResult(conflicts=hold)
+        return HoldResult(hold=hold)
+
+    @instrumented('booking.confirm_hold')
+    def confirm_hold(self, hold_id: str, booking_request: BookingRequest) -> BookingResult:
+        # Other bookings have respected the hold since it was taken, so the
+        # repository books the slot and consumes the hold in one step. Only
+        # a refused hold is looked up again, to say why.
+        field_errors = self.validator.validate(booking_request, datetime.now(), self.db.office_catalogue)
+        if field_errors:
+            return self._invalid_result(booking_request, field_errors)
+
+        with self.db.transaction():
+            conflicts = self.db.confirm_hold(hold_id, booking_request)
+        if conflicts is None:
+            error = Messages.HOLD_EXPIRED if self.db.get_hold(hold_id) is None else Messages.HOLD_MISMATCH
+            return BookingResult(booking_request, error=error)
+
+        result = BookingResult(booking_request, conflicts=conflicts)
+        if result.conflicts:
+            self.metrics.increment('booking.conflicts')
+        else:
+            self._record_booking(booking_request)
+            self.notification_manager.send_booking_confirmation(booking_request)
+        return result
+
+    def release_hold(self, hold_id: str) -> bool:
+        with self.db.transaction():
+            return self.db.release_hold(hold_id)
+
+    @instrumented('booking.book_recurring')
+    def book_recurring(self, booking: RecurringBooking) -> str:
+        field_errors = self.validator.validate(booking, datetime.now(), self.db.office_catalogue)
+        if field_errors:
+            return '; '.join(field_errors.values())
+        rule = booking.rule
+        if (rule.frequency not in FREQUENCIES or rule.interval < 1 or
+                (rule.count is not None and rule.count < 1)):
+            return Messages.INVALID_RECURRENCE
+
+        with self.db.transaction():
+            conflicts = self.db.book_recurring(booking)
+        if conflicts:
+            self.metrics.increment('booking.conflicts')
+            return self._occupied_message(booking.office_number, conflicts[0])
+        if self._occupancy is not None:
+            self._occupancy.invalidate()
+
+        self.notification_manager.send_booking_confirmation(BookingRequest(
+            office_number=booking.office_number,
+            user_name=booking.user_name,
+            user_email=booking.user_email,
+            user_phone=booking.user_phone,
+            start_time=booking.start_time,
+            end_time=booking.end_time
+        ))
+        return Messages.RECURRING_SUCCESS.format(booking.office_number, rule.frequency, booking.start_time)
+
+    @instrumented('booking.find_free_slots')
+    def find_free_slots(
+            self,
+            window: TimeWindow,
+            min_duration: timedelta = timedelta(0),
+            offices: list[int] | None = None
+    ) -> dict[int, list[FreeSlot]]:
+        if window.end_time <= window.start_time:
+            raise ValidationError(Messages.INVALID_TIME_RANGE)
+        offices = self._requested_offices(offices)
+
+        occupancy = dict(self.db.get_window_occupancy(window.start_time, window.end_time, offices))
+        for office_number, held in self.db.get_window_holds(window.start_time, window.end_time, offices).items():
+            occupancy[office_number] = sorted(
+                occupancy.get(office_number, []) + held,
+                key=lambda entry: entry.start_time
+            )
+        return {
+            office_number: [
+                FreeSlot(office_number, start_time, end_time)
+                for start_time, end_time in free_intervals(
+                    occupancy.get(office_number, []),
+                    window.start_time,
+                    window.end_time,
+                    min_duration
+                )
+            ]
+            for office_number in offices
+        }
+
+    @instrumented('booking.find_free_offices')
+    def find_free_offices(
+            self,
+            window: TimeWindow,
+            offices: list[int] | None = None
+    ) -> list[int]:
+        # Offices with nothing booked or held anywhere in the window.
+        if window.end_time <= window.start_time:
+            raise ValidationError(Messages.INVALID_TIME_RANGE)
+        offices = self._requested_offices(offices)
+        if self.occupancy is None:
+            return [
+                office_number for office_number in offices
+                if not self.db.find_conflicts(office_number, window.start_time, window.end_time)
+            ]
+        return self.occupancy.free_offices(
+            window.start_time,
+            window.end_time,
+            offices,
+            self.db.get_window_holds(window.start_time, window.end_time, offices)
+        )
+
+    @instrumented('booking.find_common_slot')
+    def find_common_slot(
+            self,
+            window: TimeWindow,
+            duration: timedelta,
+            rooms: int,
+            offices: list[int] | None = None
+    ) -> list[FreeSlot]:
+        # The earliest start in the window at which `rooms` offices are all
+        # free for `duration`; empty when there is none. The matrix only
+        # considers slot boundaries, the fallback any start.
+        if window.end_time <= window.start_time or duration <= timedelta(0):
+            raise ValidationError(Messages.INVALID_TIME_RANGE)
+        if rooms < 1:
+            raise ValidationError(Messages.INVALID_ROOM_COUNT.format(rooms))
+        offices = self._requested_offices(offices)
+
+        if self.occupancy is not None:
+            found = self.occupancy.earliest_common_slot(
+                window.start_time,
+                window.end_time,
+                duration,
+                rooms,
+                offices,
+                self.db.get_window_holds(window.start_time, window.end_time, offices)
+            )
+        else:
+            found = self._sweep_common_slot(window, duration, rooms, offices)
+        if found is None:
+            return []
+        start_time, free_offices = found
+        return [
+            FreeSlot(office_number, start_time, start_time + duration)
+            for office_number in free_offices[:rooms]
+        ]
+
+    def _sweep_common_slot(
+            self,
+            window: TimeWindow,
+            duration: timedelta,
+            rooms: int,
+            offices: list[int]
+    ) -> tuple[datetime, list[int]] | None:
+        # The earliest common start is always the start of one office's
+        # free interval, so only those are tried.
+        free_slots = self.find_free_slots(window, duration, offices)
+        for start_time in sorted({slot.start_time for slots in free_slots.values() for slot in slots}):
+            free_offices = [
+                office_number for office_number, slots in free_slots.items()
+                if any(slot.start_time <= start_time and start_time + duration <= slot.end_time for slot in slots)
+            ]
+            if len(free_offices) >= rooms:
+                return start_time, free_offices
+        return None
+
+    @instrumented('booking.office_utilisation')
+    def office_utilisation(
+            self,
+            window: TimeWindow,
+            offices: list[int] | None = None
+    ) -> dict[int, float]:
+        # Booked share of the window per office, to slot precision when the
+        # matrix is available.
+        if window.end_time <= window.start_time:
+            raise ValidationError(Messages.INVALID_TIME_RANGE)
+        offices = self._requested_offices(offices)
+        if self.occupancy is not None:
+            return self.occupancy.utilisation(window.start_time, window.end_time, offices)
+
+        length = window.end_time - window.start_time
+        occupancy = self.db.get_window_occupancy(window.start_time, window.end_time, offices)
+        return {
+            office_number: 1 - sum(
+                (end_time - start_time for start_time, end_time in free_intervals(
+                    occupancy.get(office_number, []), window.start_time, window.end_time
+                )),
+                timedelta(0)
+            ) / length
+            for office_number in offices
+        }
+
+    def find_offices(
+            self,
+            site: str | None = None,
+            min_capacity: int | None = None,
+            attributes: list[str] | None = None
+    ) -> list[Office]:
+        return self.db.office_catalogue.find(site, min_capacity, attributes or ())
+
+    def _requested_offices(self, offices: list[int] | None) -> list[int]:
+        if offices is None:
+            return self.db.office_catalogue.office_numbers()
+        for office_number in offices:
+            if not self.is_valid_office_number(office_number):
+                raise ValidationError(Messages.INVALID_OFFICE.format(office_number))
+        return offices
 
     @staticmethod
-    def is_valid_office_number(office_number: int) -> bool:
-        return 1 <= office_number <= MAX_OFFICE_NUMBER
+    def _invalid_result(booking_request: BookingRequest, field_errors: dict[str, str]) -> BookingResult:
+        return BookingResult(booking_request, error='; '.join(field_errors.values()), field_errors=field_errors)
+
+    @staticmethod
+    def _occupied_message(office_number: int, occupancy: Occupancy) -> str:
+        return Messages.OCCUPIED.format(
+            office_number,
+            occupancy.user_name,
+            occupancy.start_time,
+            occupancy.end_time
+        )
+
+    def is_valid_office_number(self, office_number: int) -> bool:
+        return office_number in self.db.office_catalogue
@@ -1,6 +1,16 @@
+import logging
+import queue
+import threading
+import time
 from abc import abstractmethod
+from collections import defaultdict
+from dataclasses import dataclass, replace
 
 from src.models.models import BookingRequest
+from src.utils.exceptions import PartialBatchError
+from src.utils.metrics import MetricsRegistry, registry
+
+logger = logging.getLogger(__name__)
 
 
 class NotificationService:
@@ -8,6 +18,19 @@ class NotificationService:
     def send(self, recipient: str, message: str) -> None:
         pass
 
+    # Raising anything but PartialBatchError means none of the batch went
+    # out and all of it is retried.
+    def send_batch(self, notifications: list[tuple[str, str]]) -> None:
+        failed, cause = [], None
+        for recipient, message in notifications:
+            try:
+                self.send(recipient, message)
+            except Exception as e:
+                failed.append((recipient, message))
+                cause = e
+        if failed:
+            raise PartialBatchError(failed, cause)
+
 
 class EmailService(NotificationService):
     def send(self, recipient: str, message: str) -> None:
@@ -19,15 +42,172 @@ class SMSService(NotificationService):
         print(f"Sending SMS to {recipient}: {message}")
 
 
+@dataclass
+class DispatcherStats:
+    queued: int = 0
+    sent: int = 0
+    batches: int = 0
+    retries: int = 0
+    failed: int = 0
+    dropped: int = 0
+
+
+class NotificationDispatcher:
+    def __init__(
+            self,
+            workers: int = 2,
+            batch_size: int = 50,
+            max_queue_size: int = 1000,
+            max_retries: int = 3,
+            retry_backoff: float = 0.5,
+            enqueue_timeout: float = 0.1,
+            metrics: MetricsRegistry | None = None
+    ):
+        if workers < 1 or batch_size < 1:
+            raise ValueError("workers and batch_size must be positive")
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.enqueue_timeout = enqueue_timeout
+        self.metrics = metrics or registry
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._stats = DispatcherStats()
+        self._stats_lock = threading.Lock()
+        self._closed = False
+        self._workers = [
+            threading.Thread(target=self._work, name=f"notification-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, service: NotificationService, recipient: str, message: str) -> bool:
+        if self._closed:
+            raise RuntimeError("Notification dispatcher is closed")
+        try:
+            self._queue.put((service, recipient, message), timeout=self.enqueue_timeout)
+        except queue.Full:
+            logger.warning(f"Notification queue is full, dropping message to {recipient}")
+            self._count(dropped=1)
+            self.metrics.increment('notification.dropped')
+            return False
+        self._count(queued=1)
+        return True
+
+    def _work(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            items = [item]
+            stop = False
+            while len(items) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                items.append(item)
+
+            batches = defaultdict(list)
+            for service, recipient, message in items:
+                batches[service].append((recipient, message))
+            for service, notifications in batches.items():
+                self._deliver(service, notifications)
+
+            for _ in range(len(items) + stop):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _deliver(self, service: NotificationService, notifications: list[tuple[str, str]]) -> None:
+        timer_name = f"notification.{type(service).__name__}.send_batch"
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self.metrics.timer(timer_name):
+                    service.send_batch(notifications)
+                self._count(sent=len(notifications), batches=1)
+                return
+            except Exception as e:
+                if isinstance(e, PartialBatchError):
+                    # Only what failed is retried, so nobody gets a message twice.
+                    self._count(sent=len(notifications) - len(e.failed))
+                    notifications = e.failed
+                if attempt == self.max_retries:
+                    logger.error(
+                        f"Giving up on {len(notifications)} notifications via "
+                        f"{type(service).__name__} after {attempt + 1} attempts: {e}"
+                    )
+                    self._count(failed=len(notifications))
+                    return
+                self._count(retries=1)
+                time.sleep(self.retry_backoff * 2 ** attempt)
+
+    def _count(self, **deltas: int) -> None:
+        with self._stats_lock:
+            for name, delta in deltas.items():
+                setattr(self._stats, name, getattr(self._stats, name) + delta)
+
+    def stats(self) -> DispatcherStats:
+        with self._stats_lock:
+            return replace(self._stats)
+
+    def gauges(self) -> dict[str, float]:
+        stats = self.stats()
+        return {
+            'depth': self._queue.qsize(),
+            'sent': stats.sent,
+            'retries': stats.retries,
+            'failed': stats.failed,
+            'dropped': stats.dropped,
+        }
+
+    def flush(self) -> None:
+        self._queue.join()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+
+
 class NotificationManager:
-    def __init__(self, email_service: NotificationService, sms_service: NotificationService):
+    def __init__(
+            self,
+            email_service: NotificationService,
+            sms_service: NotificationService,
+            dispatcher: NotificationDispatcher | None = None,
+            metrics: MetricsRegistry | None = None
+    ):
         self.email_service = email_service
         self.sms_service = sms_service
+        self.dispatcher = dispatcher
+        self.metrics = metrics or registry
+        if dispatcher is not None:
+            self.metrics.register_collector('notification.queue', dispatcher.gauges)
 
     def send_booking_confirmation(self, booking: BookingRequest) -> None:
         message = (f"You have booked office {booking.office_number} "
                    f"from {booking.start_time} "
                    f"to {booking.end_time}")
 
-        self.email_service.send(booking.user_email, message)
-        self.sms_service.send(booking.user_phone, message)
+        if self.dispatcher is None:
+            with self.metrics.timer(f"notification.{type(self.email_service).__name__}.send"):
+                self.email_service.send(booking.user_email, message)
+            with self.metrics.timer(f"notification.{type(self.sms_service).__name__}.send"):
+                self.sms_service.send(booking.user_phone, message)
+            return
+
+        self.dispatcher.submit(self.email_service, booking.user_email, message)
+        self.dispatcher.submit(self.sms_service, booking.user_phone, message)
+
+    def close(self) -> None:
+        if self.dispatcher is not None:
+            self.dispatcher.close()
@@ -0,0 +1,291 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import date, datetime, time as day_time, timedelta
+from typing import Callable
+
+from src.models.models import Occupancy
+from src.repositories.base import BookingRepository
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DEFAULT_SLOT = timedelta(minutes=15)
+DAY = timedelta(days=1)
+
+WindowLoader = Callable[[datetime, datetime, list[int] | None], dict[int, list[Occupancy]]]
+OfficeNumbers = Callable[[], list[int]]
+
+
+@dataclass
+class MatrixStats:
+    days: int = 0
+    offices: int = 0
+    bytes: int = 0
+    loads: int = 0
+    updates: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, day_time.min)
+
+
+# Occupancy of every office as one bit per slot, a day at a time: row i of a
+# day's matrix is office_numbers[i], packed eight slots to a byte. Bookings
+# mark every slot they touch, so a span reported free is free at any
+# granularity, while slot-sized gaps inside a partly booked slot are not
+# found. Days are loaded whole on first use and patched in place as this
+# process books. Writes by other processes drop the days they touch when the
+# repository announces them; ttl bounds staleness where it does not.
+class OccupancyMatrix:
+    def __init__(
+            self,
+            load: WindowLoader,
+            office_numbers: OfficeNumbers,
+            slot: timedelta = DEFAULT_SLOT,
+            ttl: float = 30.0,
+            max_days: int = 31,
+            clock=time.monotonic
+    ):
+        if np is None:
+            raise RuntimeError("OccupancyMatrix requires NumPy")
+        if slot <= timedelta(0) or DAY % slot:
+            raise ValueError(f"Slot length must divide a day: {slot}")
+        self.load = load
+        self.office_numbers = office_numbers
+        self.slot = slot
+        self.slots_per_day = DAY // slot
+        self.ttl = ttl
+        self.max_days = max_days
+        self.clock = clock
+        self._offices: list[int] = []
+        self._rows: dict[int, int] = {}
+        self._days: OrderedDict[date, tuple[float, np.ndarray]] = OrderedDict()
+        self._version = 0
+        self._lock = threading.Lock()
+        self._stats = MatrixStats()
+
+    def _sync_offices(self) -> None:
+        # A changed catalogue changes the row layout, so every day goes.
+        offices = self.office_numbers()
+        with self._lock:
+            if offices != self._offices:
+                self._offices = offices
+                self._rows = {office_number: row for row, office_number in enumerate(offices)}
+                self._days.clear()
+                self._version += 1
+
+    def _slot_range(self, day: date, start_time: datetime, end_time: datetime) -> tuple[int, int]:
+        # Slots of the day touched by [start_time, end_time).
+        day_start = _day_start(day)
+        first = max(0, (start_time - day_start) // self.slot)
+        last = min(self.slots_per_day, -((day_start - end_time) // self.slot))
+        return first, last
+
+    def _build(self, day: date, occupancy: dict[int, list[Occupancy]]) -> np.ndarray:
+        # Each booking adds +1 at its first slot and -1 past its last; a
+        # running sum along the row is then positive exactly on busy slots.
+        rows, firsts, lasts = [], [], []
+        for office_number, occupancies in occupancy.items():
+            row = self._rows.get(office_number)
+            if row is None:
+                continue
+            for entry in occupancies:
+                first, last = self._slot_range(day, entry.start_time, entry.end_time)
+                if first < last:
+                    rows.append(row)
+                    firsts.append(first)
+                    lasts.append(last)
+        edges = np.zeros((len(self._offices), self.slots_per_day + 1), dtype=np.int32)
+        np.add.at(edges, (rows, firsts), 1)
+        np.add.at(edges, (rows, lasts), -1)
+        return np.packbits(np.cumsum(edges[:, :-1], axis=1) > 0, axis=1)
+
+    def _day(self, day: date) -> np.ndarray:
+        with self._lock:
+            entry = self._days.get(day)
+            if entry is not None:
+                loaded_at, bits = entry
+                if self.clock() - loaded_at < self.ttl:
+                    self._days.move_to_end(day)
+                    return bits
+                del self._days[day]
+                self._stats.expirations += 1
+            version = self._version
+
+        day_start = _day_start(day)
+        bits = self._build(day, self.load(day_start, day_start + DAY, None))
+        with self._lock:
+            self._stats.loads += 1
+            # A booking or reset that landed during the load may be missing
+            # from it; use the result once but do not keep it.
+            if version == self._version:
+                self._days[day] = (self.clock(), bits)
+                while len(self._days) > self.max_days:
+                    self._days.popitem(last=False)
+                    self._stats.evictions += 1
+        return bits
+
+    def _busy(self, start_time: datetime, end_time: datetime) -> tuple[datetime, np.ndarray]:
+        # Unpacked busy flags (offices x slots) for every day the window
+        # touches, with the start of the first day.
+        first_day = start_time.date()
+        last_day = (end_time - timedelta(microseconds=1)).date()
+        days = [first_day + timedelta(days=i) for i in range((last_day - first_day).days + 1)]
+        busy = np.concatenate(
+            [np.unpackbits(self._day(day), axis=1, count=self.slots_per_day) for day in days],
+            axis=1
+        )
+        return _day_start(first_day), busy
+
+    def _overlay(self, busy: np.ndarray, origin: datetime, extra: dict[int, list[Occupancy]] | None) -> None:
+        # Marks occupancy that is not in the bookings table, such as holds.
+        for office_number, occupancies in (extra or {}).items():
+            row = self._rows.get(office_number)
+            if row is None:
+                continue
+            for entry in occupancies:
+                first = max(0, (entry.start_time - origin) // self.slot)
+                last = max(0, -((origin - entry.end_time) // self.slot))
+                busy[row, first:last] = 1
+
+    def _select(self, offices: list[int] | None) -> np.ndarray:
+        if offices is None:
+            return np.arange(len(self._offices))
+        return np.fromiter(
+            (self._rows[office_number] for office_number in offices if office_number in self._rows),
+            dtype=np.intp
+        )
+
+    def free_offices(
+            self,
+            start_time: datetime,
+            end_time: datetime,
+            offices: list[int] | None = None,
+            extra: dict[int, list[Occupancy]] | None = None
+    ) -> list[int]:
+        self._sync_offices()
+        origin, busy = self._busy(start_time, end_time)
+        self._overlay(busy, origin, extra)
+        first = (start_time - origin) // self.slot
+        last = -((origin - end_time) // self.slot)
+        rows = self._select(offices)
+        free = rows[~busy[rows, first:last].any(axis=1)]
+        return [self._offices[row] for row in free.tolist()]
+
+    def earliest_common_slot(
+            self,
+            start_time: datetime,
+            end_time: datetime,
+            duration: timedelta,
+            rooms: int,
+            offices: list[int] | None = None,
+            extra: dict[int, list[Occupancy]] | None = None
+    ) -> tuple[datetime, list[int]] | None:
+        # The first slot boundary in the window at which at least `rooms`
+        # offices stay free for `duration`, with every office free then.
+        self._sync_offices()
+        origin, busy = self._busy(start_time, end_time)
+        self._overlay(busy, origin, extra)
+        first = -((origin - start_time) // self.slot)
+        last = (end_time - origin) // self.slot
+        length = -(-duration // self.slot)
+        if length < 1 or last - first < length:
+            return None
+
+        # Busy slots in [t, t + length) for every start t, from a running
+        # count along each row.
+        rows = self._select(offices)
+        counts = np.zeros((len(rows), last - first + 1), dtype=np.int32)
+        np.cumsum(busy[rows, first:last], axis=1, out=counts[:, 1:])
+        fits = counts[:, length:] == counts[:, :-length]
+        candidates = np.flatnonzero(fits.sum(axis=0) >= rooms)
+        if not len(candidates):
+            return None
+        start = int(candidates[0])
+        return (
+            origin + self.slot * (first + start),
+            [self._offices[row] for row in rows[fits[:, start]].tolist()]
+        )
+
+    def utilisation(
+            self,
+            start_time: datetime,
+            end_time: datetime,
+            offices: list[int] | None = None
+    ) -> dict[int, float]:
+        # Share of the window's slots that are booked, per office.
+        self._sync_offices()
+        origin, busy = self._busy(start_time, end_time)
+        first = (start_time - origin) // self.slot
+        last = -((origin - end_time) // self.slot)
+        rows = self._select(offices)
+        booked = busy[rows, first:last].sum(axis=1, dtype=np.int64) / max(1, last - first)
+        return dict(zip((self._offices[row] for row in rows.tolist()), booked.tolist()))
+
+    def add(self, office_number: int, start_time: datetime, end_time: datetime) -> None:
+        # Patches the loaded days a new booking touches; days not loaded
+        # yet will read it from the repository.
+        with self._lock:
+            self._version += 1
+            row = self._rows.get(office_number)
+            if row is None:
+                return
+            day = start_time.date()
+            while _day_start(day) < end_time:
+                entry = self._days.get(day)
+                if entry is not None:
+                    first, last = self._slot_range(day, start_time, end_time)
+                    flags = np.unpackbits(entry[1][row], count=self.slots_per_day)
+                    flags[first:last] = 1
+                    entry[1][row] = np.packbits(flags)
+                    self._stats.updates += 1
+                day += timedelta(days=1)
+
+    def invalidate_window(self, start_time: datetime | None, end_time: datetime | None) -> None:
+        # Drops the loaded days the window touches. An open end, as for a
+        # recurring series, drops every day from start_time on.
+        with self._lock:
+            self._version += 1
+            for day in list(self._days):
+                day_start = _day_start(day)
+                if ((start_time is None or day_start + DAY > start_time) and
+                        (end_time is None or day_start < end_time)):
+                    del self._days[day]
+                    self._stats.invalidations += 1
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._days.clear()
+
+    def stats(self) -> MatrixStats:
+        with self._lock:
+            return replace(
+                self._stats,
+                days=len(self._days),
+                offices=len(self._offices),
+                bytes=sum(bits.nbytes for _, bits in self._days.values())
+            )
+
+
+def build_occupancy_matrix(repo: BookingRepository, **kwargs) -> OccupancyMatrix | None:
+    # None without NumPy; callers then check offices one at a time.
+    if np is None:
+        return None
+    matrix = OccupancyMatrix(
+        repo.get_window_occupancy,
+        lambda: repo.office_catalogue.office_numbers(),
+        **kwargs
+    )
+    repo.subscribe_changes(
+        lambda office_number, start_time, end_time: matrix.invalidate_window(start_time, end_time),
+        matrix.invalidate
+    )
+    return matrix
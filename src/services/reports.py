@@ -0,0 +1,252 @@
+import csv
+import heapq
+import json
+from collections import Counter
+from dataclasses import dataclass, asdict, field
+from datetime import date, datetime, time, timedelta
+from typing import IO, Iterable, Iterator
+
+from src.repositories.base import BookingRepository, ReportRow
+from src.utils.recurrence import occurrences
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HISTOGRAM_CHUNK_SIZE = 65536
+SECONDS_PER_HOUR = 3600
+
+
+@dataclass
+class DailyUsage:
+    office_number: int
+    day: date
+    bookings: int
+    booked_hours: float
+    utilisation: float
+    top_users: list[str] = field(default_factory=list)
+
+
+@dataclass
+class DailyPeak:
+    day: date
+    peak_offices: int
+    peak_at: datetime
+
+
+@dataclass
+class HourlyUsage:
+    office_number: int
+    hour: int
+    booked_hours: float
+
+
+@dataclass
+class _UsageAccumulator:
+    bookings: int = 0
+    seconds: float = 0.0
+    users: Counter = field(default_factory=Counter)
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min)
+
+
+def stream_occupancy(
+        repo: BookingRepository,
+        start_time: datetime,
+        end_time: datetime,
+        offices: list[int] | None = None
+) -> Iterator[ReportRow]:
+    # Concrete bookings come from the repository stream; every recurring
+    # series contributes a generator of its occurrences in the window. Each
+    # input is ordered by start_time, so merging them keeps the order.
+    series = [
+        (
+            (booking.office_number, booking.user_name, occurrence_start, occurrence_end)
+            for occurrence_start, occurrence_end in occurrences(booking, start_time, end_time)
+        )
+        for booking in repo.get_recurring_bookings(start_time, end_time, offices)
+    ]
+    yield from heapq.merge(
+        repo.iter_bookings(start_time, end_time, offices),
+        *series,
+        key=lambda row: row[2]
+    )
+
+
+def daily_usage(
+        rows: Iterable[ReportRow],
+        start_time: datetime,
+        end_time: datetime,
+        top_users: int = 3
+) -> Iterator[DailyUsage]:
+    # Rows must be ordered by start_time. Once a row starts on a later day no
+    # further row can touch earlier days, so those days are emitted and
+    # dropped; only the days still open are kept in memory.
+    open_days: dict[tuple[date, int], _UsageAccumulator] = {}
+    current_day = None
+
+    def flush(before: date | None) -> Iterator[DailyUsage]:
+        for key in sorted(key for key in open_days if before is None or key[0] < before):
+            day, office_number = key
+            usage = open_days.pop(key)
+            day_seconds = (
+                min(end_time, _day_start(day + timedelta(days=1))) - max(start_time, _day_start(day))
+            ).total_seconds()
+            yield DailyUsage(
+                office_number=office_number,
+                day=day,
+                bookings=usage.bookings,
+                booked_hours=usage.seconds / SECONDS_PER_HOUR,
+                utilisation=usage.seconds / day_seconds if day_seconds else 0.0,
+                top_users=[user for user, _ in usage.users.most_common(top_users)]
+            )
+
+    for office_number, user_name, booked_from, booked_until in rows:
+        booked_from, booked_until = max(booked_from, start_time), min(booked_until, end_time)
+        if booked_until <= booked_from:
+            continue
+        if booked_from.date() != current_day:
+            current_day = booked_from.date()
+            yield from flush(current_day)
+
+        day = current_day
+        while _day_start(day) < booked_until:
+            seconds = (
+                min(booked_until, _day_start(day + timedelta(days=1))) - max(booked_from, _day_start(day))
+            ).total_seconds()
+            usage = open_days.setdefault((day, office_number), _UsageAccumulator())
+            usage.bookings += 1
+            usage.seconds += seconds
+            usage.users[user_name] += seconds
+            day += timedelta(days=1)
+    yield from flush(None)
+
+
+def daily_peaks(rows: Iterable[ReportRow]) -> Iterator[DailyPeak]:
+    # Sweep line over rows ordered by start_time. The heap holds end times of
+    # bookings still running, so it never grows past the number of offices.
+    running: list[datetime] = []
+    day, peak, peak_at = None, 0, None
+
+    for _, _, booked_from, booked_until in rows:
+        while day is not None and booked_from >= _day_start(day + timedelta(days=1)):
+            if peak:
+                yield DailyPeak(day, peak, peak_at)
+            day += timedelta(days=1)
+            midnight = _day_start(day)
+            while running and running[0] <= midnight:
+                heapq.heappop(running)
+            peak, peak_at = len(running), midnight
+        if day is None:
+            day = booked_from.date()
+
+        while running and running[0] <= booked_from:
+            heapq.heappop(running)
+        heapq.heappush(running, booked_until)
+        if len(running) > peak:
+            peak, peak_at = len(running), booked_from
+    if peak:
+        yield DailyPeak(day, peak, peak_at)
+
+
+def hourly_histogram(
+        rows: Iterable[ReportRow],
+        start_time: datetime,
+        end_time: datetime,
+        chunk_size: int = HISTOGRAM_CHUNK_SIZE
+) -> dict[int, list[float]]:
+    # Booked hours per office and hour of day. With NumPy available rows are
+    # binned a chunk at a time; memory is bounded by chunk_size either way.
+    histogram: dict[int, list[float]] = {}
+    chunk: list[tuple[int, float, float]] = []
+    for office_number, _, booked_from, booked_until in rows:
+        booked_from, booked_until = max(booked_from, start_time), min(booked_until, end_time)
+        if booked_until <= booked_from:
+            continue
+        offset = (booked_from - _day_start(booked_from.date())).total_seconds()
+        chunk.append((office_number, offset, offset + (booked_until - booked_from).total_seconds()))
+        if len(chunk) == chunk_size:
+            _bin_chunk(chunk, histogram)
+            chunk = []
+    if chunk:
+        _bin_chunk(chunk, histogram)
+    return histogram
+
+
+def _bin_chunk(chunk: list[tuple[int, float, float]], histogram: dict[int, list[float]]) -> None:
+    if np is None:
+        for office_number, start, end in chunk:
+            bins = histogram.setdefault(office_number, [0.0] * 24)
+            hour = int(start // SECONDS_PER_HOUR)
+            while hour * SECONDS_PER_HOUR < end:
+                overlap = min(end, (hour + 1) * SECONDS_PER_HOUR) - max(start, hour * SECONDS_PER_HOUR)
+                bins[hour % 24] += overlap / SECONDS_PER_HOUR
+                hour += 1
+        return
+
+    office_numbers, starts, ends = (np.asarray(column) for column in zip(*chunk))
+    offices, office_index = np.unique(office_numbers, return_inverse=True)
+    first_hour = (starts // SECONDS_PER_HOUR).astype(np.int64)
+    hour_counts = np.ceil(ends / SECONDS_PER_HOUR).astype(np.int64) - first_hour
+
+    # One entry per (booking, hour touched), built without a Python loop.
+    booking = np.repeat(np.arange(len(chunk)), hour_counts)
+    hour = first_hour[booking] + np.arange(len(booking)) - np.repeat(np.cumsum(hour_counts) - hour_counts, hour_counts)
+    overlap = (np.minimum(ends[booking], (hour + 1) * SECONDS_PER_HOUR) -
+               np.maximum(starts[booking], hour * SECONDS_PER_HOUR))
+
+    bins = np.zeros((len(offices), 24))
+    np.add.at(bins, (office_index[booking], hour % 24), overlap / SECONDS_PER_HOUR)
+    for office_number, office_bins in zip(offices.tolist(), bins):
+        totals = histogram.setdefault(office_number, [0.0] * 24)
+        for hour_of_day, hours in enumerate(office_bins.tolist()):
+            totals[hour_of_day] += hours
+
+
+def histogram_records(histogram: dict[int, list[float]]) -> Iterator[HourlyUsage]:
+    for office_number in sorted(histogram):
+        for hour, booked_hours in enumerate(histogram[office_number]):
+            yield HourlyUsage(office_number, hour, booked_hours)
+
+
+def _to_record(record) -> dict:
+    if isinstance(record, tuple):
+        office_number, user_name, start_time, end_time = record
+        return {
+            'office_number': office_number,
+            'user_name': user_name,
+            'start_time': start_time,
+            'end_time': end_time,
+        }
+    return asdict(record)
+
+
+def _to_text(value) -> str:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, list):
+        return ';'.join(str(item) for item in value)
+    return str(value)
+
+
+def write_csv(records: Iterable, out: IO[str]) -> int:
+    writer, written = None, 0
+    for record in records:
+        row = _to_record(record)
+        if writer is None:
+            writer = csv.DictWriter(out, fieldnames=list(row))
+            writer.writeheader()
+        writer.writerow({name: _to_text(value) for name, value in row.items()})
+        written += 1
+    return written
+
+
+def write_jsonl(records: Iterable, out: IO[str]) -> int:
+    written = 0
+    for record in records:
+        out.write(json.dumps(_to_record(record), default=_to_text) + '\n')
+        written += 1
+    return written
@@ -0,0 +1,30 @@
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator
+
+from src.models.models import Occupancy
+
+
+def _is_long_enough(start_time: datetime, end_time: datetime, min_duration: timedelta) -> bool:
+    length = end_time - start_time
+    return length > timedelta(0) and length >= min_duration
+
+
+def free_intervals(
+        occupancies: Iterable[Occupancy],
+        start_time: datetime,
+        end_time: datetime,
+        min_duration: timedelta = timedelta(0)
+) -> Iterator[tuple[datetime, datetime]]:
+    # Sweep over bookings sorted by start time, tracking the furthest end
+    # seen so far; anything between that and the next start is free.
+    cursor = start_time
+    for occupancy in occupancies:
+        if occupancy.start_time >= end_time:
+            break
+        if _is_long_enough(cursor, occupancy.start_time, min_duration):
+            yield cursor, occupancy.start_time
+        cursor = max(cursor, occupancy.end_time)
+        if cursor >= end_time:
+            return
+    if _is_long_enough(cursor, end_time, min_duration):
+        yield cursor, end_time
@@ -1,11 +1,24 @@
 from typing import Final
 
-MAX_OFFICE_NUMBER: Final[int] = 5
+# Offices created for a fresh SQLite or in-memory store; Postgres seeds the
+# same set in migration 000007.
+DEFAULT_OFFICE_COUNT: Final[int] = 5
+DEFAULT_SITE: Final[str] = "main"
 DATETIME_FORMAT: Final[str] = "%Y-%m-%d %H:%M"
 
 class Messages:
-    INVALID_OFFICE = "Invalid office number. Please choose between 1 and 5."
+    INVALID_OFFICE = "Unknown office number {}."
     UNAVAILABLE = "The office is not available for the specified time."
+    INVALID_TIME_RANGE = "End time must be after start time."
+    PAST_START_TIME = "Start time cannot be in the past"
+    AWARE_DATETIME = "Times must be local, without a UTC offset"
     BOOKING_SUCCESS = "Office {} has been successfully booked."
     AVAILABLE = "Office {} is available for booking."
     OCCUPIED = "Office {} is occupied by {} from {} until {}."
+    IMPORT_SUMMARY = "Imported {} of {} bookings."
+    INVALID_RECURRENCE = "Recurrence must repeat daily or weekly with a positive interval and count."
+    RECURRING_SUCCESS = "Office {} has been booked {} starting {}."
+    HOLD_SUCCESS = "Office {} is held for you for {} seconds."
+    HOLD_EXPIRED = "The hold has expired or does not exist."
+    HOLD_MISMATCH = "The booking does not match the held office and times."
+    INVALID_ROOM_COUNT = "At least one room is needed, got {}."
@@ -4,9 +4,19 @@ class BookingSystemError(Exception):
 class DatabaseError(BookingSystemError):
     pass
 
+class PoolTimeoutError(DatabaseError):
+    pass
+
 class ValidationError(BookingSystemError):
     pass
 
+# Raised by a notification batch that went out in part; failed holds the
+# (recipient, message) pairs still to send.
+class PartialBatchError(BookingSystemError):
+    def __init__(self, failed: list[tuple[str, str]], cause: Exception):
+        super().__init__(f"{len(failed)} notifications failed: {cause}")
+        self.failed = failed
+
 class MigrationError(Exception):
     pass
 # class DatabaseError(MigrationError):
@@ -0,0 +1,168 @@
+import functools
+import json
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_PREFIX = 'office_booking_'
+
+
+@dataclass
+class TimerStats:
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = False, slow_query_threshold: float | None = None):
+        self.enabled = enabled
+        self.slow_query_threshold = slow_query_threshold
+        self._timers: dict[str, TimerStats] = {}
+        self._counters: dict[str, float] = {}
+        self._collectors: dict[str, Callable[[], dict[str, float]]] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, enabled: bool, slow_query_threshold_ms: float | None = None) -> None:
+        self.enabled = enabled
+        self.slow_query_threshold = (
+            None if slow_query_threshold_ms is None else slow_query_threshold_ms / 1000
+        )
+
+    def increment(self, name: str, value: float = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            timer = self._timers.get(name)
+            if timer is None:
+                timer = self._timers[name] = TimerStats()
+            timer.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def log_if_slow(self, name: str, seconds: float, summary: Callable[[], str] | None = None) -> None:
+        # Arguments carry names, emails and phone numbers, so only what the
+        # call site's summary chooses to expose is logged with the timing.
+        threshold = self.slow_query_threshold
+        if threshold is not None and seconds >= threshold:
+            self.increment(f"{name}.slow")
+            details = f" ({summary()})" if summary is not None else ''
+            logger.warning(f"Slow query {name} took {seconds * 1000:.1f}ms{details}")
+
+    def register_collector(self, name: str, collector: Callable[[], dict[str, float]]) -> None:
+        with self._lock:
+            self._collectors[name] = collector
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            timers = {
+                name: {
+                    'count': timer.count,
+                    'total_seconds': timer.total,
+                    'mean_seconds': timer.mean,
+                    'max_seconds': timer.max,
+                }
+                for name, timer in self._timers.items()
+            }
+            counters = dict(self._counters)
+            collectors = dict(self._collectors)
+
+        gauges = {}
+        for prefix, collector in collectors.items():
+            for name, value in collector().items():
+                gauges[f"{prefix}.{name}"] = value
+        return {'timers': timers, 'counters': counters, 'gauges': gauges}
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2, sort_keys=True)
+
+    def to_prometheus(self) -> str:
+        snapshot = self.snapshot()
+        lines = []
+        for name, timer in sorted(snapshot['timers'].items()):
+            metric = _prometheus_name(name) + '_seconds'
+            lines += [
+                f"# TYPE {metric} summary",
+                f"{metric}_count {timer['count']}",
+                f"{metric}_sum {timer['total_seconds']:.9f}",
+                f"# TYPE {metric}_max gauge",
+                f"{metric}_max {timer['max_seconds']:.9f}",
+            ]
+        for name, value in sorted(snapshot['counters'].items()):
+            metric = _prometheus_name(name) + '_total'
+            lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+        for name, value in sorted(snapshot['gauges'].items()):
+            metric = _prometheus_name(name)
+            lines += [f"# TYPE {metric} gauge", f"{metric} {value}"]
+        return '\n'.join(lines) + '\n'
+
+    def reset(self) -> None:
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+
+
+def _prometheus_name(name: str) -> str:
+    return PROMETHEUS_PREFIX + re.sub(r'[^a-zA-Z0-9_]', '_', name)
+
+
+registry = MetricsRegistry()
+
+
+def instrumented(name: str, slow_log: bool = False, summary: Callable[..., str] | None = None):
+    # Decorates methods of objects exposing a `metrics` registry. When the
+    # registry is disabled the only overhead is one attribute check.
+    # summary is called with the method's arguments, only for slow calls,
+    # and returns the safe identifiers to log with them.
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            metrics = self.metrics
+            if not metrics.enabled:
+                return func(self, *args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(self, *args, **kwargs)
+            except Exception:
+                metrics.increment(f"{name}.errors")
+                raise
+            finally:
+                elapsed = time.perf_counter() - started
+                metrics.observe(name, elapsed)
+                if slow_log:
+                    metrics.log_if_slow(
+                        name, elapsed, summary and functools.partial(summary, *args, **kwargs)
+                    )
+        return wrapper
+    return decorator
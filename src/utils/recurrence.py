@@ -0,0 +1,101 @@
+import math
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator
+
+from src.models.models import Occupancy, RecurrenceRule, RecurringBooking
+
+FREQUENCIES = {
+    'daily': timedelta(days=1),
+    'weekly': timedelta(weeks=1),
+}
+
+
+def rule_step(rule: RecurrenceRule) -> timedelta:
+    if rule.frequency not in FREQUENCIES:
+        raise ValueError(f"Unsupported recurrence frequency '{rule.frequency}'")
+    if rule.interval < 1:
+        raise ValueError("Recurrence interval must be positive")
+    return FREQUENCIES[rule.frequency] * rule.interval
+
+
+def _occurrence_count(booking: RecurringBooking) -> int | None:
+    rule = booking.rule
+    counts = []
+    if rule.count is not None:
+        counts.append(rule.count)
+    if rule.until is not None:
+        counts.append(max(0, (rule.until - booking.start_time) // rule_step(rule) + 1))
+    return min(counts) if counts else None
+
+
+def series_end(booking: RecurringBooking) -> datetime | None:
+    count = _occurrence_count(booking)
+    if count is None:
+        return None
+    if count == 0:
+        return booking.start_time
+    return booking.end_time + rule_step(booking.rule) * (count - 1)
+
+
+def occurrences(
+        booking: RecurringBooking,
+        window_start: datetime,
+        window_end: datetime
+) -> Iterator[tuple[datetime, datetime]]:
+    # Jump straight to the first occurrence that can end inside the window
+    # instead of walking the series from its first date.
+    step = rule_step(booking.rule)
+    count = _occurrence_count(booking)
+    k = max(0, math.floor((window_start - booking.end_time) / step) + 1)
+    while count is None or k < count:
+        start_time = booking.start_time + step * k
+        if start_time >= window_end:
+            return
+        end_time = booking.end_time + step * k
+        if end_time > window_start:
+            yield start_time, end_time
+        k += 1
+
+
+def occurrence_conflicts(
+        bookings: Iterable[RecurringBooking],
+        start_time: datetime,
+        end_time: datetime
+) -> list[Occupancy]:
+    return [
+        Occupancy(booking.user_name, occurrence_start, occurrence_end)
+        for booking in bookings
+        for occurrence_start, occurrence_end in occurrences(booking, start_time, end_time)
+    ]
+
+
+def series_conflicts(
+        booking: RecurringBooking,
+        concrete: Iterable[Occupancy],
+        rules: Iterable[RecurringBooking]
+) -> list[Occupancy]:
+    conflicts = [
+        occupancy for occupancy in concrete
+        if next(occurrences(booking, occupancy.start_time, occupancy.end_time), None)
+    ]
+
+    # Two rules repeat relative to each other with the period lcm(step_a,
+    # step_b), so only that horizon past the later start has to be compared.
+    step = rule_step(booking.rule)
+    end = series_end(booking)
+    for other in rules:
+        other_step = rule_step(other.rule)
+        period = timedelta(days=math.lcm(step.days, other_step.days))
+        horizon_start = max(booking.start_time, other.start_time)
+        horizon_end = horizon_start + period + max(
+            booking.end_time - booking.start_time,
+            other.end_time - other.start_time
+        )
+        for bound in (end, series_end(other)):
+            if bound is not None:
+                horizon_end = min(horizon_end, bound)
+        for occurrence_start, occurrence_end in occurrences(other, horizon_start - (other.end_time - other.start_time), horizon_end):
+            if next(occurrences(booking, occurrence_start, occurrence_end), None):
+                conflicts.append(Occupancy(other.user_name, occurrence_start, occurrence_end))
+                break
+    return conflicts
@@ -1,25 +1,41 @@
 from datetime import datetime
+from typing import Container, Iterable
 import re
 
+from src.utils.constants import Messages
+
+
+def parse_datetime(value: str) -> datetime:
+    # Bookings are stored as naive local time, so an ISO timestamp with an
+    # offset is converted to the local zone and the offset dropped.
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is not None:
+        dt = dt.astimezone().replace(tzinfo=None)
+    return dt
+
 
 class InputValidator:
     EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
-    PHONE_PATTERN = re.compile(r'^\+?\d{9}$')
-    PHONE_NORMALIZE_PATTERN = re.compile(r'[^\d\s+-]')
+    # 9 digits for local numbers, up to 15 (E.164) with a country code.
+    PHONE_PATTERN = re.compile(r'^\+?\d{9,15}$')
+    PHONE_NORMALIZE_PATTERN = re.compile(r'[\s-]')
 
     @staticmethod
-    def validate_office_number(office_number: int) -> str | None:
+    def validate_office_number(office_number: int, offices: Container[int] | None = None) -> str | None:
         if not isinstance(office_number, int):
             return "Office number must be an integer"
-        if not 1 <= office_number <= 5:
-            return "Office number must be between 1 and 5"
+        if offices is None:
+            if office_number < 1:
+                return "Office number must be positive"
+        elif office_number not in offices:
+            return Messages.INVALID_OFFICE.format(office_number)
         return None
 
     @staticmethod
-    def validate_datetime(dt: datetime) -> str | None:
+    def validate_datetime(dt: datetime, now: datetime | None = None) -> str | None:
         if not isinstance(dt, datetime):
             return "Invalid datetime format"
-        if dt < datetime.now():
+        if dt < (now or datetime.now()):
             return "DateTime cannot be in the past"
 
     @staticmethod
@@ -45,3 +61,69 @@ class InputValidator:
             return "Name cannot be empty"
         if len(name) < 2:
             return "Name must be at least 2 characters long"
+
+
+class BookingValidator:
+    # Runs every field check on a booking and reports all failures at once,
+    # keyed by field name. Works for anything shaped like a BookingRequest.
+    def __init__(self):
+        # Bound once here rather than looked up through the class per field.
+        self._email_match = InputValidator.EMAIL_PATTERN.match
+        self._phone_match = InputValidator.PHONE_PATTERN.match
+        self._phone_normalize = InputValidator.PHONE_NORMALIZE_PATTERN.sub
+
+    def validate(
+            self,
+            booking,
+            now: datetime,
+            offices: Container[int] | None = None
+    ) -> dict[str, str]:
+        # Each check has a fast path for the common valid input; anything
+        # else goes through InputValidator for its exact message.
+        errors = {}
+
+        office_number = booking.office_number
+        if type(office_number) is not int or (offices is not None and office_number not in offices):
+            message = InputValidator.validate_office_number(office_number, offices)
+            if message:
+                errors['office_number'] = message
+
+        user_name = booking.user_name
+        if type(user_name) is not str or len(user_name) < 2 or not user_name.strip():
+            message = InputValidator.validate_name(user_name)
+            if message:
+                errors['user_name'] = message
+
+        user_email = booking.user_email
+        if type(user_email) is not str or not self._email_match(user_email):
+            errors['user_email'] = InputValidator.validate_email(user_email)
+
+        user_phone = booking.user_phone
+        if type(user_phone) is not str or not self._phone_match(self._phone_normalize('', user_phone)):
+            errors['user_phone'] = InputValidator.validate_phone(user_phone)
+
+        start_time, end_time = booking.start_time, booking.end_time
+        if not isinstance(start_time, datetime):
+            errors['start_time'] = "Invalid datetime format"
+        elif start_time.tzinfo is not None:
+            errors['start_time'] = Messages.AWARE_DATETIME
+        elif start_time < now:
+            errors['start_time'] = Messages.PAST_START_TIME
+        if not isinstance(end_time, datetime):
+            errors['end_time'] = "Invalid datetime format"
+        elif end_time.tzinfo is not None:
+            errors['end_time'] = Messages.AWARE_DATETIME
+        elif isinstance(start_time, datetime) and start_time.tzinfo is None and end_time <= start_time:
+            errors['end_time'] = Messages.INVALID_TIME_RANGE
+        return errors
+
+    def validate_many(
+            self,
+            bookings: Iterable,
+            now: datetime | None = None,
+            offices: Container[int] | None = None
+    ) -> list[dict[str, str]]:
+        # One clock read for the whole batch.
+        now = now or datetime.now()
+        validate = self.validate
+        return [validate(booking, now, offices) for booking in bookings]
@@ -0,0 +1,53 @@
+import unittest
+from datetime import datetime
+
+from config.config import DatabaseConfig
+from migrations.manager import MigrationManager
+from src.repositories.pool import ConnectionPool
+from src.utils.exceptions import DatabaseError
+
+MONTH = datetime(2400, 3, 1)
+PARTITION = 'bookings_archive_2400_03'
+
+
+# Runs against the test database and is skipped when it cannot be
+# reached.
+class ArchivePartitionTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        config = DatabaseConfig.from_yaml('test')
+        try:
+            cls.pool = ConnectionPool(config, min_size=1, max_size=1, timeout=5)
+        except DatabaseError as e:
+            raise unittest.SkipTest(f"PostgreSQL is not available: {e}")
+        MigrationManager(config, pool=cls.pool).migrate()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+
+    def setUp(self):
+        self.addCleanup(self.drop_partition)
+
+    def drop_partition(self) -> None:
+        with self.pool.connection() as conn, conn.cursor() as cur:
+            cur.execute(f'DROP TABLE IF EXISTS {PARTITION}')
+            cur.execute('DELETE FROM bookings_archive WHERE start_time >= %s AND start_time < %s',
+                        (MONTH, datetime(2400, 4, 1)))
+            conn.commit()
+
+    def test_rows_in_the_default_partition_move_to_the_new_month(self):
+        with self.pool.connection() as conn, conn.cursor() as cur:
+            cur.execute('''
+                INSERT INTO bookings_archive (id, office_number, user_name, start_time, end_time)
+                VALUES (-1, 1, 'partition-test', %s, %s)
+            ''', (datetime(2400, 3, 10, 9), datetime(2400, 3, 10, 10)))
+            cur.execute('SELECT ensure_bookings_archive_partition(%s)', (MONTH,))
+            cur.execute('SELECT ensure_bookings_archive_partition(%s)', (MONTH,))
+            cur.execute("SELECT tableoid::regclass::text FROM bookings_archive WHERE user_name = 'partition-test'")
+            self.assertEqual(cur.fetchall(), [(PARTITION,)])
+            conn.commit()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from datetime import datetime, timedelta
+
+from src.models.models import Hold
+from src.repositories.availability_index import AvailabilityIndex
+from src.repositories.holds import HELD_BY
+
+
+def row(booking_id: int, office_number: int, start_time: datetime, hours: int = 1) -> tuple:
+    return booking_id, office_number, f'user{booking_id}', start_time, start_time + timedelta(hours=hours)
+
+
+class AvailabilityIndexReloadTest(unittest.TestCase):
+    def setUp(self):
+        self.start = datetime(2030, 1, 1, 9)
+        self.end = self.start + timedelta(hours=8)
+        self.index = AvailabilityIndex()
+        self.index.load([row(1, 1, self.start), row(2, 1, self.start + timedelta(hours=2)), row(3, 2, self.start)])
+
+    def test_window_reload_drops_deleted_and_adds_late_commits(self):
+        # Booking 2 was deleted; booking 1 had a lower id than the newest one
+        # but committed last.
+        self.index.reload_window(1, self.start, self.end, [row(1, 1, self.start), row(5, 1, self.start + timedelta(hours=4))])
+
+        self.assertEqual(
+            [occupancy.user_name for occupancy in self.index.bookings(1, self.start, self.end)],
+            ['user1', 'user5']
+        )
+        self.assertEqual(len(self.index.bookings(2, self.start, self.end)), 1)
+
+    def test_window_reload_keeps_bookings_outside_the_window(self):
+        later = self.start + timedelta(days=1)
+        self.index.add(*row(4, 1, later))
+        self.index.reload_window(1, self.start, self.end, [])
+
+        self.assertEqual(self.index.bookings(1, self.start, self.end), [])
+        self.assertEqual(len(self.index.bookings(1, later, later + timedelta(hours=1))), 1)
+
+    def test_reload_started_before_a_reset_is_dropped(self):
+        self.index.invalidate()
+        version = self.index.version
+        self.index.invalidate()
+
+        self.assertFalse(self.index.reload([row(1, 1, self.start)], [], version))
+        self.assertFalse(self.index.is_loaded)
+        self.assertTrue(self.index.reload([row(1, 1, self.start)], [], self.index.version))
+        self.assertEqual(self.index.offices(), [1])
+
+    def test_live_holds_conflict_until_released_or_expired(self):
+        later = self.start + timedelta(hours=4)
+        self.index.add_hold(Hold('h1', 1, later, later + timedelta(hours=1), datetime.now() + timedelta(minutes=2)))
+        self.index.add_hold(Hold('h2', 2, later, later + timedelta(hours=1), datetime.now() - timedelta(seconds=1)))
+
+        self.assertEqual([occupancy.user_name for occupancy in self.index.conflicts(1, later, self.end)], [HELD_BY])
+        self.assertEqual(self.index.conflicts(1, later, self.end, exclude_hold='h1'), [])
+        self.assertEqual(self.index.occupancy(1, later, self.end), [])
+        self.assertEqual(self.index.conflicts(2, later, self.end), [])
+
+        self.index.reload_window(1, later, self.end, [])
+        self.assertEqual(self.index.conflicts(1, later, self.end), [])
+
+    def test_unloaded_index_ignores_window_reloads(self):
+        self.index.invalidate()
+        self.index.reload_window(1, self.start, self.end, [row(1, 1, self.start)])
+        self.assertEqual(self.index.offices(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,196 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from src.models.models import BookingRequest, Office, RecurrenceRule, RecurringBooking, TimeWindow
+from src.repositories.holds import HELD_BY
+from src.repositories.memory import InMemoryDatabase
+from src.repositories.sqlite import SQLiteDatabase
+from src.services.booking import OfficeBookingSystem
+from src.services.notification import NotificationManager, NotificationService
+from src.utils.constants import Messages
+
+BASE = datetime(2100, 1, 4, 9, 0)
+HOUR = timedelta(hours=1)
+
+
+def request(office_number: int, start: timedelta, end: timedelta, user_name: str = 'conformance') -> BookingRequest:
+    return BookingRequest(
+        office_number=office_number,
+        user_name=user_name,
+        user_email='conformance@example.com',
+        user_phone='+000000000',
+        start_time=BASE + start,
+        end_time=BASE + end
+    )
+
+
+class NullService(NotificationService):
+    def send(self, recipient: str, message: str) -> None:
+        pass
+
+
+# Behaviour every BookingRepository shares, run once per backend.
+class ConformanceMixin:
+    def create_repository(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.repo = self.create_repository()
+        self.addCleanup(self.repo.close)
+        self.assertEqual(self.repo.book_office(request(1, 0 * HOUR, 2 * HOUR, 'alice')), [])
+        self.system = OfficeBookingSystem(self.repo, NotificationManager(NullService(), NullService()))
+
+    def names(self, occupancies) -> list[str]:
+        return [occupancy.user_name for occupancy in occupancies]
+
+    def test_overlap_conflicts(self):
+        self.assertEqual(self.names(self.repo.book_office(request(1, 1 * HOUR, 3 * HOUR, 'bob'))), ['alice'])
+        self.assertEqual(self.repo.book_office(request(1, 2 * HOUR, 3 * HOUR, 'carol')), [],
+                         'adjacent slots must not conflict')
+        self.assertEqual(self.repo.book_office(request(2, 1 * HOUR, 3 * HOUR, 'dave')), [],
+                         'offices are independent')
+
+    def test_lookups(self):
+        self.repo.book_office(request(1, 2 * HOUR, 3 * HOUR, 'carol'))
+        self.repo.book_office(request(2, 1 * HOUR, 3 * HOUR, 'dave'))
+
+        self.assertTrue(self.repo.is_office_available(1, BASE + 3 * HOUR, BASE + 4 * HOUR))
+        self.assertFalse(self.repo.is_office_available(1, BASE + HOUR / 2, BASE + HOUR))
+        self.assertEqual(self.repo.get_office_occupancy(1, BASE, BASE + HOUR).user_name, 'alice')
+        self.assertEqual(self.names(self.repo.find_conflicts(1, BASE, BASE + 3 * HOUR)), ['alice', 'carol'])
+
+        occupancy = self.repo.get_window_occupancy(BASE, BASE + 4 * HOUR, [1, 2, 3])
+        self.assertEqual(
+            {office: self.names(rows) for office, rows in occupancy.items()},
+            {1: ['alice', 'carol'], 2: ['dave'], 3: []}
+        )
+
+    def test_book_many(self):
+        results = self.repo.book_many([
+            request(3, 0 * HOUR, 1 * HOUR, 'erin'),
+            request(3, 0 * HOUR, 2 * HOUR, 'frank'),
+            request(1, 3 * HOUR, 4 * HOUR, 'grace'),
+            request(1, 0 * HOUR, 1 * HOUR, 'heidi'),
+        ])
+        self.assertEqual([result.booked for result in results], [True, False, True, False])
+        self.assertEqual(self.names(results[1].conflicts), ['erin'])
+        self.assertEqual(self.names(results[3].conflicts), ['alice'])
+
+    def test_rollback_discards_bookings(self):
+        with self.assertRaises(RuntimeError):
+            with self.repo.transaction():
+                self.repo.book_office(request(4, 0 * HOUR, 1 * HOUR, 'rolled-back'))
+                raise RuntimeError('abort')
+        self.assertTrue(self.repo.is_office_available(4, BASE, BASE + HOUR))
+
+    def test_office_catalogue(self):
+        self.assertIn(1, self.repo.office_catalogue)
+        self.assertNotIn(99, self.repo.office_catalogue)
+        self.repo.save_office(Office(99, 'north', 8, frozenset({'projector'})))
+        self.assertEqual(
+            [office.office_number for office in self.repo.office_catalogue.find('north', 8, ['projector'])],
+            [99]
+        )
+        self.assertEqual(self.repo.office_catalogue.find(min_capacity=9), [])
+
+    # Slot holds, placed through the service on office 1 from 3h to 4h.
+    def hold(self, office_number: int = 1):
+        held = self.system.hold_slot(office_number, BASE + 3 * HOUR, BASE + 4 * HOUR)
+        self.assertTrue(held.held, held)
+        return held.hold
+
+    def test_hold_blocks_single_and_bulk_bookings(self):
+        self.hold()
+        result = self.system.book(request(1, 3 * HOUR, 4 * HOUR, 'bob'))
+        self.assertFalse(result.booked)
+        self.assertEqual(self.names(result.conflicts), [HELD_BY])
+
+        results = self.system.book_many([request(1, 3 * HOUR, 4 * HOUR, 'bob'), request(2, 3 * HOUR, 4 * HOUR, 'bob')])
+        self.assertEqual([result.booked for result in results], [False, True])
+
+    def test_hold_blocks_recurring_booking(self):
+        self.hold()
+        message = self.system.book_recurring(RecurringBooking(
+            1, 'bob', 'bob@example.com', '+000000000',
+            BASE - timedelta(days=1) + 3 * HOUR, BASE - timedelta(days=1) + 4 * HOUR,
+            RecurrenceRule('daily', count=3)
+        ))
+        self.assertIn(HELD_BY, message)
+
+    def test_hold_is_reported_by_find_conflicts(self):
+        hold = self.hold()
+        self.assertEqual(self.names(self.repo.find_conflicts(1, BASE + HOUR, BASE + 4 * HOUR)), ['alice', HELD_BY])
+        self.system.release_hold(hold.hold_id)
+        self.assertEqual(self.names(self.repo.find_conflicts(1, BASE + HOUR, BASE + 4 * HOUR)), ['alice'])
+
+    def test_overlapping_hold_is_refused(self):
+        self.hold()
+        held = self.system.hold_slot(1, BASE + 3.5 * HOUR, BASE + 5 * HOUR)
+        self.assertFalse(held.held)
+        self.assertEqual(self.names(held.conflicts), [HELD_BY])
+
+    def test_hold_in_the_past_is_refused(self):
+        held = self.system.hold_slot(1, datetime.now() - HOUR, datetime.now() + HOUR)
+        self.assertEqual(held.error, Messages.PAST_START_TIME)
+
+    def test_confirm_books_and_releases_the_hold(self):
+        hold = self.hold()
+        self.assertTrue(self.system.confirm_hold(hold.hold_id, request(1, 3 * HOUR, 4 * HOUR, 'bob')).booked)
+        self.assertIsNone(self.repo.get_hold(hold.hold_id))
+        self.assertFalse(self.system.release_hold(hold.hold_id))
+        self.assertEqual(self.names(self.repo.find_conflicts(1, BASE + 3 * HOUR, BASE + 4 * HOUR)), ['bob'])
+
+    def test_mismatched_confirm_keeps_the_hold(self):
+        hold = self.hold()
+        result = self.system.confirm_hold(hold.hold_id, request(1, 3 * HOUR, 5 * HOUR, 'bob'))
+        self.assertEqual(result.error, Messages.HOLD_MISMATCH)
+        self.assertEqual(self.repo.get_hold(hold.hold_id), hold)
+        self.assertTrue(self.system.confirm_hold(hold.hold_id, request(1, 3 * HOUR, 4 * HOUR, 'bob')).booked)
+
+    def test_released_hold_frees_the_slot(self):
+        hold = self.hold()
+        self.assertTrue(self.system.release_hold(hold.hold_id))
+        self.assertTrue(self.system.book(request(1, 3 * HOUR, 4 * HOUR, 'bob')).booked)
+
+    def test_expired_hold_stops_counting(self):
+        self.system.hold_ttl = 0.0
+        hold = self.hold()
+        self.assertIsNone(self.repo.get_hold(hold.hold_id))
+        self.assertEqual(self.system.confirm_hold(hold.hold_id, request(1, 3 * HOUR, 4 * HOUR)).error,
+                         Messages.HOLD_EXPIRED)
+        self.assertTrue(self.system.book(request(1, 3 * HOUR, 4 * HOUR, 'bob')).booked)
+
+    def test_free_slots_skip_held_offices(self):
+        self.hold(office_number=2)
+        free = self.system.find_free_slots(TimeWindow(BASE + 3 * HOUR, BASE + 4 * HOUR), offices=[1, 2])
+        self.assertEqual([len(free[1]), len(free[2])], [1, 0])
+
+
+class InMemoryConformanceTest(ConformanceMixin, unittest.TestCase):
+    def create_repository(self):
+        return InMemoryDatabase()
+
+
+class SQLiteConformanceTest(ConformanceMixin, unittest.TestCase):
+    def create_repository(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'bookings.db')
+        return SQLiteDatabase(self.path)
+
+    def test_hold_is_seen_by_another_connection(self):
+        # Another process on the same database file must respect the hold.
+        other = SQLiteDatabase(self.path)
+        self.addCleanup(other.close)
+        hold = self.hold()
+
+        self.assertEqual(other.get_hold(hold.hold_id), hold)
+        self.assertEqual(self.names(other.book_office(request(1, 3 * HOUR, 4 * HOUR, 'bob'))), [HELD_BY])
+        self.assertEqual(other.confirm_hold(hold.hold_id, request(1, 3 * HOUR, 4 * HOUR, 'bob')), [])
+        self.assertIsNone(self.repo.get_hold(hold.hold_id))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import argparse
+import contextlib
+import io
+import unittest
+from datetime import datetime, timedelta
+
+from config.config import DatabaseConfig
+from src.cmd.cli import BookingSystemCLI
+from src.repositories.memory import InMemoryDatabase
+from src.services.booking import OfficeBookingSystem
+from src.services.notification import NotificationManager, NotificationService
+from src.utils.constants import Messages
+
+
+class NullService(NotificationService):
+    def send(self, recipient: str, message: str) -> None:
+        pass
+
+
+class CheckCommandTest(unittest.TestCase):
+    def setUp(self):
+        self.cli = BookingSystemCLI(DatabaseConfig('localhost', 5432, 'test', 'test', 'test'), long_running=False)
+        self.cli._booking_system = OfficeBookingSystem(
+            InMemoryDatabase(), NotificationManager(NullService(), NullService())
+        )
+        self.start = datetime.now().replace(microsecond=0) + timedelta(days=1)
+
+    def check(self, start_time: datetime, end_time: datetime) -> tuple[int, str]:
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            code = self.cli.run_command(argparse.Namespace(command='check', office=1, start=start_time, end=end_time))
+        return code, output.getvalue().strip()
+
+    def test_inverted_range_is_an_error(self):
+        self.assertEqual(self.check(self.start, self.start - timedelta(hours=1)), (1, Messages.INVALID_TIME_RANGE))
+
+    def test_empty_range_is_an_error(self):
+        self.assertEqual(self.check(self.start, self.start), (1, Messages.INVALID_TIME_RANGE))
+
+    def test_free_office_is_available(self):
+        self.assertEqual(self.check(self.start, self.start + timedelta(hours=1)), (0, Messages.AVAILABLE.format(1)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import threading
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from config.config import DatabaseConfig
+from migrations.manager import MigrationManager
+from src.models.models import BookingRequest
+from src.repositories.database import Database
+from src.repositories.pool import ConnectionPool
+from src.utils.exceptions import DatabaseError
+
+USER_PREFIX = 'race-test-'
+THREADS = 8
+ATTEMPTS = 25
+
+
+def booking(user: str, start_time: datetime, minutes: int = 60) -> BookingRequest:
+    return BookingRequest(
+        1, f'{USER_PREFIX}{user}', 'race@example.com', '+000000000',
+        start_time, start_time + timedelta(minutes=minutes)
+    )
+
+
+# Runs against the test database and is skipped when it cannot be
+# reached.
+class PostgresBookingTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        config = DatabaseConfig.from_yaml('test')
+        try:
+            cls.pool = ConnectionPool(config, min_size=1, max_size=THREADS, timeout=5)
+        except DatabaseError as e:
+            raise unittest.SkipTest(f"PostgreSQL is not available: {e}")
+        MigrationManager(config, pool=cls.pool).migrate()
+        cls.db = Database(config, pool=cls.pool)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.db.close()
+        cls.pool.close()
+
+    def setUp(self):
+        self.base = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0) + timedelta(days=3650)
+        self.addCleanup(self.delete_bookings)
+
+    def delete_bookings(self) -> None:
+        with self.db.connection() as conn, conn.cursor() as cur:
+            cur.execute('DELETE FROM bookings WHERE user_name LIKE %s', (f'{USER_PREFIX}%',))
+
+    def test_concurrent_bookings_never_overlap(self):
+        barrier = threading.Barrier(THREADS)
+
+        def hammer(worker: int) -> None:
+            barrier.wait()
+            for attempt in range(ATTEMPTS):
+                start_time = self.base + timedelta(minutes=15 * ((worker * 7 + attempt * 3) % 32))
+                with self.db.transaction():
+                    self.db.book_office(booking(f'{worker}-{attempt}', start_time, 15 * (attempt % 4 + 1)))
+
+        workers = [threading.Thread(target=hammer, args=(worker,)) for worker in range(THREADS)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        with self.db.connection() as conn, conn.cursor() as cur:
+            cur.execute('''
+                SELECT count(*)
+                FROM bookings a
+                JOIN bookings b ON a.office_number = b.office_number AND
+                                   a.id < b.id AND
+                                   a.period && b.period
+                WHERE a.user_name LIKE %s AND b.user_name LIKE %s
+            ''', (f'{USER_PREFIX}%', f'{USER_PREFIX}%'))
+            self.assertEqual(cur.fetchone()[0], 0)
+            cur.execute('SELECT count(*) FROM bookings WHERE user_name LIKE %s', (f'{USER_PREFIX}%',))
+            self.assertGreater(cur.fetchone()[0], 0)
+
+    def test_conflict_reports_the_existing_booking(self):
+        self.assertEqual(self.db.book_office(booking('alice', self.base)), [])
+
+        conflict, = self.db.book_office(booking('bob', self.base + timedelta(minutes=30)))
+        self.assertEqual(
+            (conflict.user_name, conflict.start_time, conflict.end_time),
+            (f'{USER_PREFIX}alice', self.base, self.base + timedelta(hours=1))
+        )
+        # Periods are half-open, so back-to-back bookings do not conflict.
+        self.assertEqual(self.db.book_office(booking('carol', self.base + timedelta(hours=1))), [])
+
+    def test_conflict_deleted_before_the_read_back_is_retried(self):
+        self.db.book_office(booking('alice', self.base))
+        query_conflicts = self.db._query_conflicts
+
+        def delete_then_query(*args):
+            self.delete_bookings()
+            return query_conflicts(*args)
+
+        with mock.patch.object(self.db, '_query_conflicts', side_effect=delete_then_query) as read_back:
+            self.assertEqual(self.db.book_office(booking('bob', self.base)), [])
+        self.assertEqual(read_back.call_count, 1)
+        self.assertEqual(self.db.find_conflicts(1, self.base, self.base + timedelta(hours=1))[0].user_name,
+                         f'{USER_PREFIX}bob')
+
+    def test_book_many_beyond_one_page(self):
+        # More rows than execute_values' default page of 100.
+        requests = [booking(str(i), self.base + timedelta(hours=i)) for i in range(250)]
+        requests.append(booking('late', self.base))
+
+        results = self.db.book_many(requests)
+        self.assertEqual([result.booked for result in results], [True] * 250 + [False])
+        self.assertEqual(len({result.booking_id for result in results[:250]}), 250)
+        self.assertEqual(results[-1].conflicts[0].user_name, f'{USER_PREFIX}0')
+
+
+if __name__ == '__main__':
+    unittest.main()
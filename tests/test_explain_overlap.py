@@ -0,0 +1,80 @@
+import unittest
+from datetime import datetime, timedelta
+
+from config.config import DatabaseConfig
+from migrations.manager import MigrationManager
+from src.repositories.database import Database, FIND_CONFLICTS_SQL
+from src.repositories.pool import ConnectionPool
+from src.utils.exceptions import DatabaseError
+
+EXPECTED_INDEX = 'bookings_no_overlap'
+USER_PREFIX = 'explain-'
+OFFICES = 100
+DAYS = 200
+
+
+def index_names(plan: dict) -> set[str]:
+    names = {plan['Index Name']} if 'Index Name' in plan else set()
+    for child in plan.get('Plans', []):
+        names |= index_names(child)
+    return names
+
+
+# Seeds a few hundred thousand rows into the test database, so the planner
+# weighs the GiST index against a scan of a large table, and removes them
+# again after each test. Skipped when the database cannot be reached.
+class ExplainOverlapTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        config = DatabaseConfig.from_yaml('test')
+        try:
+            cls.pool = ConnectionPool(config, min_size=1, max_size=2, timeout=5)
+        except DatabaseError as e:
+            raise unittest.SkipTest(f"PostgreSQL is not available: {e}")
+        MigrationManager(config, pool=cls.pool).migrate()
+        cls.db = Database(config, pool=cls.pool)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.db.close()
+        cls.pool.close()
+
+    def setUp(self):
+        # One transaction, so a failed seed leaves nothing behind.
+        self.first_day = datetime(2300, 1, 1)
+        with self.db.transaction():
+            with self.db.conn.cursor() as cur:
+                cur.execute('''
+                    INSERT INTO bookings (office_number, user_name, user_email, user_phone, start_time, end_time)
+                    SELECT office, %s || office, 'explain@example.com', '+000000000',
+                           day + hour * INTERVAL '1 hour',
+                           day + hour * INTERVAL '1 hour' + INTERVAL '50 minutes'
+                    FROM generate_series(%s::timestamp, %s::timestamp, INTERVAL '1 day') AS day,
+                         generate_series(1, %s) AS office,
+                         generate_series(0, 23) AS hour
+                ''', (USER_PREFIX, self.first_day, self.first_day + timedelta(days=DAYS - 1), OFFICES))
+                cur.execute('ANALYZE bookings')
+
+    def tearDown(self):
+        with self.db.connection() as conn, conn.cursor() as cur:
+            cur.execute('DELETE FROM bookings WHERE user_name LIKE %s', (f'{USER_PREFIX}%',))
+            cur.execute('ANALYZE bookings')
+
+    def explain(self, sql: str, params: dict) -> dict:
+        with self.db.connection() as conn, conn.cursor() as cur:
+            cur.execute('EXPLAIN (ANALYZE, FORMAT JSON) ' + sql, params)
+            return cur.fetchone()[0][0]['Plan']
+
+    def test_conflict_lookup_uses_the_gist_index(self):
+        probe_start = self.first_day + timedelta(days=DAYS // 2, hours=10, minutes=30)
+        plan = self.explain(FIND_CONFLICTS_SQL, {
+            'office_number': OFFICES // 2,
+            'start_time': probe_start,
+            'end_time': probe_start + timedelta(hours=1),
+        })
+
+        self.assertIn(EXPECTED_INDEX, index_names(plan), plan)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import unittest
+
+from psycopg2.extensions import Notify
+
+from config.config import DatabaseConfig
+from src.repositories.listener import BOOKINGS_CHANNEL, ChangeListener
+
+
+class FakeConnection:
+    # Readable once, with the given notifications waiting.
+    def __init__(self, notifies: list[Notify]):
+        self._read, self._write = os.pipe()
+        os.write(self._write, b'\0')
+        self.notifies = notifies
+
+    def fileno(self) -> int:
+        return self._read
+
+    def poll(self) -> None:
+        os.read(self._read, 1)
+
+    def close(self) -> None:
+        os.close(self._read)
+        os.close(self._write)
+
+
+class ChangeListenerTest(unittest.TestCase):
+    def setUp(self):
+        self.handled: list[dict] = []
+        self.resets = 0
+        self.listener = ChangeListener(
+            DatabaseConfig('localhost', 5432, 'test', 'test', 'test'),
+            handlers={BOOKINGS_CHANNEL: self.handle},
+            on_reset=self.reset
+        )
+        self.addCleanup(self.listener.close)
+
+    def handle(self, payload: dict) -> None:
+        if payload.get('fail'):
+            raise RuntimeError('handler failed')
+        self.handled.append(payload)
+        if payload.get('last'):
+            self.listener._stop.set()
+
+    def reset(self) -> None:
+        self.resets += 1
+
+    def listen(self, *payloads: str) -> None:
+        conn = FakeConnection([Notify(0, BOOKINGS_CHANNEL, payload) for payload in payloads])
+        self.addCleanup(conn.close)
+        with self.assertLogs('src.repositories.listener', 'ERROR'):
+            self.listener._listen(conn)
+
+    def test_failing_handler_resets_and_later_notifications_still_arrive(self):
+        self.listen('{"fail": true}', '{"office_number": 1, "last": true}')
+        self.assertEqual(self.resets, 1)
+        self.assertEqual(self.handled, [{'office_number': 1, 'last': True}])
+
+    def test_malformed_payload_resets(self):
+        self.listen('not json', '{"last": true}')
+        self.assertEqual(self.resets, 1)
+        self.assertEqual(len(self.handled), 1)
+
+    def test_failing_reset_is_contained(self):
+        def fail():
+            raise RuntimeError('reset failed')
+        self.listener.on_reset = fail
+        self.listen('{"fail": true}', '{"last": true}')
+        self.assertEqual(len(self.handled), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from datetime import datetime
+
+from src.models.models import BookingRequest
+from src.repositories.database import _booking_summary
+from src.utils.metrics import MetricsRegistry, instrumented
+
+
+class SlowRepository:
+    def __init__(self):
+        self.metrics = MetricsRegistry(enabled=True, slow_query_threshold=0.0)
+
+    @instrumented('db.book_office', slow_log=True, summary=_booking_summary)
+    def book_office(self, booking: BookingRequest) -> list:
+        return []
+
+    @instrumented('db.book_many', slow_log=True, summary=lambda bookings: f'rows={len(bookings)}')
+    def book_many(self, bookings: list[BookingRequest]) -> list:
+        return []
+
+    @instrumented('db.find', slow_log=True)
+    def find(self, user_email: str) -> list:
+        return []
+
+
+class SlowQueryLogTest(unittest.TestCase):
+    def setUp(self):
+        self.repo = SlowRepository()
+        self.booking = BookingRequest(
+            3, 'Alice', 'alice@example.com', '+34600000000',
+            datetime(2030, 1, 1, 9), datetime(2030, 1, 1, 10)
+        )
+
+    def assertLogged(self, call, expected: str) -> None:
+        with self.assertLogs('src.utils.metrics', 'WARNING') as logs:
+            call()
+        line, = logs.output
+        self.assertIn(expected, line)
+        for secret in ('Alice', 'alice@example.com', '+34600000000'):
+            self.assertNotIn(secret, line)
+
+    def test_single_booking_logs_office_only(self):
+        self.assertLogged(lambda: self.repo.book_office(self.booking), 'office=3')
+
+    def test_batch_logs_row_count(self):
+        self.assertLogged(lambda: self.repo.book_many([self.booking] * 4), 'rows=4')
+
+    def test_no_summary_logs_name_and_duration(self):
+        self.assertLogged(lambda: self.repo.find('alice@example.com'), 'Slow query db.find took')
+        self.assertEqual(self.repo.metrics.snapshot()['counters']['db.find.slow'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
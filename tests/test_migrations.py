@@ -0,0 +1,137 @@
+import os
+import tempfile
+import unittest
+
+import psycopg2
+
+from config.config import DatabaseConfig
+from migrations.manager import MigrationManager
+
+
+class FakeCursor:
+    def __init__(self, conn: 'FakeConnection'):
+        self.conn = conn
+        self._result = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def execute(self, sql: str, params=None) -> None:
+        # Like psycopg2, the first statement outside autocommit opens a
+        # transaction that lasts until commit or rollback.
+        if not self.conn.autocommit:
+            self.conn.in_transaction = True
+        self.conn.executed.append((sql, self.conn.autocommit))
+        if 'pg_try_advisory_lock' in sql or 'to_regclass' in sql:
+            self._result = [(True,)]
+        elif sql.startswith('SELECT version FROM migrations'):
+            self._result = [(version,) for version in reversed(self.conn.applied)]
+        elif sql.startswith('INSERT INTO migrations'):
+            self.conn.applied.append(params[0])
+            self._result = []
+        else:
+            self._result = []
+
+    def fetchone(self):
+        return self._result[0]
+
+    def fetchall(self):
+        return self._result
+
+
+class FakeConnection:
+    def __init__(self):
+        self._autocommit = False
+        self.in_transaction = False
+        self.executed: list[tuple[str, bool]] = []
+        self.applied: list[str] = []
+
+    @property
+    def autocommit(self) -> bool:
+        return self._autocommit
+
+    @autocommit.setter
+    def autocommit(self, value: bool) -> None:
+        if self.in_transaction:
+            raise psycopg2.ProgrammingError("set_session cannot be used inside a transaction")
+        self._autocommit = value
+
+    def cursor(self) -> FakeCursor:
+        return FakeCursor(self)
+
+    def commit(self) -> None:
+        self.in_transaction = False
+
+    def rollback(self) -> None:
+        self.in_transaction = False
+
+
+class FakePool:
+    def __init__(self, conn: FakeConnection):
+        self.conn = conn
+
+    def getconn(self) -> FakeConnection:
+        return self.conn
+
+    def putconn(self, conn: FakeConnection) -> None:
+        pass
+
+
+class MigrationManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.conn = FakeConnection()
+        self.manager = MigrationManager(
+            DatabaseConfig('localhost', 5432, 'test', 'test', 'test'),
+            pool=FakePool(self.conn)
+        )
+        self.manager.migrations_dir = self.directory.name
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name: str, sql: str) -> None:
+        with open(os.path.join(self.directory.name, name), 'w') as f:
+            f.write(sql)
+
+    def test_no_transaction_migration_first_in_plan(self):
+        index_sql = (
+            '-- migrate:no-transaction\n'
+            'CREATE INDEX CONCURRENTLY idx_bookings_user ON bookings (user_name);\n'
+        )
+        self.write('000001_index.up.sql', index_sql)
+        self.write('000002_table.up.sql', 'CREATE TABLE t (id int);\n')
+
+        timings = self.manager.migrate()
+
+        self.assertEqual([timing.version for timing in timings], ['000001_index', '000002_table'])
+        self.assertEqual(self.conn.applied, ['000001_index', '000002_table'])
+        # The file goes out as written, in autocommit mode.
+        self.assertIn((index_sql, True), self.conn.executed)
+        self.assertFalse(self.conn.autocommit)
+
+    def test_only_marked_files_skip_the_transaction(self):
+        function_sql = (
+            '-- Rebuilt CONCURRENTLY by hand when needed.\n'
+            'CREATE FUNCTION f() RETURNS int AS $$\n'
+            'BEGIN\n'
+            '    RETURN 1;\n'
+            'END;\n'
+            '$$ LANGUAGE plpgsql;\n'
+        )
+        self.write('000001_function.up.sql', function_sql)
+
+        self.manager.connect()
+        migration, = self.manager.plan()
+        self.manager.close()
+
+        self.assertTrue(migration.transactional)
+        self.manager.migrate()
+        self.assertIn((function_sql, False), self.conn.executed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+from src.services.notification import NotificationDispatcher, NotificationService
+from src.utils.metrics import MetricsRegistry
+
+
+class FlakyService(NotificationService):
+    # Fails the first attempt for each recipient in failing.
+    def __init__(self, failing: set[str]):
+        self.failing = failing
+        self.delivered: list[str] = []
+
+    def send(self, recipient: str, message: str) -> None:
+        if recipient in self.failing:
+            self.failing.discard(recipient)
+            raise ConnectionError(f'{recipient} unreachable')
+        self.delivered.append(recipient)
+
+
+class NotificationRetryTest(unittest.TestCase):
+    def setUp(self):
+        self.dispatcher = NotificationDispatcher(
+            workers=1, batch_size=10, retry_backoff=0.0, metrics=MetricsRegistry()
+        )
+
+    def tearDown(self):
+        self.dispatcher.close()
+
+    def test_partial_failure_retries_only_the_failed(self):
+        service = FlakyService({'b'})
+        self.dispatcher._deliver(service, [('a', 'hi'), ('b', 'hi'), ('c', 'hi')])
+
+        self.assertEqual(service.delivered, ['a', 'c', 'b'])
+        stats = self.dispatcher.stats()
+        self.assertEqual((stats.sent, stats.retries, stats.failed), (3, 1, 0))
+
+    def test_gives_up_on_the_failed_only(self):
+        class DownForB(FlakyService):
+            def send(self, recipient: str, message: str) -> None:
+                if recipient == 'b':
+                    raise ConnectionError('b unreachable')
+                super().send(recipient, message)
+
+        service = DownForB(set())
+        with self.assertLogs('src.services.notification', 'ERROR'):
+            self.dispatcher._deliver(service, [('a', 'hi'), ('b', 'hi')])
+
+        self.assertEqual(service.delivered, ['a'])
+        stats = self.dispatcher.stats()
+        self.assertEqual((stats.sent, stats.failed), (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import random
+import unittest
+from datetime import datetime, timedelta
+
+from src.models.models import BookingRequest, Occupancy
+from src.repositories.availability_index import AvailabilityIndex
+from src.repositories.memory import InMemoryDatabase
+from src.services.occupancy import OccupancyMatrix, build_occupancy_matrix
+from src.services.slots import free_intervals
+
+
+class AnnouncingDatabase(InMemoryDatabase):
+    # Stands in for a repository following other writers through NOTIFY.
+    def __init__(self):
+        super().__init__()
+        self.subscribers = []
+
+    def subscribe_changes(self, on_change, on_reset) -> bool:
+        self.subscribers.append((on_change, on_reset))
+        return True
+
+    def announce(self, office_number: int, start_time: datetime, end_time: datetime | None) -> None:
+        for on_change, _ in self.subscribers:
+            on_change(office_number, start_time, end_time)
+
+
+class OccupancyMatrixChangesTest(unittest.TestCase):
+    def setUp(self):
+        self.repo = AnnouncingDatabase()
+        self.matrix = build_occupancy_matrix(self.repo, ttl=3600.0)
+        self.monday = datetime(2030, 1, 7, 9)
+        self.tuesday = self.monday + timedelta(days=1)
+
+    def book_elsewhere(self, start_time: datetime) -> None:
+        # Written behind this matrix's back, as another process would.
+        self.repo.book_office(BookingRequest(
+            1, 'Bob', 'bob@example.com', '+34600000000', start_time, start_time + timedelta(hours=1)
+        ))
+
+    def free(self, start_time: datetime) -> list[int]:
+        return self.matrix.free_offices(start_time, start_time + timedelta(hours=1), offices=[1])
+
+    def test_announced_write_is_seen_before_the_ttl(self):
+        self.assertEqual(self.free(self.monday), [1])
+        self.book_elsewhere(self.monday)
+        self.assertEqual(self.free(self.monday), [1])
+
+        self.repo.announce(1, self.monday, self.monday + timedelta(hours=1))
+        self.assertEqual(self.free(self.monday), [])
+
+    def test_only_the_touched_days_are_dropped(self):
+        self.free(self.monday)
+        self.free(self.tuesday)
+        self.repo.announce(1, self.monday, self.monday + timedelta(hours=1))
+
+        stats = self.matrix.stats()
+        self.assertEqual((stats.days, stats.invalidations), (1, 1))
+
+    def test_series_drops_every_later_day(self):
+        self.free(self.monday)
+        self.free(self.tuesday)
+        self.repo.announce(1, self.tuesday, None)
+        self.assertEqual(self.matrix.stats().days, 1)
+
+        for _, on_reset in self.repo.subscribers:
+            on_reset()
+        self.assertEqual(self.matrix.stats().days, 0)
+
+
+class OccupancyMatrixAgreementTest(unittest.TestCase):
+    # The matrix against per-office answers from the availability index on
+    # the same synthetic fleet.
+    def setUp(self):
+        rng = random.Random(1)
+        self.day = datetime(2200, 1, 1)
+        self.occupancy: dict[int, list[Occupancy]] = {office_number: [] for office_number in range(1, 51)}
+        for office_number, entries in self.occupancy.items():
+            cursor = self.day + timedelta(hours=8)
+            while cursor < self.day + timedelta(hours=18):
+                length = timedelta(minutes=15 * rng.randint(1, 4))
+                if rng.random() < 0.4:
+                    entries.append(Occupancy(f'user{office_number}', cursor, cursor + length))
+                cursor += length
+        self.index = AvailabilityIndex()
+        self.index.load(
+            (i, office_number, entry.user_name, entry.start_time, entry.end_time)
+            for i, (office_number, entry) in enumerate(
+                ((office_number, entry) for office_number, entries in self.occupancy.items() for entry in entries),
+                start=1
+            )
+        )
+        self.matrix = OccupancyMatrix(self.load, lambda: list(self.occupancy), ttl=float('inf'))
+
+    def load(self, start_time: datetime, end_time: datetime, offices: list[int] | None) -> dict[int, list[Occupancy]]:
+        return {
+            office_number: [entry for entry in entries if entry.start_time < end_time and entry.end_time > start_time]
+            for office_number, entries in self.occupancy.items()
+        }
+
+    def test_free_offices(self):
+        span = (self.day + timedelta(hours=14), self.day + timedelta(hours=15))
+        self.assertEqual(
+            self.matrix.free_offices(*span),
+            [office_number for office_number in self.occupancy if self.index.is_available(office_number, *span)]
+        )
+
+    def test_earliest_common_slot(self):
+        window = (self.day + timedelta(hours=8), self.day + timedelta(hours=18))
+        duration, rooms = timedelta(hours=1), 5
+        free = {
+            office_number: list(free_intervals(self.index.conflicts(office_number, *window), *window, duration))
+            for office_number in self.occupancy
+        }
+        expected = next(
+            start_time
+            for start_time in sorted({start for intervals in free.values() for start, _ in intervals})
+            if sum(
+                any(start <= start_time and start_time + duration <= end for start, end in intervals)
+                for intervals in free.values()
+            ) >= rooms
+        )
+        self.assertEqual(self.matrix.earliest_common_slot(*window, duration, rooms)[0], expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
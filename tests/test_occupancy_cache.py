@@ -0,0 +1,139 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from config.config import DatabaseConfig
+from src.models.models import Occupancy
+from src.repositories.database import Database
+from src.repositories.occupancy_cache import OccupancyCache
+from src.repositories.pool import ConnectionPool
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class OccupancyCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch('src.repositories.occupancy_cache.time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.day = datetime(2030, 1, 7)
+        self.loads: list[tuple[int, datetime]] = []
+        self.expires_in: float | None = None
+
+    def load(self, office_number: int, start_time: datetime, end_time: datetime):
+        self.loads.append((office_number, start_time))
+        return [Occupancy(f'user{office_number}', start_time + timedelta(hours=9), start_time + timedelta(hours=10))], \
+            self.expires_in
+
+    def lookup(self, cache: OccupancyCache, office_number: int = 1, days: int = 0) -> list[Occupancy]:
+        start_time = self.day + timedelta(days=days, hours=9)
+        return cache.conflicts(office_number, start_time, start_time + timedelta(hours=1), self.load)
+
+    def test_repeated_lookups_hit_the_bucket(self):
+        cache = OccupancyCache()
+        self.assertEqual(self.lookup(cache), self.lookup(cache))
+        self.assertEqual(len(self.loads), 1)
+        stats = cache.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.size), (1, 1, 1))
+
+    def test_least_recently_used_bucket_is_evicted(self):
+        cache = OccupancyCache(max_entries=2)
+        self.lookup(cache, days=0)
+        self.lookup(cache, days=1)
+        self.lookup(cache, days=0)
+        self.lookup(cache, days=2)
+        self.assertEqual(cache.stats().evictions, 1)
+
+        self.loads.clear()
+        self.lookup(cache, days=0)
+        self.lookup(cache, days=1)
+        self.assertEqual(self.loads, [(1, self.day + timedelta(days=1))])
+
+    def test_bucket_expires_after_the_ttl(self):
+        cache = OccupancyCache(ttl=30.0)
+        self.lookup(cache)
+        self.clock.now += 29.0
+        self.lookup(cache)
+        self.assertEqual(len(self.loads), 1)
+
+        self.clock.now += 1.0
+        self.lookup(cache)
+        self.assertEqual(len(self.loads), 2)
+        self.assertEqual(cache.stats().expirations, 1)
+
+    def test_bucket_with_a_hold_expires_with_it(self):
+        cache = OccupancyCache(ttl=30.0)
+        self.expires_in = 5.0
+        self.lookup(cache)
+        self.clock.now += 5.0
+        self.lookup(cache)
+        self.assertEqual(len(self.loads), 2)
+
+    def test_invalidation_drops_only_the_touched_days(self):
+        cache = OccupancyCache()
+        for office_number in (1, 2):
+            for days in (0, 1):
+                self.lookup(cache, office_number, days)
+        cache.invalidate(1, self.day + timedelta(hours=9), self.day + timedelta(hours=10))
+        self.assertEqual((cache.stats().size, cache.stats().invalidations), (3, 1))
+
+        # No end invalidates every later day, as a new series does.
+        cache.invalidate(2, self.day, None)
+        self.assertEqual(cache.stats().size, 1)
+
+    def test_load_racing_an_invalidation_is_not_cached(self):
+        cache = OccupancyCache()
+
+        def load_then_invalidate(office_number, start_time, end_time):
+            cache.invalidate(office_number, start_time, end_time)
+            return self.load(office_number, start_time, end_time)
+
+        cache.conflicts(1, self.day, self.day + timedelta(hours=1), load_then_invalidate)
+        self.assertEqual(cache.stats().size, 0)
+
+    def test_long_windows_are_not_cached(self):
+        cache = OccupancyCache(max_span_days=7)
+        self.assertIsNone(cache.conflicts(1, self.day, self.day + timedelta(days=8), self.load))
+        self.assertEqual(self.loads, [])
+
+
+class NotifiedInvalidationTest(unittest.TestCase):
+    # The bookings_changed handler, without a listener connection.
+    def setUp(self):
+        config = DatabaseConfig('localhost', 5432, 'test', 'test', 'test')
+        self.cache = OccupancyCache()
+        with mock.patch.object(Database, '_start_change_listener'):
+            self.db = Database(config, pool=ConnectionPool(config, min_size=0), occupancy_cache=self.cache)
+        self.addCleanup(self.db.close)
+        self.day = datetime(2030, 1, 7)
+        for office_number in (1, 2):
+            for days in (0, 1):
+                start_time = self.day + timedelta(days=days)
+                self.cache.conflicts(office_number, start_time, start_time + timedelta(hours=1), self.load)
+
+    @staticmethod
+    def load(office_number: int, start_time: datetime, end_time: datetime):
+        return [], None
+
+    def test_notification_drops_the_office_days_it_names(self):
+        self.db._on_bookings_changed({
+            'office_number': 1,
+            'start_time': (self.day + timedelta(hours=9)).isoformat(),
+            'end_time': (self.day + timedelta(hours=10)).isoformat(),
+        })
+        self.assertEqual(self.cache.stats().size, 3)
+
+    def test_listener_reset_clears_the_cache(self):
+        self.db._on_listener_reset()
+        self.assertEqual(self.cache.stats().size, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import threading
+import unittest
+from unittest import mock
+
+import psycopg2
+
+from config.config import DatabaseConfig
+from src.repositories.pool import ConnectionPool
+from src.utils.exceptions import DatabaseError
+
+
+class FakeConnection:
+    closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class ConnectionPoolConnectTest(unittest.TestCase):
+    def setUp(self):
+        self.config = DatabaseConfig('localhost', 5432, 'test', 'test', 'test')
+        self.calls = []
+
+    def pool(self, connect) -> ConnectionPool:
+        patcher = mock.patch('src.repositories.pool.psycopg2.connect', side_effect=connect)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return ConnectionPool(self.config, min_size=0, max_size=2, timeout=2.5)
+
+    def test_slow_connect_does_not_hold_the_lock(self):
+        connecting, release = threading.Event(), threading.Event()
+
+        def connect(**kwargs):
+            self.calls.append(kwargs)
+            if len(self.calls) == 1:
+                connecting.set()
+                release.wait(5)
+            return FakeConnection()
+
+        pool = self.pool(connect)
+        slow = threading.Thread(target=pool.getconn)
+        slow.start()
+        self.assertTrue(connecting.wait(5))
+
+        # The second slot opens while the first connect is still pending.
+        pool.getconn()
+        self.assertEqual(pool.stats().size, 2)
+        release.set()
+        slow.join()
+        self.assertEqual(self.calls[0]['connect_timeout'], 3)
+
+    def test_failed_connect_returns_the_slot(self):
+        def connect(**kwargs):
+            raise psycopg2.OperationalError('could not connect')
+
+        pool = self.pool(connect)
+        for _ in range(3):
+            with self.assertRaises(DatabaseError):
+                pool.getconn()
+        self.assertEqual(pool.stats().size, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+from datetime import datetime, timedelta
+
+from config.config import DatabaseConfig
+from migrations.manager import MigrationManager
+from src.models.models import BookingRequest
+from src.repositories.availability_index import AvailabilityIndex
+from src.repositories.database import Database
+from src.repositories.holds import HELD_BY
+from src.repositories.pool import ConnectionPool
+from src.services.booking import OfficeBookingSystem
+from src.services.notification import NotificationManager, NotificationService
+from src.utils.constants import Messages
+from src.utils.exceptions import DatabaseError
+
+USER_PREFIX = 'hold-test-'
+
+
+class NullService(NotificationService):
+    def send(self, recipient: str, message: str) -> None:
+        pass
+
+
+def booking(user: str, start_time: datetime) -> BookingRequest:
+    return BookingRequest(
+        1, f'{USER_PREFIX}{user}', 'hold@example.com', '+000000000',
+        start_time, start_time + timedelta(hours=1)
+    )
+
+
+# Runs against the test database and is skipped when it cannot be reached.
+class PostgresHoldsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        config = DatabaseConfig.from_yaml('test')
+        try:
+            cls.pool = ConnectionPool(config, min_size=1, max_size=4, timeout=5)
+        except DatabaseError as e:
+            raise unittest.SkipTest(f"PostgreSQL is not available: {e}")
+        MigrationManager(config, pool=cls.pool).migrate()
+        cls.db = Database(config, pool=cls.pool)
+        # A second process following the first through the index.
+        cls.indexed = Database(config, availability_index=AvailabilityIndex(), pool=cls.pool)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.indexed.close()
+        cls.db.close()
+        cls.pool.close()
+
+    def setUp(self):
+        self.base = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0) + timedelta(days=3650)
+        self.system = OfficeBookingSystem(self.db, NotificationManager(NullService(), NullService()))
+        self.addCleanup(self.delete_rows)
+
+    def delete_rows(self) -> None:
+        with self.db.connection() as conn, conn.cursor() as cur:
+            cur.execute('DELETE FROM bookings WHERE user_name LIKE %s', (f'{USER_PREFIX}%',))
+            cur.execute('DELETE FROM booking_holds WHERE office_number = 1 AND start_time >= %s', (self.base,))
+            conn.commit()
+
+    def hold(self):
+        held = self.system.hold_slot(1, self.base, self.base + timedelta(hours=1))
+        self.assertTrue(held.held, held)
+        return held.hold
+
+    def test_hold_blocks_other_bookings_until_confirmed(self):
+        hold = self.hold()
+
+        result = self.system.book(booking('bob', self.base + timedelta(minutes=30)))
+        self.assertFalse(result.booked)
+        self.assertEqual(result.conflicts[0].user_name, HELD_BY)
+        self.assertEqual(
+            [occupancy.user_name for occupancy in self.indexed.find_conflicts(1, self.base, self.base + timedelta(hours=1))],
+            [HELD_BY]
+        )
+
+        self.assertTrue(self.system.confirm_hold(hold.hold_id, booking('alice', self.base)).booked)
+        self.assertIsNone(self.db.get_hold(hold.hold_id))
+        self.assertFalse(self.system.release_hold(hold.hold_id))
+        self.assertEqual(
+            [occupancy.user_name for occupancy in self.db.find_conflicts(1, self.base, self.base + timedelta(hours=1))],
+            [f'{USER_PREFIX}alice']
+        )
+
+    def test_expired_hold_stops_counting(self):
+        self.system.hold_ttl = 0.0
+        hold = self.hold()
+
+        result = self.system.confirm_hold(hold.hold_id, booking('alice', self.base))
+        self.assertEqual(result.error, Messages.HOLD_EXPIRED)
+        self.assertEqual(self.db.find_conflicts(1, self.base, self.base + timedelta(hours=1)), [])
+        self.assertTrue(self.system.book(booking('bob', self.base)).booked)
+
+
+if __name__ == '__main__':
+    unittest.main()
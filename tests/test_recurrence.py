@@ -0,0 +1,141 @@
+import unittest
+from datetime import datetime, timedelta
+
+from src.models.models import Occupancy, RecurrenceRule, RecurringBooking
+from src.utils.recurrence import occurrences, series_conflicts, series_end
+
+
+def series(
+        start_time: datetime,
+        frequency: str = 'daily',
+        interval: int = 1,
+        until: datetime | None = None,
+        count: int | None = None,
+        hours: float = 1,
+        name: str = 'Alice'
+) -> RecurringBooking:
+    return RecurringBooking(
+        1, name, f'{name.lower()}@example.com', '+34600000000',
+        start_time, start_time + timedelta(hours=hours),
+        RecurrenceRule(frequency, interval, until, count)
+    )
+
+
+class SeriesEndTest(unittest.TestCase):
+    def setUp(self):
+        self.start = datetime(2030, 1, 7, 9)
+
+    def test_open_series_has_no_end(self):
+        self.assertIsNone(series_end(series(self.start)))
+
+    def test_count_ends_after_the_last_occurrence(self):
+        self.assertEqual(series_end(series(self.start, 'weekly', count=3)), datetime(2030, 1, 21, 10))
+
+    def test_until_is_inclusive_of_an_occurrence_starting_on_it(self):
+        booking = series(self.start, until=datetime(2030, 1, 9, 9))
+        self.assertEqual(series_end(booking), datetime(2030, 1, 9, 10))
+
+    def test_earlier_of_until_and_count_wins(self):
+        self.assertEqual(series_end(series(self.start, until=datetime(2030, 1, 31), count=2)), datetime(2030, 1, 8, 10))
+        self.assertEqual(series_end(series(self.start, until=datetime(2030, 1, 8, 9), count=10)), datetime(2030, 1, 8, 10))
+
+    def test_until_before_the_start_leaves_no_occurrences(self):
+        booking = series(self.start, until=self.start - timedelta(days=1))
+        self.assertEqual(series_end(booking), self.start)
+        self.assertEqual(list(occurrences(booking, self.start - timedelta(days=7), self.start + timedelta(days=7))), [])
+
+    def test_month_end_series_runs_into_the_next_month(self):
+        # Steps are fixed lengths, not calendar months, so nothing is clamped
+        # to the end of February.
+        booking = series(datetime(2028, 1, 31, 9), 'weekly', until=datetime(2028, 3, 1))
+        self.assertEqual(series_end(booking), datetime(2028, 2, 28, 10))
+
+
+class OccurrencesTest(unittest.TestCase):
+    def test_window_far_into_the_series(self):
+        booking = series(datetime(2030, 1, 1, 9), 'weekly', interval=2)
+        window = (datetime(2035, 6, 1), datetime(2035, 6, 30))
+        found = list(occurrences(booking, *window))
+        self.assertEqual([start.day for start, _ in found], [12, 26])
+        self.assertTrue(all(start.weekday() == booking.start_time.weekday() for start, _ in found))
+
+    def test_window_edges_are_half_open(self):
+        booking = series(datetime(2030, 1, 1, 9))
+        self.assertEqual(list(occurrences(booking, datetime(2030, 1, 2, 10), datetime(2030, 1, 3, 9))), [])
+        self.assertEqual(
+            list(occurrences(booking, datetime(2030, 1, 2, 9, 59), datetime(2030, 1, 3, 9, 1))),
+            [(datetime(2030, 1, 2, 9), datetime(2030, 1, 2, 10)), (datetime(2030, 1, 3, 9), datetime(2030, 1, 3, 10))]
+        )
+
+    def test_overnight_occurrence_is_found_from_the_next_day(self):
+        booking = series(datetime(2030, 1, 1, 22), hours=4)
+        self.assertEqual(
+            list(occurrences(booking, datetime(2030, 1, 5, 0), datetime(2030, 1, 5, 1))),
+            [(datetime(2030, 1, 4, 22), datetime(2030, 1, 5, 2))]
+        )
+
+    def test_count_stops_the_series(self):
+        booking = series(datetime(2030, 1, 1, 9), count=3)
+        self.assertEqual(len(list(occurrences(booking, datetime(2029, 1, 1), datetime(2031, 1, 1)))), 3)
+
+    def test_occurrences_keep_their_wall_clock_time_across_dst(self):
+        # Times are naive local times; Europe moves its clocks on 2030-03-31
+        # and 2030-10-27, and the series stays at 09:00 on both sides.
+        booking = series(datetime(2030, 3, 25, 9), 'weekly')
+        found = list(occurrences(booking, datetime(2030, 3, 25), datetime(2030, 11, 5)))
+        self.assertEqual({(start.hour, start.minute) for start, _ in found}, {(9, 0)})
+        self.assertIn((datetime(2030, 4, 1, 9), datetime(2030, 4, 1, 10)), found)
+        self.assertIn((datetime(2030, 10, 28, 9), datetime(2030, 10, 28, 10)), found)
+
+    def test_leap_day_is_an_occurrence(self):
+        booking = series(datetime(2028, 2, 27, 9))
+        self.assertEqual(
+            [start.day for start, _ in occurrences(booking, datetime(2028, 2, 28, 12), datetime(2028, 3, 1, 12))],
+            [29, 1]
+        )
+
+
+class SeriesConflictsTest(unittest.TestCase):
+    def setUp(self):
+        self.monday = datetime(2030, 1, 7, 9)
+
+    def test_single_bookings_on_an_occurrence_conflict(self):
+        booking = series(self.monday, 'weekly')
+        on_occurrence = Occupancy('Bob', datetime(2030, 3, 4, 9, 30), datetime(2030, 3, 4, 11))
+        off_day = Occupancy('Bob', datetime(2030, 3, 5, 9), datetime(2030, 3, 5, 10))
+        back_to_back = Occupancy('Bob', datetime(2030, 3, 4, 10), datetime(2030, 3, 4, 11))
+        self.assertEqual(series_conflicts(booking, [on_occurrence, off_day, back_to_back], []), [on_occurrence])
+
+    def test_single_booking_after_the_series_ends_is_free(self):
+        booking = series(self.monday, 'weekly', count=2)
+        later = Occupancy('Bob', datetime(2030, 1, 21, 9), datetime(2030, 1, 21, 10))
+        self.assertEqual(series_conflicts(booking, [later], []), [])
+
+    def test_series_meeting_on_a_shared_day_conflict(self):
+        weekly = series(self.monday, 'weekly')
+        daily = series(self.monday + timedelta(days=3), name='Bob')
+        conflicts = series_conflicts(weekly, [], [daily])
+        self.assertEqual(conflicts, [Occupancy('Bob', datetime(2030, 1, 14, 9), datetime(2030, 1, 14, 10))])
+
+    def test_interleaved_series_never_meet(self):
+        every_other_day = series(self.monday, interval=2)
+        offset = series(self.monday + timedelta(days=101), interval=2, name='Bob')
+        self.assertEqual(series_conflicts(every_other_day, [], [offset]), [])
+
+    def test_series_ending_before_the_other_starts_is_free(self):
+        booking = series(self.monday, count=5)
+        later = series(self.monday + timedelta(days=5), name='Bob')
+        self.assertEqual(series_conflicts(booking, [], [later]), [])
+        self.assertEqual(len(series_conflicts(series(self.monday, count=6), [], [later])), 1)
+
+    def test_series_crossing_month_end_meets_a_weekly_one(self):
+        daily = series(datetime(2030, 1, 30, 9), count=5)
+        weekly = series(datetime(2029, 12, 6, 9, 30), 'weekly', name='Bob')
+        self.assertEqual(
+            series_conflicts(daily, [], [weekly]),
+            [Occupancy('Bob', datetime(2030, 1, 31, 9, 30), datetime(2030, 1, 31, 10, 30))]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
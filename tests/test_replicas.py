@@ -0,0 +1,119 @@
+import unittest
+from contextlib import contextmanager
+
+import psycopg2
+
+from src.repositories.replicas import REPLICA_PROBE_TIMEOUT, Replica, ReplicaRouter
+from src.utils.exceptions import PoolTimeoutError
+
+
+class StubCursor:
+    def __init__(self, pool: 'StubPool'):
+        self.pool = pool
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, sql: str) -> None:
+        if self.pool.error is not None:
+            raise self.pool.error
+
+    def fetchone(self) -> tuple:
+        return self.pool.replay_lsn, self.pool.lag
+
+
+class StubConnection:
+    def __init__(self, pool: 'StubPool'):
+        self.pool = pool
+
+    def cursor(self) -> StubCursor:
+        return StubCursor(self.pool)
+
+
+# Answers probes with a fixed replay position and lag, or fails them.
+class StubPool:
+    def __init__(self, replay_lsn: int = 0, lag: float = 0.0):
+        self.replay_lsn = replay_lsn
+        self.lag = lag
+        self.error: Exception | None = None
+        self.timeouts: list[float | None] = []
+
+    @contextmanager
+    def connection(self, timeout: float | None = None):
+        self.timeouts.append(timeout)
+        if isinstance(self.error, PoolTimeoutError):
+            raise self.error
+        yield StubConnection(self)
+
+    def close(self) -> None:
+        pass
+
+
+def replica(name: str, replay_lsn: int = 0, lag: float = 0.0) -> Replica:
+    return Replica(name, StubPool(replay_lsn, lag))
+
+
+class ReplicaRouterTest(unittest.TestCase):
+    def test_healthy_replicas_take_turns(self):
+        router = ReplicaRouter([replica('a'), replica('b')])
+        self.assertEqual([router.choose().name for _ in range(4)], ['a', 'b', 'a', 'b'])
+        self.assertEqual(router.stats().replica_reads, 4)
+
+    def test_lagging_replica_is_skipped(self):
+        router = ReplicaRouter([replica('a', lag=10.0), replica('b', lag=1.0)], max_lag=5.0)
+        self.assertEqual([router.choose().name for _ in range(2)], ['b', 'b'])
+        self.assertEqual(router.stats().lagging_skips, 2)
+
+    def test_reads_follow_this_process_writes(self):
+        router = ReplicaRouter([replica('a', replay_lsn=100)])
+        router.record_write({1}, 150)
+
+        self.assertIsNone(router.choose([1]))
+        self.assertEqual(router.choose([2]).name, 'a')
+        # A read of every office waits for the latest write anywhere.
+        self.assertIsNone(router.choose())
+
+        router.replicas[0].pool.replay_lsn = 150
+        router.replicas[0].status.checked_at = float('-inf')
+        self.assertEqual(router.choose([1]).name, 'a')
+        stats = router.stats()
+        self.assertEqual((stats.unreplayed_skips, stats.primary_reads), (2, 2))
+
+    def test_unknown_write_position_keeps_reads_on_the_primary(self):
+        router = ReplicaRouter([replica('a', replay_lsn=10 ** 12)])
+        router.record_write({1}, float('inf'))
+        self.assertIsNone(router.choose([1]))
+
+    def test_marked_replica_is_skipped_until_the_next_probe(self):
+        router = ReplicaRouter([replica('a'), replica('b')], check_interval=3600.0)
+        router.choose()
+        router.choose()
+        router.mark_unhealthy(router.replicas[0])
+        self.assertEqual([router.choose().name for _ in range(2)], ['b', 'b'])
+
+        router.check_interval = 0.0
+        self.assertEqual({router.choose().name for _ in range(2)}, {'a', 'b'})
+
+    def test_failed_probe_sends_reads_to_the_primary(self):
+        for error in (psycopg2.OperationalError('replica down'), PoolTimeoutError('timed out')):
+            with self.subTest(error=type(error).__name__):
+                down = replica('a')
+                down.pool.error = error
+                router = ReplicaRouter([down])
+                with self.assertLogs('src.repositories.replicas', 'WARNING'):
+                    self.assertIsNone(router.choose())
+                stats = router.stats()
+                self.assertEqual((stats.probe_failures, stats.primary_reads), (1, 1))
+                self.assertFalse(down.status.healthy)
+
+    def test_probes_use_the_short_timeout(self):
+        router = ReplicaRouter([replica('a')])
+        router.choose()
+        self.assertEqual(router.replicas[0].pool.timeouts, [REPLICA_PROBE_TIMEOUT])
+
+
+if __name__ == '__main__':
+    unittest.main()
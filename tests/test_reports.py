@@ -0,0 +1,152 @@
+import io
+import json
+import random
+import unittest
+from datetime import date, datetime, timedelta
+from unittest import mock
+
+from src.models.models import BookingRequest, RecurrenceRule, RecurringBooking
+from src.repositories.memory import InMemoryDatabase
+from src.services import reports
+from src.services.reports import (
+    DailyPeak,
+    daily_peaks,
+    daily_usage,
+    histogram_records,
+    hourly_histogram,
+    stream_occupancy,
+    write_csv,
+    write_jsonl,
+)
+
+DAY = datetime(2030, 1, 7)
+
+
+def row(office_number: int, user_name: str, start_hour: float, hours: float) -> tuple:
+    start_time = DAY + timedelta(hours=start_hour)
+    return office_number, user_name, start_time, start_time + timedelta(hours=hours)
+
+
+class StreamOccupancyTest(unittest.TestCase):
+    def test_bookings_and_series_merge_in_start_order(self):
+        repo = InMemoryDatabase()
+        for office_number, hour in ((1, 9), (2, 11)):
+            repo.book_office(BookingRequest(
+                office_number, 'Ann', 'ann@example.com', '+34600000000',
+                DAY + timedelta(days=1, hours=hour), DAY + timedelta(days=1, hours=hour + 1)
+            ))
+        repo.book_recurring(RecurringBooking(
+            3, 'Bob', 'bob@example.com', '+34600000000',
+            DAY + timedelta(hours=10), DAY + timedelta(hours=11), RecurrenceRule('daily', count=3)
+        ))
+
+        streamed = list(stream_occupancy(repo, DAY, DAY + timedelta(days=3)))
+        self.assertEqual(
+            [(office_number, start_time) for office_number, _, start_time, _ in streamed],
+            [
+                (3, DAY + timedelta(hours=10)),
+                (1, DAY + timedelta(days=1, hours=9)),
+                (3, DAY + timedelta(days=1, hours=10)),
+                (2, DAY + timedelta(days=1, hours=11)),
+                (3, DAY + timedelta(days=2, hours=10)),
+            ]
+        )
+
+
+class DailyReportTest(unittest.TestCase):
+    def test_daily_usage_clips_to_the_window_and_splits_at_midnight(self):
+        rows = [
+            row(1, 'Ann', 9, 2),
+            row(1, 'Bob', 12, 1),
+            row(1, 'Bob', 22, 4),
+            row(2, 'Ann', 7, 3),
+        ]
+        usage = list(daily_usage(rows, DAY + timedelta(hours=8), DAY + timedelta(days=2), top_users=1))
+
+        self.assertEqual(
+            [(entry.office_number, entry.day, entry.bookings, entry.booked_hours, entry.top_users) for entry in usage],
+            [
+                (1, DAY.date(), 3, 5.0, ['Bob']),
+                (2, DAY.date(), 1, 2.0, ['Ann']),
+                (1, date(2030, 1, 8), 1, 2.0, ['Bob']),
+            ]
+        )
+        # The first day is 16 hours long inside the window.
+        self.assertAlmostEqual(usage[0].utilisation, 5 / 16)
+        self.assertAlmostEqual(usage[2].utilisation, 2 / 24)
+
+    def test_daily_peaks(self):
+        rows = [
+            row(1, 'Ann', 9, 2),
+            row(2, 'Bob', 10, 2),
+            row(3, 'Cy', 10.5, 1),
+            row(1, 'Ann', 11, 1),
+            row(1, 'Ann', 23, 2),
+            row(2, 'Bob', 24.5, 1),
+        ]
+        self.assertEqual(list(daily_peaks(rows)), [
+            DailyPeak(DAY.date(), 3, DAY + timedelta(hours=10, minutes=30)),
+            DailyPeak(date(2030, 1, 8), 2, DAY + timedelta(hours=24, minutes=30)),
+        ])
+
+    def test_writers(self):
+        rows = [row(1, 'Ann', 9, 1)]
+        out = io.StringIO()
+        self.assertEqual(write_csv(rows, out), 1)
+        self.assertEqual(out.getvalue().splitlines(), [
+            'office_number,user_name,start_time,end_time',
+            '1,Ann,2030-01-07T09:00:00,2030-01-07T10:00:00',
+        ])
+
+        out = io.StringIO()
+        self.assertEqual(write_jsonl(daily_usage(rows, DAY, DAY + timedelta(days=1)), out), 1)
+        self.assertEqual(json.loads(out.getvalue())['top_users'], ['Ann'])
+
+
+class HourlyHistogramTest(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(3)
+        self.rows = sorted(
+            (row(rng.randint(1, 5), 'user', rng.randint(0, 95) / 4, rng.randint(1, 12) / 4) for _ in range(500)),
+            key=lambda entry: entry[2]
+        )
+        self.window = (DAY, DAY + timedelta(days=2))
+
+    def histogram(self, numpy, chunk_size: int = 64) -> dict[int, list[float]]:
+        # numpy=False runs the pure Python fallback used when NumPy is not
+        # installed.
+        with mock.patch.object(reports, 'np', reports.np if numpy else None):
+            return hourly_histogram(self.rows, *self.window, chunk_size=chunk_size)
+
+    def test_fallback_bins_hours(self):
+        histogram = hourly_histogram([row(1, 'Ann', 9.5, 2)], DAY, DAY + timedelta(days=1))
+        with mock.patch.object(reports, 'np', None):
+            fallback = hourly_histogram([row(1, 'Ann', 9.5, 2)], DAY, DAY + timedelta(days=1))
+        expected = [0.0] * 24
+        expected[9], expected[10], expected[11] = 0.5, 1.0, 0.5
+        self.assertEqual(fallback, {1: expected})
+        self.assertEqual(histogram, {1: expected})
+        self.assertEqual(
+            [(record.hour, record.booked_hours) for record in histogram_records(fallback) if record.booked_hours],
+            [(9, 0.5), (10, 1.0), (11, 0.5)]
+        )
+
+    def test_bookings_past_midnight_wrap_to_the_early_hours(self):
+        with mock.patch.object(reports, 'np', None):
+            histogram = hourly_histogram([row(1, 'Ann', 23, 2)], DAY, DAY + timedelta(days=2))
+        self.assertEqual((histogram[1][23], histogram[1][0]), (1.0, 1.0))
+
+    @unittest.skipIf(reports.np is None, 'NumPy is not installed')
+    def test_numpy_path_matches_the_fallback(self):
+        fallback = self.histogram(numpy=False)
+        for chunk_size in (1, 64, 100000):
+            with self.subTest(chunk_size=chunk_size):
+                vectorised = self.histogram(numpy=True, chunk_size=chunk_size)
+                self.assertEqual(sorted(vectorised), sorted(fallback))
+                for office_number, bins in fallback.items():
+                    for hours, expected in zip(vectorised[office_number], bins):
+                        self.assertAlmostEqual(hours, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import asyncio
+import unittest
+
+from src.cmd.server import MAX_BODY_SIZE, BookingHTTPServer, HTTPError, _parse_int
+from src.repositories.memory import InMemoryDatabase
+from src.services.booking import OfficeBookingSystem
+from src.services.notification import NotificationManager, NotificationService
+
+
+class NullService(NotificationService):
+    def send(self, recipient: str, message: str) -> None:
+        pass
+
+
+class ContentLengthTest(unittest.TestCase):
+    def setUp(self):
+        system = OfficeBookingSystem(InMemoryDatabase(), NotificationManager(NullService(), NullService()))
+        self.server = BookingHTTPServer(system, max_workers=1)
+        self.addCleanup(self.server.executor.shutdown)
+
+    def request(self, content_length: str) -> bytes:
+        async def send() -> bytes:
+            server = await self.server.start('127.0.0.1', 0)
+            async with server:
+                reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+                writer.write(
+                    f"POST /bookings HTTP/1.1\r\nConnection: close\r\nContent-Length: {content_length}\r\n\r\n{{}}".encode()
+                )
+                await writer.drain()
+                response = await reader.read()
+                writer.close()
+                return response
+
+        return asyncio.run(send())
+
+    def test_bad_lengths_are_rejected(self):
+        for value in ('abc', '-5', '+2', '1_0', ' '):
+            with self.subTest(value=value):
+                response = self.request(value)
+                self.assertTrue(response.startswith(b'HTTP/1.1 400 '), response)
+                self.assertIn(b'Connection: close', response)
+
+    def test_oversized_body_is_rejected(self):
+        response = self.request(str(MAX_BODY_SIZE + 1))
+        self.assertTrue(response.startswith(b'HTTP/1.1 413 '), response)
+
+    def test_valid_length_reaches_the_handler(self):
+        # The empty JSON object is read in full and rejected by the handler.
+        response = self.request('2')
+        self.assertNotIn(b'Invalid Content-Length', response)
+        self.assertIn(b'"error"', response)
+
+
+class ParseIntTest(unittest.TestCase):
+    def test_integers_and_integral_values_are_accepted(self):
+        for value in (3, '3', 3.0):
+            with self.subTest(value=value):
+                self.assertEqual(_parse_int(value, 'office'), 3)
+
+    def test_bools_and_fractions_are_rejected(self):
+        for value in (True, False, 2.5, float('inf'), float('nan'), '2.5', None, [1]):
+            with self.subTest(value=value):
+                with self.assertRaises(HTTPError):
+                    _parse_int(value, 'office')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+import threading
+import unittest
+from types import SimpleNamespace
+
+from psycopg2.errors import InvalidSqlStatementName
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INTRANS
+
+from src.repositories.statements import StatementRegistry
+
+FIND_SQL = 'SELECT user_name FROM bookings WHERE office_number = %(office_number)s'
+
+
+class FakeSession:
+    # The server side of a connection: its backend pid and the statements
+    # prepared on it. Every statement sent is recorded.
+    def __init__(self, backend_pid: int = 100):
+        self.backend_pid = backend_pid
+        self.prepared: set[str] = set()
+        self.sent: list[str] = []
+
+
+class FakeConnection:
+    def __init__(self, session: FakeSession):
+        self.session = session
+        self.status = TRANSACTION_STATUS_IDLE
+        self.rollbacks = 0
+
+    @property
+    def info(self):
+        return SimpleNamespace(backend_pid=self.session.backend_pid)
+
+    def get_transaction_status(self) -> int:
+        return self.status
+
+    def rollback(self) -> None:
+        self.rollbacks += 1
+        self.status = TRANSACTION_STATUS_IDLE
+
+    def cursor(self) -> 'FakeCursor':
+        return FakeCursor(self)
+
+
+class FakeCursor:
+    def __init__(self, conn: FakeConnection):
+        self.connection = conn
+        self._rows: list[tuple] = []
+
+    def execute(self, sql: str, params=None) -> None:
+        session = self.connection.session
+        session.sent.append(sql)
+        self.connection.status = TRANSACTION_STATUS_INTRANS
+        if sql.startswith('SELECT name FROM pg_prepared_statements'):
+            self._rows = [(name,) for name in params[0] if name in session.prepared]
+            return
+        for statement in sql.split('; '):
+            if statement.startswith('PREPARE '):
+                session.prepared.add(statement.split()[1])
+            elif statement.startswith('EXECUTE '):
+                name = statement.split()[1]
+                if name not in session.prepared:
+                    raise InvalidSqlStatementName(f'prepared statement "{name}" does not exist')
+
+    def fetchall(self) -> list[tuple]:
+        return self._rows
+
+
+class StatementRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.registry = StatementRegistry()
+        self.registry.register('find', FIND_SQL, {'office_number': 'integer'})
+        self.session = FakeSession()
+        self.conn = FakeConnection(self.session)
+
+    def execute(self) -> None:
+        self.registry.execute(self.conn.cursor(), 'find', params={'office_number': 1})
+
+    def test_register_rewrites_named_parameters(self):
+        statement = self.registry._statements['find']
+        self.assertEqual(
+            statement.prepare_sql,
+            'PREPARE find (integer) AS SELECT user_name FROM bookings WHERE office_number = $1'
+        )
+        self.assertEqual(statement.execute_sql, 'EXECUTE find (%(office_number)s)')
+        with self.assertRaises(ValueError):
+            self.registry.register('bad', FIND_SQL, {})
+
+    def test_prepares_once_per_connection(self):
+        for _ in range(3):
+            self.execute()
+        self.assertEqual(sum(sql.startswith('PREPARE') for sql in self.session.sent), 1)
+        stats = self.registry.stats()
+        self.assertEqual((stats.prepares, stats.executions, stats.fallbacks), (1, 3, 0))
+
+    def test_new_backend_pid_prepares_again(self):
+        # The same connection object now talks to another backend, which has
+        # none of the statements.
+        self.execute()
+        self.session.backend_pid, self.session.prepared = 101, set()
+        self.execute()
+
+        self.assertEqual(sum(sql.startswith('PREPARE') for sql in self.session.sent), 2)
+        self.assertEqual(self.registry.stats().prepares, 2)
+        self.assertEqual(self.registry.stats().fallbacks, 0)
+
+    def test_lost_statements_fall_back_to_text_when_idle(self):
+        self.execute()
+        self.session.prepared.clear()
+        self.conn.status = TRANSACTION_STATUS_IDLE
+        self.execute()
+
+        self.assertEqual(self.session.sent[-1], FIND_SQL)
+        self.assertEqual(self.conn.rollbacks, 1)
+        self.assertEqual(self.registry.stats().fallbacks, 1)
+        # The next call prepares them again.
+        self.execute()
+        self.assertIn('find', self.session.prepared)
+
+    def test_lost_statements_inside_a_transaction_raise(self):
+        # Falling back would roll back the caller's earlier work.
+        self.execute()
+        self.session.prepared.clear()
+        self.conn.status = TRANSACTION_STATUS_INTRANS
+        with self.assertRaises(InvalidSqlStatementName):
+            self.execute()
+
+        self.assertEqual(self.conn.rollbacks, 0)
+        self.assertEqual(self.registry.stats().fallbacks, 0)
+        self.assertNotEqual(self.session.sent[-1], FIND_SQL)
+
+    def test_disabled_registry_sends_text(self):
+        registry = StatementRegistry(enabled=False)
+        registry.register('find', FIND_SQL, {'office_number': 'integer'})
+        registry.execute(self.conn.cursor(), 'find', params={'office_number': 1})
+        self.assertEqual(self.session.sent, [FIND_SQL])
+        self.assertEqual(registry.stats().text_executions, 1)
+
+    def test_counters_are_exact_under_concurrency(self):
+        connections = [FakeConnection(FakeSession(pid)) for pid in range(8)]
+
+        def run(conn: FakeConnection) -> None:
+            for _ in range(500):
+                conn.status = TRANSACTION_STATUS_IDLE
+                self.registry.execute(conn.cursor(), 'find', params={'office_number': 1})
+
+        threads = [threading.Thread(target=run, args=(conn,)) for conn in connections]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = self.registry.stats()
+        self.assertEqual((stats.prepares, stats.executions), (8, 4000))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from src.cmd.importer import read_booking_requests
+from src.cmd.server import _parse_datetime
+from src.models.models import BookingRequest
+from src.repositories.memory import InMemoryDatabase
+from src.services.booking import OfficeBookingSystem
+from src.services.notification import NotificationManager, NotificationService
+from src.utils.constants import Messages
+from src.utils.validators import BookingValidator, parse_datetime
+
+
+class NullService(NotificationService):
+    def send(self, recipient: str, message: str) -> None:
+        pass
+
+
+class AwareDatetimeTest(unittest.TestCase):
+    def setUp(self):
+        self.start = datetime(2030, 1, 31, 9, tzinfo=timezone(timedelta(hours=1)))
+
+    def test_offsets_become_naive_local_time(self):
+        parsed = parse_datetime(self.start.isoformat())
+        self.assertIsNone(parsed.tzinfo)
+        self.assertEqual(parsed, self.start.astimezone().replace(tzinfo=None))
+        self.assertEqual(parse_datetime('2030-01-31T09:00:00'), datetime(2030, 1, 31, 9))
+        self.assertIsNone(_parse_datetime(self.start.isoformat(), 'start').tzinfo)
+
+    def test_imported_offsets_are_booked(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bookings.csv')
+            with open(path, 'w') as f:
+                f.write('office_number,user_name,user_email,user_phone,start_time,end_time\n')
+                f.write(f'1,Alice,alice@example.com,+34600000000,{self.start.isoformat()},'
+                        f'{(self.start + timedelta(hours=1)).isoformat()}\n')
+            requests = list(read_booking_requests(path))
+
+        system = OfficeBookingSystem(InMemoryDatabase(), NotificationManager(NullService(), NullService()))
+        result, = system.book_many(requests)
+        self.assertTrue(result.booked, result)
+
+    def test_validator_reports_aware_datetimes(self):
+        request = BookingRequest(
+            1, 'Alice', 'alice@example.com', '+34600000000', self.start, self.start + timedelta(hours=1)
+        )
+        errors = BookingValidator().validate(request, datetime.now())
+        self.assertEqual(errors, {
+            'start_time': Messages.AWARE_DATETIME,
+            'end_time': Messages.AWARE_DATETIME,
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()